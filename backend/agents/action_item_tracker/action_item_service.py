@@ -1,19 +1,23 @@
 import json
 import os
 from datetime import datetime
-from lib.database import update_minutes_with_action_items
+from lib.database import save_action_items_for_minutes
 
-def save_action_items(minutes_id: str, action_items: list):
+def save_action_items(minutes_id: str, action_items: list, user_id: str, replace_existing: bool = False):
     """
-    Updates a minutes document in MongoDB with the extracted action items.
+    Saves the extracted action items and writes them back onto their minutes document.
     
     Args:
         minutes_id (str): The MongoDB document _id for the minutes.
         action_items (list): The list of action items to save.
+        user_id (str): The owner of the minutes.
+        replace_existing (bool): Remove items saved by an earlier attempt first.
+
+    Returns:
+        list: The saved action items with their IDs.
     """
     if not minutes_id:
         print("⚠️ Cannot save action items: minutes_id is missing.")
-        return None
+        return []
     
-    modified_count = update_minutes_with_action_items(minutes_id, action_items)
-    return modified_count
\ No newline at end of file
+    return save_action_items_for_minutes(minutes_id, action_items, user_id, replace_existing=replace_existing)
\ No newline at end of file
@@ -1,18 +1,16 @@
-import google.generativeai as genai
-import os
-from dotenv import load_dotenv
 import json
 import re
-
-load_dotenv()
-# Corrected to use GOOGLE_API_KEY from your .env file
-api_key = os.getenv("GOOGLE_API_KEY")
-if not api_key:
-    raise ValueError("GOOGLE_API_KEY not found. Make sure it's set in your .env file.")
-genai.configure(api_key=api_key)
+from lib import llm_cache
 
 # Using a valid model from the list you provided.
-model = genai.GenerativeModel("gemini-2.5-pro")
+ACTION_ITEMS_MODEL = "gemini-2.5-pro"
+# Bump the version whenever the prompt changes, so cached responses to the old one are not reused.
+ACTION_ITEMS_PROMPT_VERSION = "1"
+ACTION_ITEMS_PROMPT = """
+    Extract action items from this meeting. Respond ONLY with a JSON list of objects.
+    Each object must have: "owner", "task", and "deadline" (if any, otherwise null).
+    Meeting text: {meeting_text}
+    """
 
 def clean_json_output(raw_output: str):
     try:
@@ -30,14 +28,18 @@ def clean_json_output(raw_output: str):
                  return [{"error": "Failed to parse cleaned JSON", "raw": match.group()}]
         return [{"error": "Failed to parse JSON", "raw": raw_output}]
 
+def _parsed_cleanly(raw_output: str) -> bool:
+    items = clean_json_output(raw_output)
+    return not any(isinstance(item, dict) and "error" in item for item in items)
+
 def extract_action_items(meeting_text:str):
-    prompt = f"""
-    Extract action items from this meeting. Respond ONLY with a JSON list of objects.
-    Each object must have: "owner", "task", and "deadline" (if any, otherwise null).
-    Meeting text: {meeting_text}
-    """
-    response = model.generate_content(prompt)
-    return clean_json_output(response.text)
+    prompt = ACTION_ITEMS_PROMPT.format(meeting_text=meeting_text)
+    # The same meeting text always gets the same answer, so it is served from the response cache.
+    raw_output = llm_cache.cached_generate(
+        "action_items", ACTION_ITEMS_PROMPT_VERSION, meeting_text, prompt,
+        model=ACTION_ITEMS_MODEL, operation="action_items", cacheable=_parsed_cleanly,
+    )
+    return clean_json_output(raw_output)
 
 
 ###########################################################
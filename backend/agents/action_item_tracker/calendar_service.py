@@ -1,56 +1,131 @@
 import os
+import threading
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-import dateparser
 from lib.database import get_google_credentials, save_google_credentials
+from lib.dates import EVENT_TIMEZONE, parse_local_date
 
 SCOPES = ['https://www.googleapis.com/auth/calendar']
 
-def get_calendar_service(user_id: str):
-    """
-    Builds a user-specific Google Calendar service object.
-    It fetches credentials from the database for the given user_id.
-    """
+# --- Calendar clients ---
+# Building a Calendar service means a Mongo read of the user's credentials, possibly a
+# token refresh, and parsing the discovery document, so services are cached per user
+# (LRU, CALENDAR_SERVICE_CACHE_SIZE) and rebuilt only when the access token is about to
+# expire or the credentials change. The discovery document is the static copy bundled
+# with google-api-python-client, so building never fetches it. httplib2 is not
+# thread-safe: a cached service is shared, but every request executes on its own
+# authorized Http object.
+# Events of a scheduling run go through the Calendar batch endpoint, CALENDAR_BATCH_SIZE
+# inserts per HTTP request. GOOGLE_CALENDAR_API_ENDPOINT and GOOGLE_CALENDAR_BATCH_URI
+# point both at a local stand-in for tests.
+
+CALENDAR_SERVICE_CACHE_SIZE = int(os.getenv("CALENDAR_SERVICE_CACHE_SIZE", "256"))
+CALENDAR_TOKEN_REFRESH_MARGIN = timedelta(seconds=int(os.getenv("CALENDAR_TOKEN_REFRESH_MARGIN_SECONDS", "300")))
+CALENDAR_BATCH_SIZE = int(os.getenv("CALENDAR_BATCH_SIZE", "50"))
+CALENDAR_API_ENDPOINT = os.getenv("GOOGLE_CALENDAR_API_ENDPOINT")
+CALENDAR_BATCH_URI = os.getenv("GOOGLE_CALENDAR_BATCH_URI", "https://www.googleapis.com/batch/calendar/v3")
+CALENDAR_HTTP_TIMEOUT = int(os.getenv("CALENDAR_HTTP_TIMEOUT_SECONDS", "30"))
+
+_services = OrderedDict()  # user_id -> (service, credentials)
+_services_lock = threading.Lock()
+
+
+def _needs_refresh(creds) -> bool:
+    if not creds.token:
+        return True
+    if creds.expiry is None:
+        # Stored without an expiry: refresh once so the cached credentials know it.
+        return bool(creds.refresh_token)
+    # google-auth keeps expiry as naive UTC
+    return creds.expiry - datetime.utcnow() <= CALENDAR_TOKEN_REFRESH_MARGIN
+
+
+def _refresh_credentials(user_id: str, creds) -> bool:
+    from google.auth.transport.requests import Request
+
+    if not creds.refresh_token:
+        # This case should ideally trigger a re-authentication flow
+        print(f"Credentials for user {user_id} are invalid and cannot be refreshed.")
+        return False
+    print(f"Refreshing Google token for user {user_id}")
+    creds.refresh(Request())
+    # Save the refreshed credentials back to the database
+    save_google_credentials(user_id, {
+        'token': creds.token,
+        'refresh_token': creds.refresh_token,
+        'token_uri': creds.token_uri,
+        'client_id': creds.client_id,
+        'client_secret': creds.client_secret,
+        'scopes': creds.scopes,
+        'expiry': creds.expiry.isoformat() + "Z" if creds.expiry else None,
+    })
+    return True
+
+
+def _build_service(creds):
+    from googleapiclient.discovery import build
+
+    client_options = {"api_endpoint": CALENDAR_API_ENDPOINT} if CALENDAR_API_ENDPOINT else None
+    return build('calendar', 'v3', credentials=creds, static_discovery=True,
+                 client_options=client_options, cache_discovery=False)
+
+
+def _get_client(user_id: str):
+    """Returns the cached (service, credentials) for a user, building or refreshing them as needed."""
+    from google.oauth2.credentials import Credentials
+
+    with _services_lock:
+        cached = _services.get(user_id)
+        if cached:
+            _services.move_to_end(user_id)
+    if cached and not _needs_refresh(cached[1]):
+        return cached
+
     creds_info = get_google_credentials(user_id)
     if not creds_info or "credentials" not in creds_info:
         print(f"No Google credentials found for user {user_id}")
-        return None
+        invalidate_calendar_service(user_id)
+        return None, None
 
     creds = Credentials.from_authorized_user_info(creds_info["credentials"], SCOPES)
+    if _needs_refresh(creds) and not _refresh_credentials(user_id, creds):
+        invalidate_calendar_service(user_id)
+        return None, None
 
-    if not creds.valid:
-        if creds.expired and creds.refresh_token:
-            print(f"Refreshing expired token for user {user_id}")
-            creds.refresh(Request())
-            # Save the refreshed credentials back to the database
-            save_google_credentials(user_id, {
-                'token': creds.token,
-                'refresh_token': creds.refresh_token,
-                'token_uri': creds.token_uri,
-                'client_id': creds.client_id,
-                'client_secret': creds.client_secret,
-                'scopes': creds.scopes
-            })
-        else:
-            # This case should ideally trigger a re-authentication flow
-            print(f"Credentials for user {user_id} are invalid and cannot be refreshed.")
-            return None
-            
-    return build('calendar', 'v3', credentials=creds)
+    client = (_build_service(creds), creds)
+    with _services_lock:
+        _services[user_id] = client
+        while len(_services) > CALENDAR_SERVICE_CACHE_SIZE:
+            _services.popitem(last=False)
+    return client
 
-def schedule_action_item(user_id: str, task_name: str, description: str, deadline_str: str, owner: str, duration_minutes: int = 60):
-    print(f"Scheduling Google Calendar event for user {user_id}: {task_name}")
-    service = get_calendar_service(user_id)
-    
-    if not service:
-        print(f"Cannot schedule event for user {user_id}, calendar service not available.")
-        return None
 
+def get_calendar_service(user_id: str):
+    """
+    Returns a user-specific Google Calendar service object, or None if the user has no
+    usable Google credentials.
+    """
+    service, _ = _get_client(user_id)
+    return service
+
+
+def invalidate_calendar_service(user_id: str):
+    """Drops a user's cached service (call when their Google credentials change or are revoked)."""
+    with _services_lock:
+        _services.pop(user_id, None)
+
+
+def _authorized_http(creds):
+    import httplib2
+    from google_auth_httplib2 import AuthorizedHttp
+    return AuthorizedHttp(creds, http=httplib2.Http(timeout=CALENDAR_HTTP_TIMEOUT))
+
+
+def build_event(task_name: str, description: str, deadline_str: str, owner: str,
+                duration_minutes: int = 60, event_id: str = None) -> dict:
+    """Builds the body of a Calendar event starting at `deadline_str` (2 days from now if it cannot be parsed)."""
     # Parse deadline_str as full datetime (date + time)
-    deadline = dateparser.parse(deadline_str, settings={'PREFER_DATES_FROM': 'future'})
+    deadline = parse_local_date(deadline_str, prefer_future=True)
     if not deadline:
         deadline = datetime.now() + timedelta(days=2)
     # Do NOT override hour/minute here!
@@ -60,10 +135,83 @@ def schedule_action_item(user_id: str, task_name: str, description: str, deadlin
     event = {
         'summary': f"{task_name} ({owner})",
         'description': description,
-        'start': {'dateTime': start_time.isoformat(), 'timeZone': 'Asia/Colombo'},
-        'end': {'dateTime': end_time.isoformat(), 'timeZone': 'Asia/Colombo'},
+        'start': {'dateTime': start_time.isoformat(), 'timeZone': EVENT_TIMEZONE},
+        'end': {'dateTime': end_time.isoformat(), 'timeZone': EVENT_TIMEZONE},
     }
+    if event_id:
+        event['id'] = event_id
+    return event
+
+
+def schedule_action_item(user_id: str, task_name: str, description: str, deadline_str: str, owner: str, duration_minutes: int = 60, event_id: str = None):
+    """
+    Creates a Google Calendar event. When event_id is given the insert is idempotent:
+    if an event with that ID already exists, the existing event is returned instead.
+    """
+    print(f"Scheduling Google Calendar event for user {user_id}: {task_name}")
+    event = build_event(task_name, description, deadline_str, owner, duration_minutes, event_id)
+    created = schedule_events(user_id, [event])
+    return created[0] if created else None
+
+
+def _execute_batch(service, creds, requests: list) -> list:
+    """Executes (request_id, HttpRequest) pairs in batches; returns [(request_id, response, HttpError or None)]."""
+    from googleapiclient.http import BatchHttpRequest
+
+    results = []
+
+    def _callback(request_id, response, exception):
+        results.append((request_id, response, exception))
+
+    for start in range(0, len(requests), CALENDAR_BATCH_SIZE):
+        batch = BatchHttpRequest(callback=_callback, batch_uri=CALENDAR_BATCH_URI)
+        for request_id, request in requests[start:start + CALENDAR_BATCH_SIZE]:
+            batch.add(request, request_id=request_id)
+        batch.execute(http=_authorized_http(creds))
+    return results
+
+
+def schedule_events(user_id: str, events: list) -> list:
+    """
+    Inserts events (see build_event) through the Calendar batch endpoint and returns, per
+    event, the created event, the existing event if its ID was already taken (a retried
+    run), or None if the insert was rejected. Returns [] if the user has no calendar access.
+    Raises the first transient error (429 / 5xx) once the whole run has been submitted, so a
+    retry re-submits it; events that were created meanwhile come back as duplicates.
+    """
+    from googleapiclient.errors import HttpError
+
+    service, creds = _get_client(user_id)
+    if not service:
+        print(f"Cannot schedule events for user {user_id}, calendar service not available.")
+        return []
+    if not events:
+        return []
+
+    created = [None] * len(events)
+    inserts = [(str(idx), service.events().insert(calendarId='primary', body=event)) for idx, event in enumerate(events)]
+    conflicts, transient = [], []
+    for request_id, response, exception in _execute_batch(service, creds, inserts):
+        idx = int(request_id)
+        if exception is None:
+            created[idx] = response
+        elif isinstance(exception, HttpError) and exception.resp.status == 409 and events[idx].get('id'):
+            conflicts.append(idx)
+        else:
+            status = exception.resp.status if isinstance(exception, HttpError) else None
+            if status == 401:
+                invalidate_calendar_service(user_id)
+            if status == 429 or (status or 0) >= 500:
+                transient.append(exception)
+            print(f"❌ Could not create event '{events[idx].get('summary')}': {exception}")
+
+    if conflicts:
+        print(f"{len(conflicts)} events already exist; skipping duplicates.")
+        gets = [(str(idx), service.events().get(calendarId='primary', eventId=events[idx]['id'])) for idx in conflicts]
+        for request_id, response, exception in _execute_batch(service, creds, gets):
+            created[int(request_id)] = response if exception is None else {'id': events[int(request_id)]['id']}
 
-    created_event = service.events().insert(calendarId='primary', body=event).execute()
-    print(f"Event created: {created_event.get('htmlLink')}")
-    return created_event
+    print(f"📅 Scheduled {sum(1 for event in created if event)} of {len(events)} events for user {user_id}.")
+    if transient:
+        raise transient[0]
+    return created
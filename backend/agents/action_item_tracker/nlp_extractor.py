@@ -0,0 +1,141 @@
+import atexit
+import os
+import re
+import threading
+
+from lib.nltk_setup import require_nltk
+from lib.text_analysis import AnalyzedDocument, CUE_PHRASES, analyze
+
+# --- Staged NLTK action-item extraction ---
+# A sentence becomes an action item when it has more than four words and either contains
+# an action keyword or mentions a PERSON. POS tagging and the maxent NE chunker dominate
+# the cost, so sentences are screened first:
+#   1. the "action" cues of the shared analysis (lib/text_analysis) and a proper-noun
+#      screen (a capitalized word that is not a common word) drop sentences that can
+#      match neither rule
+#   2. the survivors are tokenized, tagged and NE-chunked in batch (pos_tag_sents /
+#      ne_chunk_sents); with NLP_EXTRACT_PROCESSES > 0, inputs of at least
+#      NLP_PROCESS_MIN_SENTENCES candidates are spread over a process pool
+# extract_action_items_unstaged() is the original per-sentence path, kept as the
+# reference for benchmarks/nlp_extraction.py and the parity test.
+
+NLP_EXTRACT_PROCESSES = int(os.getenv("NLP_EXTRACT_PROCESSES", "0"))
+NLP_PROCESS_MIN_SENTENCES = int(os.getenv("NLP_PROCESS_MIN_SENTENCES", "2000"))
+NLTK_PACKAGES = ("punkt", "averaged_perceptron_tagger", "maxent_ne_chunker", "words", "stopwords")
+
+ACTION_KEYWORDS = CUE_PHRASES["action"]
+_CAPITALIZED_WORD = re.compile(r"\b[A-Z][\w'-]*")
+MIN_TASK_WORDS = 5
+
+_common_words = None
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_common_words() -> frozenset:
+    global _common_words
+    if _common_words is None:
+        nltk = require_nltk("stopwords")
+        _common_words = frozenset(nltk.corpus.stopwords.words("english"))
+    return _common_words
+
+
+def _may_name_a_person(sent: str, common_words: frozenset) -> bool:
+    """True if the sentence has a capitalized word that could be tagged NNP (and so chunked as PERSON)."""
+    for match in _CAPITALIZED_WORD.finditer(sent):
+        word = match.group(0)
+        # A capitalized word mid-sentence is a proper noun candidate; at the start of the
+        # sentence only if it is not a common word capitalized by position ("The", "We").
+        if match.start() > 0 or word.lower() not in common_words:
+            return True
+    return False
+
+
+def screen_sentences(sentences: list) -> list:
+    """Returns (sentence text, has_keyword) for the analyzed sentences that can still become action items."""
+    common_words = _get_common_words()
+    candidates = []
+    for sentence in sentences:
+        sent = sentence.text
+        if len(sent.split()) < MIN_TASK_WORDS:
+            continue
+        has_keyword = "action" in sentence.cues
+        if has_keyword or _may_name_a_person(sent, common_words):
+            candidates.append((sent, has_keyword))
+    return candidates
+
+
+def _find_owners(sentences: list) -> list:
+    """Returns the PERSON names found in each sentence, tagging and chunking them in one batch."""
+    nltk = require_nltk("punkt", "averaged_perceptron_tagger", "maxent_ne_chunker", "words")
+    tagged = nltk.pos_tag_sents([nltk.word_tokenize(sent) for sent in sentences])
+    owners = []
+    for tree in nltk.ne_chunk_sents(tagged):
+        owners.append([
+            " ".join(word for word, tag in subtree.leaves())
+            for subtree in tree.subtrees(filter=lambda t: t.label() == 'PERSON')
+        ])
+    return owners
+
+
+def _get_pool():
+    global _pool
+    from concurrent.futures import ProcessPoolExecutor
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=NLP_EXTRACT_PROCESSES)
+            atexit.register(_pool.shutdown, wait=False)
+        return _pool
+
+
+def find_owners(sentences: list) -> list:
+    """_find_owners, spread over the process pool for long inputs when NLP_EXTRACT_PROCESSES > 0."""
+    if NLP_EXTRACT_PROCESSES <= 0 or len(sentences) < NLP_PROCESS_MIN_SENTENCES:
+        return _find_owners(sentences)
+    chunk_size = -(-len(sentences) // NLP_EXTRACT_PROCESSES)
+    chunks = [sentences[i:i + chunk_size] for i in range(0, len(sentences), chunk_size)]
+    owners = []
+    for chunk_owners in _get_pool().map(_find_owners, chunks):
+        owners.extend(chunk_owners)
+    return owners
+
+
+def _action_item(sent: str, owners: list) -> dict:
+    # A simple rule: if a person is mentioned, the whole sentence is the task.
+    # If we found a person, assign them as the owner.
+    return {
+        "owner": owners[0] if owners else "Unassigned",
+        "task": sent.strip(),
+        "deadline": None  # Deadline extraction can be a separate, complex task
+    }
+
+
+def extract_action_items(meeting_text: str, document: AnalyzedDocument = None) -> list:
+    """Extracts action items from text (or its existing analysis) with the staged pipeline."""
+    require_nltk(*NLTK_PACKAGES)
+    candidates = screen_sentences((document or analyze(meeting_text)).sentences)
+    if not candidates:
+        return []
+    owners_per_sentence = find_owners([sent for sent, _ in candidates])
+    return [
+        _action_item(sent, owners)
+        for (sent, has_keyword), owners in zip(candidates, owners_per_sentence)
+        if has_keyword or owners
+    ]
+
+
+def extract_action_items_unstaged(meeting_text: str) -> list:
+    """The original extractor: tags and NE-chunks every sentence before checking it."""
+    nltk = require_nltk("punkt", "averaged_perceptron_tagger", "maxent_ne_chunker", "words")
+    action_items = []
+    for sent in nltk.sent_tokenize(meeting_text):
+        tree = nltk.ne_chunk(nltk.pos_tag(nltk.word_tokenize(sent)))
+        owners = [
+            " ".join(word for word, tag in subtree.leaves())
+            for subtree in tree.subtrees(filter=lambda t: t.label() == 'PERSON')
+        ]
+        if any(keyword in sent.lower() for keyword in ACTION_KEYWORDS) or owners:
+            # Avoid adding duplicate or very short/generic sentences
+            if len(sent.strip().split()) > 4:
+                action_items.append(_action_item(sent, owners))
+    return action_items
@@ -1,109 +1,99 @@
 import os
-from .ai_providers import gemini_provider
-from .calendar_service import schedule_action_item
+import hashlib
+from collections import defaultdict
+from .calendar_service import build_event, schedule_events
 from .agenda_service import read_agenda
 from .action_item_service import save_action_items
+from . import nlp_extractor
+from .ai_providers import gemini_provider
 from ..agenda_planner.agenda_planner import generate_agenda
-import nltk
 from datetime import datetime, timedelta
-import dateparser
+from lib.dates import parse_local_date, to_local
+from lib.llm_gateway import LLMError
+from lib.text_analysis import analyze, summary_analysis_key
 # NEW: Import the function to get a specific minutes document
-from lib.database import get_minutes_by_id, save_action_item
-
-# The NLTK download logic has been moved to a central setup file (lib/nltk_setup.py)
-# and is run at server startup, so this loop is no longer needed here.
-# Temporary fix: Add download logic here to ensure resources are available.
-for resource in ['punkt', 'averaged_perceptron_tagger', 'maxent_ne_chunker', 'words']:
-    try:
-        # A simple find call is sufficient, the path logic is complex.
-        nltk.data.find(f'tokenizers/{resource}' if resource == 'punkt' else f'taggers/{resource}' if resource == 'averaged_perceptron_tagger' else f'chunkers/{resource}' if resource == 'maxent_ne_chunker' else f'corpora/{resource}')
-    except LookupError:
-        print(f"Downloading NLTK resource: {resource}")
-        nltk.download(resource)
+from lib.database import (
+    get_minutes_by_id,
+    set_action_item_event_ids,
+)
 
+# "gemini" extracts action items with Gemini (through the LLM gateway and its response
+# cache) and falls back to NLTK; "nlp" always uses the NLTK extractor.
+ACTION_ITEMS_PROVIDER = os.getenv("ACTION_ITEMS_PROVIDER", "gemini")
 
-def run_action_item_tracker(meeting_text: str):
-    # This function is kept as a fallback or for comparison
+def run_action_item_tracker(meeting_text: str, analysis_key: str = None):
+    """
+    Extracts action items with Gemini. Falls back to the NLTK extractor when Gemini fails,
+    its circuit breaker is open or its answer cannot be parsed.
+    """
+    try:
+        action_items = gemini_provider.extract_action_items(meeting_text)
+    except LLMError as e:
+        print(f"⚠️ Gemini action item extraction unavailable ({e}); falling back to NLP.")
+        return extract_action_items_nlp(meeting_text, analysis_key=analysis_key)
+    if not isinstance(action_items, list) or any(not isinstance(item, dict) or "error" in item for item in action_items):
+        print("⚠️ Gemini returned unparseable action items; falling back to NLP.")
+        return extract_action_items_nlp(meeting_text, analysis_key=analysis_key)
     return {
         "provider": "Gemini",
-        "action_items": gemini_provider.extract_action_items(meeting_text)
+        "action_items": action_items
     }
 
-def extract_action_items_nlp(meeting_text: str):
+def extract_action_items_nlp(meeting_text: str, analysis_key: str = None):
     """
     Extracts action items using NLTK with POS tagging and NER for better accuracy.
-    This is a more robust replacement for the spaCy implementation.
+    Sentences are screened by keyword before tagging; see nlp_extractor. With an
+    analysis_key, the sentence analysis cached under it is reused.
     """
-    action_items = []
-    sentences = nltk.sent_tokenize(meeting_text)
-
-    for sent in sentences:
-        words = nltk.word_tokenize(sent)
-        tagged_words = nltk.pos_tag(words)
-        
-        # Use NLTK's Named Entity Recognition to find people
-        tree = nltk.ne_chunk(tagged_words)
-        owners = []
-        for subtree in tree.subtrees(filter=lambda t: t.label() == 'PERSON'):
-            owners.append(" ".join([word for word, tag in subtree.leaves()]))
-
-        # Keywords indicating a task is being assigned
-        action_keywords = ["will", "needs to", "to-do", "action item", "task for", "responsible for"]
-        
-        # Check if the sentence likely contains an action item
-        if any(keyword in sent.lower() for keyword in action_keywords) or owners:
-            # A simple rule: if a person is mentioned, the whole sentence is the task.
-            # A more complex parser could be built here to find the specific verb phrase.
-            task_description = sent.strip()
-            
-            # If we found a person, assign them as the owner.
-            task_owner = owners[0] if owners else "Unassigned"
-
-            # Avoid adding duplicate or very short/generic sentences
-            if len(task_description.split()) > 4:
-                action_items.append({
-                    "owner": task_owner,
-                    "task": task_description,
-                    "deadline": None # Deadline extraction can be a separate, complex task
-                })
-
-    return {"provider": "NLP (NLTK)", "action_items": action_items}
+    document = analyze(meeting_text, key=analysis_key)
+    return {"provider": "NLP (NLTK)", "action_items": nlp_extractor.extract_action_items(meeting_text, document)}
 
-def extract_and_schedule_tasks(user_id: str, minutes_id: str, schedule=True):
+def _read_agenda_items(minutes_id: str, user_id: str) -> list:
+    if not minutes_id:
+        return []
+    # Pass the user_id to correctly fetch the agenda for the authenticated user
+    agenda = read_agenda(minutes_id, user_id)
+    return agenda.get("agenda", []) if agenda else []
+
+def _parse_duration(time_alloc: str) -> int:
+    try:
+        return int(time_alloc.split()[0])
+    except Exception:
+        return 60
+
+def _event_id(event_key: str, *parts) -> str:
     """
-    Reads a specific minutes document, extracts action items, and schedules them.
+    Deterministic Google Calendar event ID for an event in a run. Re-inserting the same
+    event after a partial failure then conflicts instead of creating a duplicate.
+    Hex digits are a subset of the base32hex alphabet Calendar requires.
     """
-    print("\n--- 🚀 Starting Action Item Tracker ---")
-    
-    # MODIFIED: Read a specific minutes document instead of the latest one
-    minutes_doc = get_minutes_by_id(minutes_id, user_id)
-    if not minutes_doc:
-        print(f"❌ Could not find minutes with ID '{minutes_id}' for user '{user_id}'. Aborting.")
+    if not event_key:
         return None
+    raw = "|".join([event_key] + [str(p) for p in parts])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:40]
 
+def prepare_action_items(user_id: str, minutes_doc: dict) -> dict:
+    """
+    Extracts action items from a minutes document (with ACTION_ITEMS_PROVIDER) and fills in
+    their durations and deadlines. Returns {"provider", "action_items"}.
+    """
     # Use the summary from the specific minutes document as the text to process
     meeting_text = minutes_doc.get("summary", "")
-    result = extract_action_items_nlp(meeting_text)
-    print(f"🔍 Found {len(result.get('action_items', []))} potential action items using NLP.")
+    analysis_key = summary_analysis_key(minutes_doc.get("_id"))
+    if ACTION_ITEMS_PROVIDER == "gemini":
+        result = run_action_item_tracker(meeting_text, analysis_key=analysis_key)
+    else:
+        result = extract_action_items_nlp(meeting_text, analysis_key=analysis_key)
+    print(f"🔍 Found {len(result.get('action_items', []))} potential action items using {result['provider']}.")
 
     meeting_date = minutes_doc.get("date")
     next_meeting_date = minutes_doc.get("next_meeting_date")
-
-    agenda_items = []
-    if minutes_id:
-        # Pass the user_id to correctly fetch the agenda for the authenticated user
-        agenda = read_agenda(minutes_id, user_id)
-        if agenda:
-            agenda_items = agenda.get("agenda", [])
+    agenda_items = _read_agenda_items(minutes_doc.get("_id"), user_id)
 
     # Assign durations to action items (for reference, not for scheduling)
     for idx, item in enumerate(result['action_items']):
         if idx < len(agenda_items):
-            time_alloc = agenda_items[idx].get("time_allocated", "60 mins")
-            try:
-                duration = int(time_alloc.split()[0])
-            except Exception:
-                duration = 60
+            duration = _parse_duration(agenda_items[idx].get("time_allocated", "60 mins"))
         else:
             duration = 60
         item["duration"] = duration
@@ -112,83 +102,128 @@ def extract_and_schedule_tasks(user_id: str, minutes_id: str, schedule=True):
                 item["deadline"] = next_meeting_date
             elif meeting_date:
                 item["deadline"] = meeting_date
+    return result
 
-    if schedule:
-        # 1️⃣ Schedule agenda topics sequentially on next_meeting_date
-        if next_meeting_date:
-            base_dt = dateparser.parse(next_meeting_date)
-            if not base_dt:
-                base_dt = datetime.now()
-            current_start = base_dt.replace(hour=9, minute=0, second=0, microsecond=0)
-            for idx, agenda_item in enumerate(agenda_items):
-                topic = agenda_item.get("topic", f"Agenda Item {idx+1}")
-                time_alloc = agenda_item.get("time_allocated", "60 mins")
-                try:
-                    duration = int(time_alloc.split()[0])
-                except Exception:
-                    duration = 60
-                schedule_action_item(
-                    user_id=user_id, # Pass user_id
-                    task_name=topic,
-                    description=f"Agenda topic: {topic}",
-                    deadline_str=current_start.strftime("%Y-%m-%d %H:%M"),
-                    owner="All",
-                    duration_minutes=duration
-                )
-                current_start += timedelta(minutes=duration)
-        # 2️⃣ Schedule each action item as a separate event on its deadline, staggered if same day
-        from collections import defaultdict
-        deadline_groups = defaultdict(list)
-        for item in result['action_items']:
-            deadline_groups[item['deadline']].append(item)
-        for deadline, items in deadline_groups.items():
-            base_dt = dateparser.parse(deadline)
-            if not base_dt:
-                base_dt = datetime.now()
-            current_start = base_dt.replace(hour=9, minute=0, second=0, microsecond=0)
-            for item in items:
-                task = item.get('task')
-                owner = item.get('owner')
-                description = f"Action item assigned to {owner}"
-                item_duration = item.get("duration", 60)
-                
-                # --- MODIFIED: Capture the created event ---
-                created_event = schedule_action_item(
-                    user_id=user_id, # Pass user_id
-                    task_name=task,
-                    description=description,
-                    deadline_str=current_start.strftime("%Y-%m-%d %H:%M"),
-                    owner=owner,
-                    duration_minutes=item_duration
-                )
-                
-                # --- MODIFIED: Store the Google Event ID if it exists ---
-                if created_event and 'id' in created_event:
-                    item['google_event_id'] = created_event['id']
-
-                current_start += timedelta(minutes=item_duration)
-    
-    # Save action items as separate documents and collect them
-    saved_items = []
-    if minutes_doc and minutes_doc.get("_id"):
-        for item in result['action_items']:
-            saved_item = save_action_item(item, user_id, minutes_doc["_id"])
-            saved_items.append(saved_item)
+def save_tracked_action_items(user_id: str, minutes_doc: dict, action_items: list, replace_existing: bool = False) -> list:
+    """
+    Saves action items as separate documents in one bulk write, writes them back onto the
+    minutes document, and returns them with their IDs.
+    With replace_existing, items from an earlier attempt on the same minutes are removed first
+    so that re-running the stage does not duplicate them.
+    """
+    if not (minutes_doc and minutes_doc.get("_id")):
+        return []
+    return save_action_items(minutes_doc["_id"], action_items, user_id, replace_existing=replace_existing)
+
+def schedule_tasks(user_id: str, minutes_doc: dict, action_items: list, event_key: str = None) -> dict:
+    """
+    Schedules the next meeting's agenda topics and every action item in Google Calendar,
+    submitting all events of the run through one batched call.
+    Sets 'google_event_id' on scheduled items and returns {action_item_id: google_event_id}.
+    When event_key is given, event IDs are derived from it so the call is idempotent.
+    """
+    next_meeting_date = minutes_doc.get("next_meeting_date")
+    agenda_items = _read_agenda_items(minutes_doc.get("_id"), user_id)
+    events = []
+    scheduled_items = []  # action item per event, None for agenda topics
+
+    # 1️⃣ Schedule agenda topics sequentially on next_meeting_date
+    if next_meeting_date:
+        base_dt = to_local(minutes_doc.get("next_meeting_date_utc")) or parse_local_date(next_meeting_date)
+        if not base_dt:
+            base_dt = datetime.now()
+        current_start = base_dt.replace(hour=9, minute=0, second=0, microsecond=0)
+        for idx, agenda_item in enumerate(agenda_items):
+            topic = agenda_item.get("topic", f"Agenda Item {idx+1}")
+            duration = _parse_duration(agenda_item.get("time_allocated", "60 mins"))
+            events.append(build_event(
+                task_name=topic,
+                description=f"Agenda topic: {topic}",
+                deadline_str=current_start.strftime("%Y-%m-%d %H:%M"),
+                owner="All",
+                duration_minutes=duration,
+                event_id=_event_id(event_key, "agenda", idx, topic)
+            ))
+            scheduled_items.append(None)
+            current_start += timedelta(minutes=duration)
+    # 2️⃣ Schedule each action item as a separate event on its deadline, staggered if same day
+    deadline_groups = defaultdict(list)
+    for idx, item in enumerate(action_items):
+        deadline_groups[item['deadline']].append((idx, item))
+    for deadline, items in deadline_groups.items():
+        base_dt = parse_local_date(deadline)
+        if not base_dt:
+            base_dt = datetime.now()
+        current_start = base_dt.replace(hour=9, minute=0, second=0, microsecond=0)
+        for idx, item in items:
+            task = item.get('task')
+            owner = item.get('owner')
+            description = f"Action item assigned to {owner}"
+            item_duration = item.get("duration", 60)
+
+            events.append(build_event(
+                task_name=task,
+                description=description,
+                deadline_str=current_start.strftime("%Y-%m-%d %H:%M"),
+                owner=owner,
+                duration_minutes=item_duration,
+                event_id=_event_id(event_key, "action", idx, task)
+            ))
+            scheduled_items.append(item)
+            current_start += timedelta(minutes=item_duration)
+
+    # 3️⃣ Submit every event of the run in one batched call
+    event_ids = {}
+    created_events = schedule_events(user_id, events)
+    for item, created_event in zip(scheduled_items, created_events):
+        # Store the Google Event ID on action items that were scheduled
+        if item is not None and created_event and 'id' in created_event:
+            item['google_event_id'] = created_event['id']
+            if item.get("_id"):
+                event_ids[item["_id"]] = created_event['id']
+
+    if event_ids:
+        set_action_item_event_ids(user_id, event_ids)
+    return event_ids
+
+def generate_next_agenda(user_id: str, minutes_doc: dict):
+    """Closes the loop by generating the next meeting's agenda from the minutes' future topics."""
+    if not (minutes_doc and minutes_doc.get("next_meeting_date")):
+        return None
+    print("\n--- 🔄 Closing the Loop: Generating Next Agenda ---")
+    next_meeting_input = {
+        "topics": minutes_doc.get("future_discussion_points", ["Review previous action items"]),
+        "discussion_points": [],  # <-- Only future topics, no action items
+        "date": minutes_doc.get("next_meeting_date")
+    }
+    print(f"🗓️  Input for next agenda on date: {next_meeting_input['date']}")
+    # Call the agenda planner to create the next agenda file
+    new_agenda = generate_agenda(next_meeting_input, user_id=user_id)
+    print(f"Successfully generated next agenda: {new_agenda.get('meeting_id')}")
+    return new_agenda
+
+def extract_and_schedule_tasks(user_id: str, minutes_id: str, schedule=True):
+    """
+    Reads a specific minutes document, extracts action items, and schedules them.
+    """
+    print("\n--- 🚀 Starting Action Item Tracker ---")
     
-    # Replace the original list with the saved items (which include IDs)
-    result['action_items'] = saved_items
+    # MODIFIED: Read a specific minutes document instead of the latest one
+    minutes_doc = get_minutes_by_id(minutes_id, user_id)
+    if not minutes_doc:
+        print(f"❌ Could not find minutes with ID '{minutes_id}' for user '{user_id}'. Aborting.")
+        return None
+
+    result = prepare_action_items(user_id, minutes_doc)
+    # Save action items as separate documents so the calendar events can reference their IDs.
+    # Items of an earlier run on these minutes are replaced: the event IDs below are derived
+    # from the minutes, so a re-run links the new items to the events already in the calendar.
+    saved_items = save_tracked_action_items(user_id, minutes_doc, result["action_items"], replace_existing=True)
+
+    if schedule:
+        schedule_tasks(user_id, minutes_doc, saved_items, event_key=minutes_doc["_id"])
 
     # --- NEW: Close the loop by generating the next agenda ---
-    if minutes_doc and minutes_doc.get("next_meeting_date"):
-        print("\n--- 🔄 Closing the Loop: Generating Next Agenda ---")
-        next_meeting_input = {
-            "topics": minutes_doc.get("future_discussion_points", ["Review previous action items"]),
-            "discussion_points": [],  # <-- Only future topics, no action items
-            "date": minutes_doc.get("next_meeting_date")
-        }
-        print(f"🗓️  Input for next agenda on date: {next_meeting_input['date']}")
-        # Call the agenda planner to create the next agenda file
-        new_agenda = generate_agenda(next_meeting_input, user_id=user_id)
-        print(f"Successfully generated next agenda: {new_agenda.get('meeting_id')}")
+    generate_next_agenda(user_id, minutes_doc)
 
-    return result
+    return {"provider": result["provider"], "action_items": saved_items}
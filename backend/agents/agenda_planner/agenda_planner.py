@@ -4,14 +4,9 @@ from .utils import (
     get_user_input_if_no_previous_file,
 )
 from lib.database import save_agenda
+from lib.model_registry import get_pipeline, SUMMARIZER_LARGE
+from .priority import assign_priorities
 from datetime import datetime
-from transformers import pipeline
-
-# 🧠 Initialize AI models once to be reused.
-# This prevents reloading large models on every function call.
-priority_classifier = pipeline("zero-shot-classification", model="facebook/bart-large-mnli")
-# ✨ NEW: Add a summarization model for generating meeting titles
-summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
 
 
 def assign_priority(topic):
@@ -19,16 +14,7 @@ def assign_priority(topic):
     Assign priority based on the semantic meaning of the topic using an AI model.
     """
     print(f"🤖 Analyzing topic for priority: '{topic}'")
-    candidate_labels = ["urgent issue", "strategic discussion", "general information"]
-    result = priority_classifier(topic, candidate_labels)
-    top_label = result['labels'][0]
-
-    if "urgent" in top_label:
-        return "urgent"
-    elif "discussion" in top_label:
-        return "discussion"
-    else:
-        return "info"
+    return assign_priorities([topic])[0]
 
 def allocate_time(priority):
     """Allocate time based on priority"""
@@ -48,6 +34,7 @@ def generate_meeting_name_ai(text):
 
     print(f"🤖 Generating meeting name with AI from topics...")
     # Generate a summary. We ask for a very short one (3-10 words).
+    summarizer = get_pipeline(*SUMMARIZER_LARGE)
     result = summarizer(text, max_length=10, min_length=3, do_sample=False)
     
     # Extract and clean up the title
@@ -73,11 +60,12 @@ def generate_agenda(user_input=None, user_id="user_placeholder_123"):
     all_topics = user_input.get("topics", []) + user_input.get("discussion_points", [])
 
     # 3️⃣ Generate agenda items
+    # All topics are classified in one batched call; cached topics skip inference.
+    priorities = assign_priorities(all_topics)
     agenda_items = []
-    for topic in all_topics:
+    for topic, priority in zip(all_topics, priorities):
         short_topics = extract_keywords_rake(topic, top_n=1) or [topic]
         short_topic = short_topics[0].title()
-        priority = assign_priority(topic)
         time_alloc = allocate_time(priority)
 
         agenda_items.append({
@@ -0,0 +1,151 @@
+import os
+import threading
+
+from lib import priority_cache
+from lib.model_registry import get_pipeline, ZERO_SHOT_CLASSIFIER
+
+# --- Batched topic priority classification ---
+# All topics of an agenda are classified in a single call to one of two engines:
+#   nli  - zero-shot NLI with bart-large-mnli (one forward pass per topic/label pair)
+#   fast - a small sentence-embedding model; each topic is assigned the priority whose
+#          label-prototype vector is most cosine-similar
+# Results are cached per normalized topic and engine model version, so cached topics
+# skip inference. Bump PRIORITY_MODEL_VERSION to invalidate the cache after changing a model.
+
+PRIORITY_ENGINE = os.getenv("PRIORITY_ENGINE", "nli")
+PRIORITY_BATCH_SIZE = int(os.getenv("PRIORITY_BATCH_SIZE", "8"))
+FAST_EMBEDDING_MODEL = ("feature-extraction", os.getenv("PRIORITY_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2"))
+
+CANDIDATE_LABELS = ["urgent issue", "strategic discussion", "general information"]
+
+# Example phrasings per priority; the fast engine averages their embeddings into one prototype each.
+LABEL_PROTOTYPES = {
+    "urgent": [
+        "urgent issue",
+        "critical problem that needs immediate attention",
+        "the production system is down",
+        "a blocker that must be fixed today",
+        "a deadline is at risk",
+    ],
+    "discussion": [
+        "strategic discussion",
+        "plan and decide on the next steps",
+        "review the budget and set priorities",
+        "brainstorm a new initiative",
+        "evaluate options for the roadmap",
+    ],
+    "info": [
+        "general information",
+        "a quick status update",
+        "an announcement for the team",
+        "an update on the holiday schedule",
+        "for your information, no decision needed",
+    ],
+}
+PRIORITIES = list(LABEL_PROTOTYPES)
+
+_prototypes = {}  # embedding model name -> (len(PRIORITIES), dim) matrix of unit vectors
+_prototypes_lock = threading.Lock()
+
+
+def _model_version(engine: str) -> str:
+    default = FAST_EMBEDDING_MODEL[1] if engine == "fast" else ZERO_SHOT_CLASSIFIER[1]
+    return os.getenv("PRIORITY_MODEL_VERSION", default)
+
+
+def _cache_labels(engine: str) -> list:
+    if engine == "fast":
+        return [f"{priority}:{phrase}" for priority, phrases in LABEL_PROTOTYPES.items() for phrase in phrases]
+    return CANDIDATE_LABELS
+
+
+def label_to_priority(label: str) -> str:
+    if "urgent" in label:
+        return "urgent"
+    elif "discussion" in label:
+        return "discussion"
+    return "info"
+
+
+def _classify_nli(topics: list) -> list:
+    classifier = get_pipeline(*ZERO_SHOT_CLASSIFIER)
+    results = classifier(list(topics), CANDIDATE_LABELS, batch_size=PRIORITY_BATCH_SIZE)
+    if isinstance(results, dict):
+        results = [results]
+    return [label_to_priority(result["labels"][0]) for result in results]
+
+
+def _normalize_rows(matrix):
+    import numpy as np
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+def embed_texts(texts: list):
+    """Mean-pooled token embeddings from the fast engine's model, one unit-length row per text."""
+    # NumPy is only needed by the fast engine, so it is imported on first use.
+    import numpy as np
+    extractor = get_pipeline(*FAST_EMBEDDING_MODEL)
+    # Items are encoded one at a time (no padding), so a plain mean over tokens is exact.
+    outputs = extractor(list(texts))
+    vectors = [np.asarray(output, dtype=np.float32).reshape(-1, np.shape(output)[-1]).mean(axis=0) for output in outputs]
+    return _normalize_rows(np.vstack(vectors))
+
+
+def _prototype_matrix():
+    import numpy as np
+    model_name = FAST_EMBEDDING_MODEL[1]
+    with _prototypes_lock:
+        if model_name not in _prototypes:
+            phrases = [phrase for priority in PRIORITIES for phrase in LABEL_PROTOTYPES[priority]]
+            embedded = embed_texts(phrases)
+            rows, start = [], 0
+            for priority in PRIORITIES:
+                count = len(LABEL_PROTOTYPES[priority])
+                rows.append(embedded[start:start + count].mean(axis=0))
+                start += count
+            _prototypes[model_name] = _normalize_rows(np.vstack(rows))
+        return _prototypes[model_name]
+
+
+def _classify_fast(topics: list) -> list:
+    import numpy as np
+    scores = embed_texts(topics) @ _prototype_matrix().T  # cosine similarity, (topics, priorities)
+    return [PRIORITIES[i] for i in np.argmax(scores, axis=1)]
+
+
+def classify_topics(topics: list, engine: str = None) -> list:
+    """Classifies topics with one batched call to the chosen engine and returns their priorities in order."""
+    if not topics:
+        return []
+    engine = engine or PRIORITY_ENGINE
+    print(f"🤖 Classifying {len(topics)} topic(s) for priority with the '{engine}' engine...")
+    # 🧠 The shared registry loads each model once per process, on first use.
+    if engine == "fast":
+        return _classify_fast(topics)
+    return _classify_nli(topics)
+
+
+def assign_priorities(topics: list, engine: str = None) -> list:
+    """
+    Returns a priority ("urgent", "discussion" or "info") for each topic, in order.
+    Topics that are cached, or repeated within the list, are only classified once.
+    `engine` is "nli" or "fast" and defaults to the PRIORITY_ENGINE setting.
+    """
+    engine = engine or PRIORITY_ENGINE
+    model_version = _model_version(engine)
+    labels = _cache_labels(engine)
+    keys = [priority_cache.cache_key(topic, model_version, labels) for topic in topics]
+    priorities = priority_cache.get_many(keys)
+
+    pending = {}
+    for key, topic in zip(keys, topics):
+        if key not in priorities and key not in pending:
+            pending[key] = topic
+    if pending:
+        classified = classify_topics(list(pending.values()), engine=engine)
+        new_entries = {key: (topic, priority) for (key, topic), priority in zip(pending.items(), classified)}
+        priorities.update({key: priority for key, (_, priority) in new_entries.items()})
+        priority_cache.store_many(new_entries, model_version)
+
+    return [priorities[key] for key in keys]
@@ -4,26 +4,11 @@ import json
 from pathlib import Path
 from collections import Counter
 
-# Ensure NLTK stopwords and punkt are downloaded
-import nltk
-for resource in ['stopwords', 'punkt']:
-    try:
-        nltk.data.find(f'corpora/{resource}' if resource == 'stopwords' else f'tokenizers/{resource}')
-    except LookupError:
-        nltk.download(resource)
-from rake_nltk import Rake
 from lib.database import get_document_count # Import the new DB function
+from lib.nltk_setup import require_nltk
 # Import the service that reads from the DB
 from ..action_item_tracker.previous_minutes_service import read_previous_minutes
 
-# Ensure NLTK stopwords are downloaded
-import nltk
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords')
-from sklearn.feature_extraction.text import TfidfVectorizer
-
 
 def load_json(file_path):
     """Load JSON data from a file"""
@@ -49,6 +34,8 @@ def get_next_meeting_id(user_id: str):
 
 def extract_keywords_tfidf(texts, top_n=5):
     """Extract keywords using TF-IDF"""
+    # scikit-learn is slow to import, so only pay for it when keywords are extracted.
+    from sklearn.feature_extraction.text import TfidfVectorizer
     vectorizer = TfidfVectorizer(stop_words="english")
     X = vectorizer.fit_transform(texts)
     scores = zip(vectorizer.get_feature_names_out(), X.toarray().sum(axis=0))
@@ -58,6 +45,8 @@ def extract_keywords_tfidf(texts, top_n=5):
 
 def extract_keywords_rake(text, top_n=5):
     """Extract keywords using RAKE and return only phrases (not scores)"""
+    require_nltk("stopwords", "punkt")
+    from rake_nltk import Rake
     rake = Rake()
     if isinstance(text, list):
         text = " ".join(text)  # join list into string
@@ -1,19 +1,17 @@
 import os
 import json
-import nltk
-from transformers import pipeline
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from lib.model_registry import get_pipeline, SUMMARIZER_SMALL
 from lib.database import save_minutes, get_latest_transcript
+from lib.nltk_setup import require_nltk
+from lib.text_analysis import AnalyzedDocument, analyze, summary_analysis_key, transcript_analysis_key
 from datetime import datetime, timedelta
 from bson.objectid import ObjectId
 
-# Ensure NLTK sentence tokenizer is downloaded
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
-
-def load_transcript_from_db(user_id: str, transcript_id: str = None) -> str:
-    """Loads a transcript text for a user from MongoDB. If transcript_id is provided, loads that specific transcript."""
+def load_transcript_doc_from_db(user_id: str, transcript_id: str = None):
+    """Loads a transcript document for a user from MongoDB. If transcript_id is provided, loads that specific transcript."""
     print(f"📖 Loading transcript from DB for user: {user_id}")
     from lib.database import get_latest_transcript, get_db
     db = get_db()
@@ -21,48 +19,155 @@ def load_transcript_from_db(user_id: str, transcript_id: str = None) -> str:
         transcript_doc = db.transcripts.find_one({"_id": ObjectId(transcript_id), "user_id": user_id})
     else:
         transcript_doc = get_latest_transcript(user_id)
-    if transcript_doc:
-        return transcript_doc.get("transcript", "")
-    print("⚠️ No transcript found in DB.")
-    return ""
+    if not transcript_doc:
+        print("⚠️ No transcript found in DB.")
+    return transcript_doc
+
+def load_transcript_from_db(user_id: str, transcript_id: str = None) -> str:
+    """Loads a transcript text for a user from MongoDB. If transcript_id is provided, loads that specific transcript."""
+    transcript_doc = load_transcript_doc_from_db(user_id, transcript_id)
+    return transcript_doc.get("transcript", "") if transcript_doc else ""
+
+# --- Map-reduce summarization settings ---
+# Chunks are packed from whole sentences up to SUMMARY_CHUNK_TOKENS model tokens,
+# summarized SUMMARY_BATCH_SIZE at a time, with up to SUMMARY_WORKERS batches in flight.
+SUMMARY_CHUNK_TOKENS = int(os.getenv("SUMMARY_CHUNK_TOKENS", "900"))
+SUMMARY_BATCH_SIZE = int(os.getenv("SUMMARY_BATCH_SIZE", "4"))
+SUMMARY_WORKERS = int(os.getenv("SUMMARY_WORKERS", "1"))
+CHUNK_SUMMARY_MAX_LENGTH = 120
+CHUNK_SUMMARY_MIN_LENGTH = 20
+FINAL_SUMMARY_MAX_LENGTH = 150
+FINAL_SUMMARY_MIN_LENGTH = 40
+
+def _count_tokens(tokenizer, text: str) -> int:
+    return len(tokenizer.encode(text, add_special_tokens=False))
+
+def iter_token_chunks(text: str, tokenizer, max_tokens: int):
+    """
+    Yields chunks of whole sentences that each fit in max_tokens model tokens.
+    Sentences longer than max_tokens are split on token boundaries.
+    """
+    current, current_tokens = [], 0
+    for sent in require_nltk("punkt").sent_tokenize(text):
+        token_ids = tokenizer.encode(sent, add_special_tokens=False)
+        if len(token_ids) > max_tokens:
+            if current:
+                yield " ".join(current)
+                current, current_tokens = [], 0
+            for start in range(0, len(token_ids), max_tokens):
+                yield tokenizer.decode(token_ids[start:start + max_tokens], skip_special_tokens=True)
+            continue
+        if current and current_tokens + len(token_ids) > max_tokens:
+            yield " ".join(current)
+            current, current_tokens = [], 0
+        current.append(sent)
+        current_tokens += len(token_ids)
+    if current:
+        yield " ".join(current)
+
+def _batched(iterable, size: int):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _summarize_batch(summarizer, batch: list, max_length: int, min_length: int) -> list:
+    outputs = summarizer(
+        batch,
+        max_length=max_length,
+        min_length=min_length,
+        do_sample=False,
+        truncation=True,
+        batch_size=len(batch),
+    )
+    return [output['summary_text'] for output in outputs]
+
+def summarize_chunks(summarizer, chunks, max_length: int = CHUNK_SUMMARY_MAX_LENGTH, min_length: int = CHUNK_SUMMARY_MIN_LENGTH) -> list:
+    """
+    Summarizes an iterable of chunks in batched forward passes, preserving order.
+    Only SUMMARY_WORKERS * 2 batches are held at once, so memory does not grow with transcript length.
+    """
+    batches = _batched(chunks, max(1, SUMMARY_BATCH_SIZE))
+    if SUMMARY_WORKERS <= 1:
+        summaries = []
+        for batch in batches:
+            summaries.extend(_summarize_batch(summarizer, batch, max_length, min_length))
+        return summaries
+
+    summaries = []
+    in_flight = deque()
+    with ThreadPoolExecutor(max_workers=SUMMARY_WORKERS, thread_name_prefix="summarize") as executor:
+        for batch in batches:
+            in_flight.append(executor.submit(_summarize_batch, summarizer, batch, max_length, min_length))
+            if len(in_flight) >= SUMMARY_WORKERS * 2:
+                summaries.extend(in_flight.popleft().result())
+        while in_flight:
+            summaries.extend(in_flight.popleft().result())
+    return summaries
 
 def generate_summary(text: str) -> str:
-    """Generates a summary of the text using a local transformer model."""
+    """
+    Generates a summary of the full transcript using map-reduce summarization:
+    chunks are summarized in batches, then the chunk summaries are summarized
+    again until they fit into a single model input.
+    """
     print("Generating summary...")
-    # Using a pre-trained model for summarization
-    summarizer = pipeline("summarization", model="sshleifer/distilbart-cnn-12-6")
-    # The model works best on text up to 1024 tokens. We'll truncate if necessary.
-    max_chunk_length = 1024
-    summary = summarizer(text[:max_chunk_length], max_length=150, min_length=40, do_sample=False)
+    # Reuse the process-wide summarization model instead of reloading it per call
+    summarizer = get_pipeline(*SUMMARIZER_SMALL)
+    tokenizer = summarizer.tokenizer
+    # Leave room for the special tokens the pipeline adds around each input.
+    max_tokens = min(SUMMARY_CHUNK_TOKENS, tokenizer.model_max_length - 8)
+
+    chunks = iter_token_chunks(text, tokenizer, max_tokens)
+    first_chunk = next(chunks, None)
+    second_chunk = next(chunks, None)
+    if first_chunk is None:
+        return ""
+
+    if second_chunk is None:
+        # Short transcript: a single pass is enough.
+        final_input = first_chunk
+    else:
+        partials = summarize_chunks(summarizer, chain([first_chunk, second_chunk], chunks))
+        level = 1
+        print(f"Summarized {len(partials)} chunks (level {level}).")
+        while len(partials) > 1 and _count_tokens(tokenizer, " ".join(partials)) > max_tokens:
+            reduced = summarize_chunks(summarizer, iter_token_chunks(" ".join(partials), tokenizer, max_tokens))
+            if len(reduced) >= len(partials):
+                # No further progress is possible; the final pass truncates the rest.
+                break
+            partials = reduced
+            level += 1
+            print(f"Reduced to {len(partials)} summaries (level {level}).")
+        final_input = " ".join(partials)
+
+    summary = _summarize_batch(summarizer, [final_input], FINAL_SUMMARY_MAX_LENGTH, FINAL_SUMMARY_MIN_LENGTH)
     print("Summary generated.")
-    return summary[0]['summary_text']
+    return summary[0]
 
-def extract_key_decisions(text: str) -> list:
-    """Extracts key decisions from the text using NLTK."""
+def extract_key_decisions(text: str, document: AnalyzedDocument = None) -> list:
+    """Extracts key decisions from the text (or its existing analysis) using decision cue phrases."""
     print("Extracting key decisions...")
-    decisions = []
-    # Keywords that often indicate a decision has been made
-    decision_keywords = ["we will", "we decided", "the decision is", "agreed to", "will proceed with"]
-    for sent in nltk.sent_tokenize(text):
-        if any(keyword in sent.lower() for keyword in decision_keywords):
-            decisions.append(sent.strip())
+    decisions = (document or analyze(text)).with_cue("decision")
     print(f"Found {len(decisions)} potential decisions.")
     return decisions
 
-def extract_future_topics(text: str) -> list:
-    """Extracts potential future topics from the text using NLTK."""
+def extract_future_topics(text: str, document: AnalyzedDocument = None) -> list:
+    """Extracts potential future topics from the text (or its existing analysis) using future-topic cue phrases."""
     print("Extracting future topics...")
-    future_topics = []
-    # Keywords that often indicate a future topic
-    future_keywords = ["next meeting", "discuss later", "in the future", "next time we should"]
-    for sent in nltk.sent_tokenize(text):
-        if any(keyword in sent.lower() for keyword in future_keywords):
-            future_topics.append(sent.strip())
+    future_topics = (document or analyze(text)).with_cue("future_topic")
     print(f"Found {len(future_topics)} potential future topics.")
     return future_topics
 
 def generate_minutes(user_id: str = "user_placeholder_123", transcript_id: str = None, transcript_text: str = None):
-    """Main function to generate and save meeting minutes to MongoDB."""
+    """
+    Main function to generate and save meeting minutes to MongoDB.
+    When transcript_text is given, transcript_id (if any) only keys the cached sentence analysis.
+    """
     print("\n--- 🚀 Starting Minutes Generator ---")
     
     transcript = ""
@@ -71,15 +176,20 @@ def generate_minutes(user_id: str = "user_placeholder_123", transcript_id: str =
         transcript = transcript_text
     elif transcript_id or user_id:
         # This now reads from the database instead of a file
-        transcript = load_transcript_from_db(user_id, transcript_id)
+        transcript_doc = load_transcript_doc_from_db(user_id, transcript_id)
+        if transcript_doc:
+            transcript = transcript_doc.get("transcript", "")
+            transcript_id = str(transcript_doc["_id"])
     
     if not transcript:
         print("Aborting: No transcript content to process.")
         return
 
     summary = generate_summary(transcript)
-    decisions = extract_key_decisions(transcript)
-    future_topics = extract_future_topics(transcript)
+    # One sentence analysis serves both extractors, and is reused for the same transcript later.
+    document = analyze(transcript, key=transcript_analysis_key(transcript_id))
+    decisions = extract_key_decisions(transcript, document)
+    future_topics = extract_future_topics(transcript, document)
 
     # Structure the output to be saved in the 'minutes' collection
     output_data = {
@@ -96,6 +206,8 @@ def generate_minutes(user_id: str = "user_placeholder_123", transcript_id: str =
     # Save the structured minutes to MongoDB
     inserted_id = save_minutes(output_data, user_id)
     output_data['_id'] = inserted_id # Add the ID to the returned data
+    # The action item tracker works on the summary; analyze it now so it finds it cached.
+    analyze(summary, key=summary_analysis_key(inserted_id))
 
     print(f"✅ Meeting minutes successfully saved to MongoDB with ID: {inserted_id}")
     print("--- ✨ Finished Minutes Generator ---\n")
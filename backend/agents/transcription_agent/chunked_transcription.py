@@ -0,0 +1,243 @@
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+
+from .media import probe_duration_seconds, detect_silences, extract_segment
+
+# --- Chunked transcription settings ---
+SEGMENT_SECONDS = float(os.getenv("TRANSCRIPTION_SEGMENT_SECONDS", "300"))
+OVERLAP_SECONDS = float(os.getenv("TRANSCRIPTION_OVERLAP_SECONDS", "15"))
+SILENCE_SEARCH_SECONDS = float(os.getenv("TRANSCRIPTION_SILENCE_SEARCH_SECONDS", "20"))
+MAX_WORKERS = int(os.getenv("TRANSCRIPTION_MAX_WORKERS", "4"))
+SEGMENT_RETRIES = int(os.getenv("TRANSCRIPTION_SEGMENT_RETRIES", "3"))
+RETRY_BACKOFF_SECONDS = float(os.getenv("TRANSCRIPTION_RETRY_BACKOFF_SECONDS", "2"))
+SEGMENT_TIMEOUT_SECONDS = float(os.getenv("TRANSCRIPTION_SEGMENT_TIMEOUT_SECONDS", "300"))
+SEGMENT_MODEL = "gemini-2.5-flash"
+
+SEGMENT_PROMPT = (
+    "Transcribe the audio from this file. Include speaker labels (diarization) for each part "
+    "of the conversation, using the format 'Speaker N: text' with each turn on its own line."
+)
+
+_SPEAKER_RE = re.compile(r"(Speaker\s+\d+)\s*:")
+
+
+@dataclass
+class AudioSegment:
+    index: int
+    start: float
+    end: float
+    path: str
+
+
+@dataclass
+class Turn:
+    speaker: str
+    text: str
+
+
+def plan_cut_points(duration: float, silences: list, segment_seconds: float = SEGMENT_SECONDS,
+                    search_seconds: float = SILENCE_SEARCH_SECONDS) -> list:
+    """
+    Picks segment boundaries roughly every segment_seconds, snapping each one to the
+    nearest silence within search_seconds so that cuts fall between words where possible.
+    """
+    cuts = []
+    target = segment_seconds
+    while target < duration:
+        nearby = [s for s in silences if abs(s - target) <= search_seconds and (not cuts or s > cuts[-1])]
+        cut = min(nearby, key=lambda s: abs(s - target)) if nearby else target
+        cuts.append(cut)
+        target = cut + segment_seconds
+    return cuts
+
+
+def split_audio(audio_path: str, workspace: str, segment_seconds: float = SEGMENT_SECONDS,
+                overlap_seconds: float = OVERLAP_SECONDS) -> list:
+    """Splits an audio file into overlapping segments, cutting at silences where possible."""
+    duration = probe_duration_seconds(audio_path)
+    cuts = plan_cut_points(duration, detect_silences(audio_path), segment_seconds)
+    bounds = [0.0] + cuts + [duration]
+
+    segments = []
+    for index in range(len(bounds) - 1):
+        start = max(0.0, bounds[index] - (overlap_seconds if index > 0 else 0.0))
+        end = bounds[index + 1]
+        path = os.path.join(workspace, f"segment_{index:03d}.mp3")
+        extract_segment(audio_path, start, end, path)
+        segments.append(AudioSegment(index=index, start=start, end=end, path=path))
+    print(f"✂️ Split {duration:.0f}s of audio into {len(segments)} segments.")
+    return segments
+
+
+def gemini_segment_transcriber(audio_bytes: bytes, mime_type: str, prompt: str) -> str:
+    """
+    Default segment transcriber: one Gemini call per segment through the LLM gateway.
+    The gateway retries retryable errors itself, so segments using it are not retried again.
+    """
+    from lib import llm_gateway
+    return llm_gateway.generate(
+        [prompt, {"mime_type": mime_type, "data": audio_bytes}],
+        model=SEGMENT_MODEL,
+        timeout=SEGMENT_TIMEOUT_SECONDS,
+        operation="transcription_segment",
+    )
+
+
+def _transcribe_with_retry(transcriber, segment: AudioSegment, prompt: str,
+                           retries: int, backoff_seconds: float) -> str:
+    with open(segment.path, "rb") as f:
+        audio_bytes = f.read()
+    for attempt in range(1, retries + 1):
+        try:
+            return transcriber(audio_bytes, "audio/mp3", prompt)
+        except Exception as e:
+            if attempt == retries:
+                raise RuntimeError(f"Segment {segment.index} failed after {retries} attempts: {e}") from e
+            wait = backoff_seconds * (2 ** (attempt - 1))
+            print(f"⚠️ Segment {segment.index} attempt {attempt} failed ({e}). Retrying in {wait:.1f}s...")
+            time.sleep(wait)
+
+
+def transcribe_segments(segments: list, transcriber=gemini_segment_transcriber, prompt: str = SEGMENT_PROMPT,
+                        max_workers: int = MAX_WORKERS, retries: int = None,
+                        backoff_seconds: float = RETRY_BACKOFF_SECONDS, on_segment_done=None) -> list:
+    """
+    Transcribes segments concurrently with a bounded worker pool, retrying each failed
+    segment on its own. Returns the segment transcripts in segment order.
+    `retries` defaults to 1 for the gateway transcriber, which retries internally, and
+    to SEGMENT_RETRIES for any other transcriber.
+    `on_segment_done(segment, completed, total)` is called as each segment finishes.
+    """
+    if retries is None:
+        retries = 1 if transcriber is gemini_segment_transcriber else SEGMENT_RETRIES
+    results = [None] * len(segments)
+    completed = [0]
+    completed_lock = threading.Lock()
+
+    def _run(segment):
+        text = _transcribe_with_retry(transcriber, segment, prompt, retries, backoff_seconds)
+        if on_segment_done:
+            with completed_lock:
+                completed[0] += 1
+                done = completed[0]
+            on_segment_done(segment, done, len(segments))
+        return text
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="transcribe") as executor:
+        futures = {executor.submit(_run, segment): i for i, segment in enumerate(segments)}
+        for future, i in futures.items():
+            results[i] = future.result()
+    return results
+
+
+# --- Stitching ---
+
+def parse_turns(text: str) -> list:
+    """Splits a diarized transcript into speaker turns. Leading unlabeled text is kept with speaker None."""
+    parts = _SPEAKER_RE.split(text)
+    turns = []
+    if parts[0].strip():
+        turns.append(Turn(speaker=None, text=parts[0].strip()))
+    for i in range(1, len(parts) - 1, 2):
+        speaker = re.sub(r"\s+", " ", parts[i])
+        body = parts[i + 1].strip()
+        if body:
+            turns.append(Turn(speaker=speaker, text=body))
+    return turns
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r"[^a-z0-9 ]", "", text.lower()).strip()
+
+
+def _similar(a: str, b: str) -> bool:
+    a, b = _normalize(a), _normalize(b)
+    if not a or not b:
+        return False
+    shorter, longer = sorted((a, b), key=len)
+    if len(shorter) >= 20 and shorter in longer:
+        return True
+    return SequenceMatcher(None, a, b).ratio() >= 0.75
+
+
+def _find_overlap(previous: list, following: list, window: int = 8):
+    """Finds the first turn of `following` that repeats one of the last turns of `previous`."""
+    for j in range(min(window, len(following))):
+        for i in range(len(previous) - 1, max(-1, len(previous) - 1 - window), -1):
+            if _similar(previous[i].text, following[j].text):
+                return i, j
+    return None
+
+
+def _next_speaker_label(used: set) -> str:
+    n = 1
+    while f"Speaker {n}" in used:
+        n += 1
+    return f"Speaker {n}"
+
+
+def stitch_transcripts(segment_texts: list) -> str:
+    """
+    Stitches per-segment transcripts into one transcript.
+
+    Turns repeated in the overlap between consecutive segments are kept once (the later
+    segment's copy, which is not cut off at the segment edge). Speaker labels of each
+    segment are mapped onto the labels already in use, using the speakers of the
+    overlapping turns as anchors.
+    """
+    stitched = []
+    for text in segment_texts:
+        turns = parse_turns(text or "")
+        if not turns:
+            continue
+        if not stitched:
+            stitched = turns
+            continue
+
+        mapping = {}
+        overlap = _find_overlap(stitched, turns)
+        if overlap:
+            i, j = overlap
+            k = 0
+            while i + k < len(stitched) and j + k < len(turns) and _similar(stitched[i + k].text, turns[j + k].text):
+                if turns[j + k].speaker and stitched[i + k].speaker:
+                    mapping.setdefault(turns[j + k].speaker, stitched[i + k].speaker)
+                k += 1
+            # Drop the earlier copy of the overlap and any cut-off tail after it.
+            stitched = stitched[:i]
+            turns = turns[j:]
+
+        used = {t.speaker for t in stitched if t.speaker}
+        claimed = set(mapping.values())
+        for turn in turns:
+            if turn.speaker and turn.speaker not in mapping:
+                # No anchor for this speaker: keep its label unless another speaker already took it.
+                if turn.speaker in claimed:
+                    mapping[turn.speaker] = _next_speaker_label(used | claimed)
+                else:
+                    mapping[turn.speaker] = turn.speaker
+                claimed.add(mapping[turn.speaker])
+
+        for turn in turns:
+            speaker = mapping.get(turn.speaker, turn.speaker)
+            if speaker is None and stitched:
+                # Unlabeled text at a segment start continues the previous speaker's turn.
+                stitched[-1] = Turn(speaker=stitched[-1].speaker, text=f"{stitched[-1].text} {turn.text}")
+                continue
+            stitched.append(Turn(speaker=speaker, text=turn.text))
+
+    return "\n".join(f"{t.speaker}: {t.text}" if t.speaker else t.text for t in stitched)
+
+
+def transcribe_audio_chunked(audio_path: str, workspace: str, transcriber=gemini_segment_transcriber,
+                             max_workers: int = MAX_WORKERS, on_segment_done=None) -> str:
+    """Splits, transcribes in parallel and stitches an audio file into a single transcript."""
+    segments = split_audio(audio_path, workspace)
+    texts = transcribe_segments(segments, transcriber=transcriber, max_workers=max_workers,
+                                on_segment_done=on_segment_done)
+    return stitch_transcripts(texts)
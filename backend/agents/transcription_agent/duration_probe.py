@@ -0,0 +1,152 @@
+import os
+import struct
+import threading
+import time
+from collections import OrderedDict
+
+from .ingest import resolve_download_url
+from .media import probe_duration_seconds
+
+# --- Media duration probing ---
+# Reads only container headers: MP4/MOV files are probed with a handful of HTTP range
+# requests that locate the `moov/mvhd` box; anything else falls back to ffprobe, which
+# also seeks with range requests instead of downloading the file.
+
+PROBE_TIMEOUT_SECONDS = float(os.getenv("DURATION_PROBE_TIMEOUT_SECONDS", "5"))
+PROBE_CACHE_TTL_SECONDS = int(os.getenv("DURATION_PROBE_CACHE_TTL_SECONDS", "3600"))
+PROBE_CACHE_SIZE = 1024
+_HEAD_BYTES = 64 * 1024
+_MAX_TOP_LEVEL_BOXES = 32
+
+_cache = OrderedDict()  # source -> (duration_seconds, probed_at)
+_cache_lock = threading.Lock()
+
+
+class _RangeReader:
+    """Reads byte ranges of a remote file, keeping the first _HEAD_BYTES in memory."""
+    def __init__(self, session, url: str):
+        self.session = session
+        self.url = url
+        self.head = b""
+        self.total_size = None
+
+    def fetch(self, start: int, length: int) -> bytes:
+        if start + length <= len(self.head):
+            return self.head[start:start + length]
+        response = self.session.get(
+            self.url,
+            headers={"Range": f"bytes={start}-{start + length - 1}"},
+            timeout=PROBE_TIMEOUT_SECONDS,
+            stream=True,
+        )
+        try:
+            if response.status_code != 206:
+                raise ValueError(f"Server does not support range requests (HTTP {response.status_code}).")
+            content_range = response.headers.get("Content-Range", "")
+            if self.total_size is None and "/" in content_range:
+                total = content_range.rsplit("/", 1)[1]
+                self.total_size = int(total) if total.isdigit() else None
+            data = response.raw.read(length)
+        finally:
+            response.close()
+        if start == 0:
+            self.head = data
+        return data
+
+
+def _parse_mvhd(payload: bytes) -> float:
+    version = payload[0]
+    if version == 1:
+        timescale, duration = struct.unpack(">IQ", payload[20:32])
+    else:
+        timescale, duration = struct.unpack(">II", payload[12:20])
+    if not timescale:
+        raise ValueError("mvhd box has a zero timescale.")
+    return duration / timescale
+
+
+def _read_box_header(reader: _RangeReader, offset: int):
+    header = reader.fetch(offset, 16)
+    if len(header) < 8:
+        return None
+    size, box_type = struct.unpack(">I4s", header[:8])
+    header_size = 8
+    if size == 1:
+        size = struct.unpack(">Q", header[8:16])[0]
+        header_size = 16
+    elif size == 0 and reader.total_size:
+        size = reader.total_size - offset
+    return size, box_type, header_size
+
+
+def mp4_duration_from_url(url: str, session=None) -> float:
+    """Finds moov/mvhd in a remote MP4/MOV with range requests and returns its duration in seconds."""
+    if session is None:
+        import requests
+        session = requests.Session()
+    reader = _RangeReader(session, url)
+    reader.fetch(0, _HEAD_BYTES)
+
+    offset = 0
+    for _ in range(_MAX_TOP_LEVEL_BOXES):
+        box = _read_box_header(reader, offset)
+        if box is None:
+            break
+        size, box_type, header_size = box
+        if box_type == b"moov":
+            child_offset = offset + header_size
+            moov_end = offset + size
+            while child_offset < moov_end:
+                child = _read_box_header(reader, child_offset)
+                if child is None:
+                    break
+                child_size, child_type, child_header = child
+                if child_type == b"mvhd":
+                    return _parse_mvhd(reader.fetch(child_offset + child_header, 32))
+                if child_size < 8:
+                    break
+                child_offset += child_size
+            break
+        if size < 8 or (reader.total_size and offset + size >= reader.total_size):
+            break
+        offset += size
+    raise ValueError("No moov/mvhd box found in container headers.")
+
+
+def _probe_uncached(source: str) -> float:
+    if os.path.exists(source):
+        return probe_duration_seconds(source)
+    url = resolve_download_url(source)
+    try:
+        return mp4_duration_from_url(url)
+    except Exception as e:
+        print(f"[INFO] Range probe failed for {source} ({e}). Falling back to ffprobe.")
+        return probe_duration_seconds(url)
+
+
+def get_media_duration_seconds(source: str):
+    """
+    Returns the duration of a local file or remote URL in seconds, or None if it
+    cannot be determined. Results are cached per source for PROBE_CACHE_TTL_SECONDS.
+    """
+    now = time.time()
+    with _cache_lock:
+        cached = _cache.get(source)
+        if cached and now - cached[1] < PROBE_CACHE_TTL_SECONDS:
+            _cache.move_to_end(source)
+            return cached[0]
+
+    started = time.perf_counter()
+    try:
+        duration = _probe_uncached(source)
+    except Exception as e:
+        print(f"Error determining media duration for {source}: {e}")
+        return None
+    print(f"⏱️ Probed duration of {source}: {duration:.1f}s in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    with _cache_lock:
+        _cache[source] = (duration, now)
+        _cache.move_to_end(source)
+        while len(_cache) > PROBE_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return duration
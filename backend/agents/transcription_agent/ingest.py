@@ -0,0 +1,116 @@
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+from contextlib import contextmanager
+
+from .media import FFMPEG_BIN
+
+# --- Streaming ingest ---
+# Remote recordings are never written to disk: ffmpeg reads the download directly
+# (or from a pipe we feed) and only the compact mono audio track is materialized.
+
+TEMP_ROOT = os.getenv("TRANSCRIPTION_TEMP_ROOT", os.path.join("data", "meeting_video", "temp"))
+AUDIO_SAMPLE_RATE = int(os.getenv("TRANSCRIPTION_AUDIO_SAMPLE_RATE", "16000"))
+AUDIO_BITRATE = os.getenv("TRANSCRIPTION_AUDIO_BITRATE", "32k")
+DOWNLOAD_CHUNK_BYTES = 1024 * 1024
+
+_DRIVE_ID_RE = re.compile(r"(?:/file/d/|[?&]id=)([\w-]{20,})")
+
+
+@contextmanager
+def job_workspace(prefix: str = "job_"):
+    """Creates a private temp directory for one transcription job and always removes it."""
+    os.makedirs(TEMP_ROOT, exist_ok=True)
+    workspace = tempfile.mkdtemp(prefix=prefix, dir=TEMP_ROOT)
+    try:
+        yield workspace
+    finally:
+        shutil.rmtree(workspace, ignore_errors=True)
+
+
+def resolve_download_url(video_url: str) -> str:
+    """Turns a Google Drive share link into a direct download URL; other URLs are returned as-is."""
+    if "drive.google.com" in video_url:
+        match = _DRIVE_ID_RE.search(video_url)
+        if match:
+            return f"https://drive.usercontent.google.com/download?id={match.group(1)}&export=download&confirm=t"
+    return video_url
+
+
+def _audio_output_args(output_path: str) -> list:
+    return ["-vn", "-ac", "1", "-ar", str(AUDIO_SAMPLE_RATE), "-c:a", "libmp3lame", "-b:a", AUDIO_BITRATE, output_path]
+
+
+def extract_audio_from_file(video_path: str, output_path: str) -> str:
+    """Extracts a mono, low-sample-rate MP3 from a local media file."""
+    subprocess.run(
+        [FFMPEG_BIN, "-hide_banner", "-loglevel", "error", "-y", "-i", video_path] + _audio_output_args(output_path),
+        check=True,
+    )
+    return output_path
+
+
+def _extract_via_ffmpeg_http(url: str, output_path: str):
+    # ffmpeg's HTTP reader uses range requests to seek, so MP4s with a trailing
+    # moov atom work without buffering the whole file.
+    subprocess.run(
+        [FFMPEG_BIN, "-hide_banner", "-loglevel", "error", "-y",
+         "-reconnect", "1", "-reconnect_streamed", "1", "-reconnect_delay_max", "5",
+         "-i", url] + _audio_output_args(output_path),
+        check=True,
+    )
+
+
+def _extract_via_pipe(url: str, output_path: str):
+    # Fallback for servers ffmpeg cannot read directly: stream the body into ffmpeg's stdin.
+    import requests
+
+    process = subprocess.Popen(
+        [FFMPEG_BIN, "-hide_banner", "-loglevel", "error", "-y", "-i", "pipe:0"] + _audio_output_args(output_path),
+        stdin=subprocess.PIPE,
+    )
+    error = []
+
+    def _feed():
+        try:
+            with requests.get(url, stream=True, timeout=(10, 60)) as response:
+                response.raise_for_status()
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_BYTES):
+                    process.stdin.write(chunk)
+        except BrokenPipeError:
+            pass  # ffmpeg already has what it needs
+        except Exception as e:
+            error.append(e)
+        finally:
+            try:
+                process.stdin.close()
+            except BrokenPipeError:
+                pass
+
+    feeder = threading.Thread(target=_feed, name="ingest-feed", daemon=True)
+    feeder.start()
+    return_code = process.wait()
+    feeder.join()
+    if error:
+        raise error[0]
+    if return_code != 0:
+        raise subprocess.CalledProcessError(return_code, FFMPEG_BIN)
+
+
+def extract_audio_from_url(video_url: str, output_path: str) -> str:
+    """
+    Streams a remote recording straight into ffmpeg and writes only the audio track
+    (mono, AUDIO_SAMPLE_RATE Hz) to output_path. The video itself never touches disk.
+    """
+    url = resolve_download_url(video_url)
+    print(f"Streaming audio from URL: {video_url}")
+    try:
+        _extract_via_ffmpeg_http(url, output_path)
+    except subprocess.CalledProcessError as e:
+        print(f"Direct ffmpeg read failed ({e}). Falling back to piped download.")
+        _extract_via_pipe(url, output_path)
+    print(f"Audio extracted to: {output_path} ({os.path.getsize(output_path) / (1024 * 1024):.1f} MB)")
+    return output_path
@@ -0,0 +1,55 @@
+import json
+import os
+import re
+import subprocess
+
+# Thin wrappers around the ffmpeg / ffprobe binaries used by the transcription agent.
+FFMPEG_BIN = os.getenv("FFMPEG_BIN", "ffmpeg")
+FFPROBE_BIN = os.getenv("FFPROBE_BIN", "ffprobe")
+
+_SILENCE_START_RE = re.compile(r"silence_start:\s*(-?[\d.]+)")
+_SILENCE_END_RE = re.compile(r"silence_end:\s*([\d.]+)")
+
+
+def probe_duration_seconds(path: str, timeout: float = 30) -> float:
+    """Reads the container duration of a media file or URL with ffprobe (headers only, no decoding)."""
+    result = subprocess.run(
+        [FFPROBE_BIN, "-v", "error", "-show_entries", "format=duration", "-of", "json", path],
+        capture_output=True, text=True, check=True, timeout=timeout,
+    )
+    return float(json.loads(result.stdout)["format"]["duration"])
+
+
+def detect_silences(path: str, noise_db: int = -30, min_silence_seconds: float = 0.5) -> list:
+    """
+    Returns the midpoints (in seconds) of every silent stretch in an audio file.
+    Runs ffmpeg's silencedetect filter, which decodes audio without writing any output.
+    """
+    result = subprocess.run(
+        [FFMPEG_BIN, "-hide_banner", "-nostats", "-i", path,
+         "-af", f"silencedetect=noise={noise_db}dB:d={min_silence_seconds}", "-f", "null", "-"],
+        capture_output=True, text=True,
+    )
+    midpoints = []
+    start = None
+    for line in result.stderr.splitlines():
+        start_match = _SILENCE_START_RE.search(line)
+        if start_match:
+            start = max(0.0, float(start_match.group(1)))
+            continue
+        end_match = _SILENCE_END_RE.search(line)
+        if end_match and start is not None:
+            midpoints.append((start + float(end_match.group(1))) / 2)
+            start = None
+    return midpoints
+
+
+def extract_segment(path: str, start: float, end: float, output_path: str) -> str:
+    """Cuts [start, end) seconds out of an audio file into a mono 16 kHz MP3."""
+    subprocess.run(
+        [FFMPEG_BIN, "-hide_banner", "-loglevel", "error", "-y",
+         "-ss", f"{start:.3f}", "-t", f"{end - start:.3f}", "-i", path,
+         "-ac", "1", "-ar", "16000", "-c:a", "libmp3lame", "-b:a", "48k", output_path],
+        check=True,
+    )
+    return output_path
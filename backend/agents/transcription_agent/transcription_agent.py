@@ -1,25 +1,36 @@
 import os
 import json
 import time
-import gdown
-from google.generativeai import GenerativeModel
-import google.generativeai as genai
-from dotenv import load_dotenv
+import asyncio
 # --- NEW: Import the specific error class ---
 from pymongo.errors import ConnectionFailure
-import moviepy.editor as mp
-
-def configure_gemini():
-    """
-    Configures the Gemini API with the key from environment variables.
-    """
-    load_dotenv()
-    api_key = os.getenv("GOOGLE_API_KEY")
-    if not api_key:
-        raise ValueError("GOOGLE_API_KEY not found in environment variables. Please set it in your .env file.")
-    genai.configure(api_key=api_key)
-
-def transcribe_video(video_path: str = None, video_url: str = None, user_id: str = "user_placeholder_123"):
+from .chunked_transcription import transcribe_audio_chunked, SEGMENT_PROMPT
+from .ingest import job_workspace, extract_audio_from_url, extract_audio_from_file, resolve_download_url
+from .duration_probe import get_media_duration_seconds
+from lib import transcript_cache, llm_gateway
+
+# "single" sends the whole recording in one request; "chunked" splits it into
+# overlapping segments that are transcribed in parallel and stitched back together;
+# "auto" picks chunked for recordings longer than CHUNKED_THRESHOLD_MINUTES.
+TRANSCRIPTION_MODE = os.getenv("TRANSCRIPTION_MODE", "auto")
+CHUNKED_THRESHOLD_MINUTES = float(os.getenv("TRANSCRIPTION_CHUNKED_THRESHOLD_MINUTES", "20"))
+TRANSCRIPTION_MODEL = "gemini-2.5-flash"
+TRANSCRIPTION_TIMEOUT_SECONDS = float(os.getenv("TRANSCRIPTION_TIMEOUT_SECONDS", "900"))
+TRANSCRIPTION_PROMPT = "Transcribe the audio from this file. Include speaker labels (diarization) for each part of the conversation. For example: 'Speaker 1: Hello there. Speaker 2: Hi, how are you?'"
+
+def should_chunk(source: str) -> bool:
+    """Decides between single-shot and chunked transcription for a source."""
+    if TRANSCRIPTION_MODE in ("single", "chunked"):
+        return TRANSCRIPTION_MODE == "chunked"
+    duration = get_media_duration_seconds(source)
+    if duration is None:
+        return False
+    chunked = duration / 60 > CHUNKED_THRESHOLD_MINUTES
+    print(f"Recording is {duration / 60:.1f} min; using {'chunked' if chunked else 'single-shot'} transcription.")
+    return chunked
+
+def transcribe_video(video_path: str = None, video_url: str = None, user_id: str = "user_placeholder_123", chunked: bool = None,
+                     on_segment_done=None):
     """
     Transcribes a video file using the Gemini model, downloading it if a URL is provided.
 
@@ -27,6 +38,10 @@ def transcribe_video(video_path: str = None, video_url: str = None, user_id: str
         video_path (str, optional): The local path to the video file.
         video_url (str, optional): A public URL (e.g., Google Drive) to the video file.
         user_id (str): The ID of the user to associate the transcript with.
+        chunked (bool, optional): Force chunked (True) or single-shot (False) transcription.
+            Defaults to the TRANSCRIPTION_MODE environment setting ("auto" decides by duration).
+        on_segment_done (callable, optional): Called as (segment, completed, total) after each
+            audio segment of a chunked transcription finishes.
 
     Returns:
         str: The generated transcript text, or None if an error occurred.
@@ -34,72 +49,62 @@ def transcribe_video(video_path: str = None, video_url: str = None, user_id: str
     if not video_path and not video_url:
         raise ValueError("Either video_path or video_url must be provided.")
 
-    local_video_path = video_path
-    is_temp_file = False
-    temp_video_path = None
-    temp_audio_path = None
+    if chunked is None:
+        chunked = should_chunk(video_url or video_path)
+    prompt = SEGMENT_PROMPT if chunked else TRANSCRIPTION_PROMPT
+    source = video_url or os.path.abspath(video_path)
+
+    # 0. A resubmitted URL whose ETag hasn't changed skips download and extraction entirely.
+    source_key = None
+    if video_url:
+        etag = transcript_cache.fetch_etag(resolve_download_url(video_url))
+        if etag:
+            source_key = transcript_cache.source_cache_key(video_url, etag, TRANSCRIPTION_MODEL, prompt)
+            cached = transcript_cache.get_by_source(source_key)
+            if cached:
+                return cached
 
     try:
-        # 1. Configure the Gemini API
-        configure_gemini()
-
-        # 2. Download the video if a URL is provided
-        if video_url:
-            print(f"Downloading video from URL: {video_url}")
-            # Define a temporary path for the downloaded file
-            temp_dir = "data/meeting_video/temp"
-            os.makedirs(temp_dir, exist_ok=True)
-            # Download video from URL
-            temp_video_path = os.path.join(temp_dir, "downloaded_video.mp4")
-            gdown.download(video_url, temp_video_path, quiet=False, fuzzy=True)
-            print(f"Video downloaded to temporary path: {temp_video_path}")
-
-            # Convert video to audio
-            print(f"Converting video to audio...")
-            temp_audio_path = os.path.join(temp_dir, "extracted_audio.mp3")
-            try:
-                video_clip = mp.VideoFileClip(temp_video_path)
-                video_clip.audio.write_audiofile(temp_audio_path, codec='mp3')
-                video_clip.close()
-                print(f"Audio extracted to: {temp_audio_path}")
-                upload_path = temp_audio_path
-            except Exception as e:
-                print(f"Audio extraction failed: {e}. Falling back to video upload.")
-                upload_path = temp_video_path
-        else:
-            upload_path = local_video_path
-
-        # 3. Process the audio file with Gemini
-        print(f"Processing file: {upload_path}...")
-        
-        # Create a model instance
-        model = GenerativeModel("gemini-2.5-flash")
-        
-        # Read the audio file
-        with open(upload_path, "rb") as f:
-            audio_data = f.read()
-        
-        # Create the prompt for transcription
-        prompt = "Transcribe the audio from this file. Include speaker labels (diarization) for each part of the conversation. For example: 'Speaker 1: Hello there. Speaker 2: Hi, how are you?'"
-        
-        # Generate the transcription
-        response = model.generate_content([
-            prompt,
-            {"mime_type": "audio/mp3", "data": audio_data}
-        ])
-        
-        # Extract the transcript
-        transcript = response.text
+        # 1. Extract a compact audio track into a per-job workspace. Remote videos are
+        #    streamed straight into ffmpeg, so the video never lands on disk.
+        with job_workspace() as workspace:
+            audio_path = os.path.join(workspace, "audio.mp3")
+            if video_url:
+                extract_audio_from_url(video_url, audio_path)
+            else:
+                extract_audio_from_file(video_path, audio_path)
+
+            # Same audio, source and prompt as an earlier job: reuse its transcript.
+            audio_key = transcript_cache.audio_cache_key(audio_path, source, TRANSCRIPTION_MODEL, prompt)
+            cached = transcript_cache.get_by_audio(audio_key)
+            if cached:
+                if source_key:
+                    transcript_cache.store(audio_key, cached, source, TRANSCRIPTION_MODEL, source_key)
+                return cached
+
+            # 2. Process the audio file with Gemini (configured by the LLM gateway on first use)
+            print(f"Processing file: {audio_path}...")
+
+            if chunked:
+                transcript = transcribe_audio_chunked(audio_path, workspace, on_segment_done=on_segment_done)
+            else:
+                # Read the audio file (mono, low sample rate, so this stays small)
+                with open(audio_path, "rb") as f:
+                    audio_data = f.read()
+
+                # Generate the transcription
+                transcript = llm_gateway.generate(
+                    [prompt, {"mime_type": "audio/mp3", "data": audio_data}],
+                    model=TRANSCRIPTION_MODEL,
+                    timeout=TRANSCRIPTION_TIMEOUT_SECONDS,
+                    operation="transcription",
+                )
+
+        transcript_cache.store(audio_key, transcript, source, TRANSCRIPTION_MODEL, source_key)
+
         print("\n--- Transcription ---")
         print(transcript)
         print("---------------------\n")
-
-        print("Cleaning up temporary files...")
-        # Clean up temporary files
-        if temp_video_path and os.path.exists(temp_video_path):
-            os.remove(temp_video_path)
-        if temp_audio_path and os.path.exists(temp_audio_path):
-            os.remove(temp_audio_path)
         print("--- ✅ Finished Transcription Agent ---")
 
         return transcript
@@ -125,43 +130,26 @@ def transcribe_video(video_path: str = None, video_url: str = None, user_id: str
 async def get_video_length(video_url: str) -> float:
     """
     Gets the length of a video in minutes from a URL.
-    
-    This function checks if the URL contains length information or uses
-    a default value for testing. In production, this should be replaced
-    with actual video length detection.
-    
+
+    Only container headers are read (HTTP range requests for remote MP4/MOV,
+    ffprobe otherwise) and results are cached per URL.
+
     Args:
         video_url: URL to the video file
-    
+
     Returns:
-        Float representing video length in minutes
+        Float representing video length in minutes, or None if it could not be determined
     """
-    try:
-        # Option 1: Check if the URL contains length information (as a query parameter)
-        import re
-        
-        length_match = re.search(r"length=(\d+)", video_url)
-        if length_match:
-            # Length parameter is present in the URL
-            return float(length_match.group(1))
-        
-        # Option 2: For development/testing, you can add special prefixes to test different lengths
-        if video_url.startswith("test:short:"):
-            return 10.0  # 10 minute video (within free tier)
-        elif video_url.startswith("test:long:"):
-            return 20.0  # 20 minute video (exceeds free tier)
-            
-        # Option 3: In a production implementation, you would:
-        # - For Google Drive: Use Drive API to get metadata
-        # - For direct uploads: Use ffmpeg or moviepy to check duration
-        
-        print(f"[INFO] Estimating video length for {video_url}")
-        return 10.0  # Default to 10 minutes for testing
-        
-    except Exception as e:
-        print(f"Error determining video length: {e}")
-        # Default to a safe value for development
-        return 10.0
+    # For development/testing, you can add special prefixes to test different lengths
+    if video_url.startswith("test:short:"):
+        return 10.0  # 10 minute video (within free tier)
+    elif video_url.startswith("test:long:"):
+        return 20.0  # 20 minute video (exceeds free tier)
+
+    duration_seconds = await asyncio.to_thread(get_media_duration_seconds, video_url)
+    if duration_seconds is None:
+        return None
+    return duration_seconds / 60
 
 if __name__ == '__main__':
     # --- How to use this script ---
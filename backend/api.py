@@ -1,31 +1,44 @@
-from fastapi import FastAPI, Body, Depends, HTTPException, BackgroundTasks # Import BackgroundTasks
+import asyncio
+from fastapi import FastAPI, Body, Depends, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse, JSONResponse
 from agents.agenda_planner.agenda_planner import generate_agenda
 from agents.minutes_generator.minutes_generator import generate_minutes
 from agents.action_item_tracker.tracker import extract_and_schedule_tasks
 from agents.transcription_agent.transcription_agent import transcribe_video, get_video_length
-from agents.action_item_tracker.calendar_service import schedule_action_item, SCOPES
-import dateparser
+from agents.action_item_tracker.calendar_service import schedule_action_item, invalidate_calendar_service, SCOPES
 from bson import ObjectId
-from datetime import datetime
+from datetime import datetime, timedelta
 import os
-from lib.auth import get_current_user
+from lib.auth import get_current_user, get_current_user_for_stream, get_auth_stats
+from lib.dates import to_utc, to_local, BACKFILL_DATES_ON_STARTUP, backfill_dates_in_background
 from lib.database import (
     get_db,
-    get_all_agendas_for_user,
-    get_all_action_items_for_user,
+    ping_db,
     get_agenda,
-    get_all_minutes_for_user,
     get_minutes_by_id,
     update_agenda,
+    delete_agenda,
+    update_action_item,
+    get_transcript_by_id,
     save_meeting,
-    get_all_meetings_for_user,
     update_meeting,
     delete_meeting,
     save_transcript, # <-- Import save_transcript
     save_google_credentials,
     get_google_credentials,
-    delete_google_credentials
+    delete_google_credentials,
+    list_transcripts,
+    list_minutes,
+    list_agendas,
+    list_action_items,
+    list_meetings,
+    get_meetings_in_range,
+    get_action_items_in_range,
+    list_upcoming_action_items,
+    UPCOMING_ACTION_ITEMS_LIMIT,
+    LIST_PAGE_SIZE,
+    MAX_LIST_PAGE_SIZE
 )
 from lib.notifications import (
     get_user_notifications,
@@ -42,9 +55,21 @@ from lib.quota import (
     increment_automation_cycle,
     check_free_tier_limits,
     get_monthly_transcription_count,
+    get_all_quotas,
+    RECONCILE_USAGE_JOB,
+    FREE_TIER_MINUTES_HISTORY,
 )
-from google_auth_oauthlib.flow import Flow
-from google.auth.transport.requests import Request
+from lib.checkpoints import automation_run_key, has_incomplete_run
+from lib.jobs import JobWorker, get_job_store, enqueue_job
+from lib.progress import publish_job_status, subscribe, latest_progress, stream_job_events, shutdown_progress, TERMINAL_STATUSES
+from automation import AUTOMATION_JOB, JOB_HANDLERS
+from lib.executors import run_io, run_inference, run_transcription, get_executor_stats, shutdown_pools
+from lib.model_registry import warmup_models, get_model_stats, models_loaded
+from lib.indexes import MONGO_ENSURE_INDEXES, ensure_indexes_in_background
+from lib.transcript_cache import get_cache_stats as get_transcription_cache_stats
+from lib.priority_cache import get_cache_stats as get_priority_cache_stats
+from lib.llm_gateway import get_llm_stats
+from lib.llm_cache import get_cache_stats as get_llm_cache_stats
 from clerk_backend_api import Clerk 
 # --- ADD THIS IMPORT FOR DETAILED ERROR LOGGING ---
 import traceback
@@ -60,54 +85,53 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# +++ AUTOMATION FLOW +++
-def run_full_automation_flow(user_id: str, meeting_id: str, video_url: str = None, transcript_text: str = None):
-    """
-    This function runs in the background. It orchestrates the entire agent chain.
-    """
-    notifier = AutomationNotifier(user_id, meeting_id)
-    try:
-        print(f"🤖 [Auto-Flow] Starting for user {user_id}, meeting {meeting_id}")
-        notifier.start()
-
-        # --- Step 1: Transcription (if needed) ---
-        if video_url:
-            notifier.step_transcribe()
-            print(f"🤖 [Auto-Flow] Step 1: Transcribing video...")
-            transcript_text = transcribe_video(video_url=video_url, user_id=user_id)
-            if not transcript_text:
-                raise ValueError("Transcription failed to produce text.")
-            save_transcript(transcript_text, user_id, meeting_id, f"Meeting {meeting_id}", str(datetime.utcnow().date()), automated=True)
-            print(f"🤖 [Auto-Flow] Step 1 Complete: Transcription saved.")
-
-        # --- Step 2: Generate Minutes ---
-        notifier.step_minutes()
-        print(f"🤖 [Auto-Flow] Step 2: Generating minutes...")
-        minutes_data = generate_minutes(user_id=user_id, transcript_text=transcript_text)
-        if not minutes_data or not minutes_data.get("_id"):
-            raise ValueError("Minutes generation failed.")
-        minutes_id = minutes_data["_id"]
-        print(f"🤖 [Auto-Flow] Step 2 Complete: Minutes generated with ID {minutes_id}.")
-
-        # --- Step 3: Generate Action Items ---
-        notifier.step_actions()
-        print(f"🤖 [Auto-Flow] Step 3: Extracting action items...")
-        extract_and_schedule_tasks(user_id=user_id, minutes_id=minutes_id)
-        print(f"🤖 [Auto-Flow] Step 3 Complete: Action items extracted and scheduled.")
-
-        # --- Final Step: Increment Quota & Notify ---
-        increment_automation_cycle(meeting_id, user_id)
-        notifier.success()
-        print(f"🤖 [Auto-Flow] Success for user {user_id}, meeting {meeting_id}")
+# Heavy dependencies (transformers/torch, NLTK, scikit-learn, the Google SDKs, dateparser)
+# are imported by the code paths that use them, so importing this module stays fast.
+MODEL_WARMUP = os.getenv("MODEL_WARMUP", "0") == "1"
+
+@app.on_event("startup")
+def warmup_models_on_startup():
+    """Optionally preloads the shared HF models in the background (set MODEL_WARMUP=1)."""
+    if MODEL_WARMUP:
+        print("🔥 Warming up models in the background...")
+        warmup_models(background=True)
+
+@app.on_event("startup")
+def ensure_indexes_on_startup():
+    """Creates any missing Mongo indexes in the background (disable with MONGO_ENSURE_INDEXES=0)."""
+    if MONGO_ENSURE_INDEXES:
+        ensure_indexes_in_background()
+
+@app.on_event("startup")
+def backfill_dates_on_startup():
+    """Normalizes the dates of documents that predate lib/dates.py in the background (disable with BACKFILL_DATES_ON_STARTUP=0)."""
+    if BACKFILL_DATES_ON_STARTUP:
+        backfill_dates_in_background()
+
+# Jobs are processed by separate `python worker.py` processes, so the API process only
+# serves requests. For single-process local development, set JOB_WORKERS_IN_PROCESS=1
+# (or more) to also run that many job slots inside the API.
+JOB_WORKERS_IN_PROCESS = int(os.getenv("JOB_WORKERS_IN_PROCESS", "0"))
+_in_process_worker = None
+
+@app.on_event("startup")
+def start_in_process_worker():
+    global _in_process_worker
+    if JOB_WORKERS_IN_PROCESS > 0:
+        _in_process_worker = JobWorker(
+            get_job_store(), JOB_HANDLERS, concurrency=JOB_WORKERS_IN_PROCESS, on_status=publish_job_status
+        )
+        _in_process_worker.start()
 
-    except Exception as e:
-        error_reason = str(e)
-        print(f"🤖❌ [Auto-Flow] FAILED for user {user_id}, meeting {meeting_id}. Reason: {error_reason}")
-        notifier.error(error_reason)
+@app.on_event("shutdown")
+def shutdown_executors():
+    if _in_process_worker:
+        _in_process_worker.stop(wait=False)
+    shutdown_pools()
+    shutdown_progress()
 
 @app.post("/process-automated")
 async def process_automated_endpoint(
-    background_tasks: BackgroundTasks,
     request_body: dict = Body(...),
     current_user: dict = Depends(get_current_user)
 ):
@@ -118,27 +142,76 @@ async def process_automated_endpoint(
     user_id = current_user.get("sub")
     tier = current_user.get("metadata", {}).get("tier", "free")
     
+    video_url = request_body.get("video_url")
+    transcript_text = request_body.get("transcript_text")
+    meeting_id = request_body.get("meeting_id")
+
+    if not meeting_id or (not video_url and not transcript_text):
+        raise HTTPException(status_code=400, detail="meeting_id and either video_url or transcript_text are required.")
+
     # --- Quota Check for Free Users ---
-    if tier == "free":
-        exceeded, quota_info = check_free_tier_limits(user_id, "automation")
+    # Retrying a run that failed part-way resumes from its checkpoints and is not a new cycle.
+    run_key = automation_run_key(user_id, meeting_id, video_url, transcript_text)
+    if tier == "free" and not await run_io(has_incomplete_run, run_key, endpoint="/process-automated"):
+        exceeded, quota_info = await run_io(check_free_tier_limits, user_id, "automation", endpoint="/process-automated")
         if exceeded:
             raise HTTPException(
                 status_code=403,
                 detail=f"You have used all {quota_info['limit']} of your automation cycles for this month. Upgrade to Premium for unlimited automations."
             )
 
-    video_url = request_body.get("video_url")
-    transcript_text = request_body.get("transcript_text")
-    meeting_id = request_body.get("meeting_id")
+    # Queue the long-running flow; a job worker picks it up and retries it on failure
+    job_id = await run_io(
+        enqueue_job,
+        AUTOMATION_JOB,
+        {"user_id": user_id, "meeting_id": meeting_id, "video_url": video_url, "transcript_text": transcript_text},
+        user_id=user_id,
+        endpoint="/process-automated"
+    )
 
-    if not meeting_id or (not video_url and not transcript_text):
-        raise HTTPException(status_code=400, detail="meeting_id and either video_url or transcript_text are required.")
+    # Immediately return a response to the user
+    return {"message": "Automation process started. You will receive a notification upon completion.", "job_id": job_id}
+
+@app.get("/jobs")
+async def get_jobs_endpoint(current_user: dict = Depends(get_current_user)):
+    """
+    Lists the authenticated user's most recent background jobs.
+    """
+    user_id = current_user.get("sub")
+    return await run_io(get_job_store().list_for_user, user_id, endpoint="/jobs")
 
-    # Add the long-running task to the background
-    background_tasks.add_task(run_full_automation_flow, user_id, meeting_id, video_url, transcript_text)
+@app.get("/jobs/{job_id}")
+async def get_job_status_endpoint(job_id: str, current_user: dict = Depends(get_current_user)):
+    """
+    Returns the status, attempts and last error of a background job.
+    """
+    user_id = current_user.get("sub")
+    job = await run_io(get_job_store().get, job_id, user_id, endpoint="/jobs/{job_id}")
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return job
 
-    # Immediately return a response to the user
-    return {"message": "Automation process started. You will receive a notification upon completion."}
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events_endpoint(job_id: str, current_user: dict = Depends(get_current_user_for_stream)):
+    """
+    Streams a background job's status, stage and percent-complete as Server-Sent Events.
+    The first event is the job's current state; the stream ends when the job succeeds or fails.
+    """
+    user_id = current_user.get("sub")
+    job = await run_io(get_job_store().get, job_id, user_id, endpoint="/jobs/{job_id}/events")
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found.")
+
+    # Subscribe before reading the snapshot so no event published in between is lost.
+    subscription = await run_io(subscribe, job_id, asyncio.get_running_loop(), endpoint="/jobs/{job_id}/events")
+    snapshot = await run_io(latest_progress, job_id, endpoint="/jobs/{job_id}/events")
+    if not snapshot or job["status"] in TERMINAL_STATUSES:
+        snapshot = {**(snapshot or {}), "job_id": job_id, "status": job["status"], "attempt": job["attempts"], "error": job.get("last_error")}
+    return StreamingResponse(
+        stream_job_events(subscription, snapshot),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 # --- ROUTES ---
@@ -147,6 +220,31 @@ async def process_automated_endpoint(
 def read_root():
     return {"message": "Welcome to the MinuteMe Backend"}
 
+@app.get("/health/live")
+def liveness_endpoint():
+    """Liveness probe: the process is up and serving requests. Touches no dependencies."""
+    return {"status": "alive"}
+
+@app.get("/health/ready")
+async def readiness_endpoint():
+    """
+    Readiness probe: MongoDB answers a ping, the in-process job worker (if enabled) is
+    running and, with MODEL_WARMUP=1, the warmup models are loaded. Returns 503 until then.
+    """
+    checks = {}
+    try:
+        await run_io(ping_db, endpoint="/health/ready")
+        checks["database"] = "ok"
+    except Exception as e:
+        checks["database"] = f"unavailable: {e}"
+    if JOB_WORKERS_IN_PROCESS > 0:
+        checks["job_worker"] = "ok" if _in_process_worker else "not started"
+    if MODEL_WARMUP:
+        checks["models"] = "ok" if models_loaded() else "loading"
+
+    ready = all(value == "ok" for value in checks.values())
+    return JSONResponse(status_code=200 if ready else 503, content={"status": "ready" if ready else "not ready", "checks": checks})
+
 @app.post("/agenda")
 async def create_agenda_endpoint(
     user_input: dict = Body(...),
@@ -161,61 +259,100 @@ async def create_agenda_endpoint(
             raise HTTPException(status_code=400, detail="User ID not found in token.")
         
         print(f"Authenticated request. Generating agenda for user: {user_id}")
-        agenda = generate_agenda(user_input, user_id=user_id)
+        agenda = await run_inference(generate_agenda, user_input, user_id=user_id, endpoint="/agenda")
         return agenda
     except Exception as e:
         print(f"Error creating agenda: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# --- List endpoints ---
+# Every list endpoint returns one page, {"items": [...], "next_cursor": ...}, newest first.
+# Pass next_cursor back as `cursor` to get the next page; it is null on the last page.
+
+PAGE_LIMIT = Query(LIST_PAGE_SIZE, ge=1, le=MAX_LIST_PAGE_SIZE)
+
+async def list_page_for_user(list_fn, user_id: str, limit: int, cursor: str, endpoint: str):
+    """Runs a lib.database list_* function off the event loop; a malformed cursor is a 400."""
+    try:
+        return await run_io(list_fn, user_id, limit, cursor, endpoint=endpoint)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @app.get("/agendas")
-async def get_agendas_endpoint(current_user: dict = Depends(get_current_user)):
+async def get_agendas_endpoint(
+    limit: int = PAGE_LIMIT,
+    cursor: str = None,
+    current_user: dict = Depends(get_current_user)
+):
     """
-    Retrieves all agendas for the authenticated user.
+    Retrieves a page of agendas for the authenticated user.
     """
     try:
         user_id = current_user.get("sub")
         if not user_id:
             raise HTTPException(status_code=400, detail="User ID not found in token.")
         
-        agendas = get_all_agendas_for_user(user_id)
-        return agendas
+        return await list_page_for_user(list_agendas, user_id, limit, cursor, endpoint="/agendas")
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error getting agendas: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/action-items")
-async def get_action_items_endpoint(current_user: dict = Depends(get_current_user)):
+async def get_action_items_endpoint(
+    limit: int = PAGE_LIMIT,
+    cursor: str = None,
+    current_user: dict = Depends(get_current_user)
+):
     """
-    Retrieves all action items for the authenticated user.
+    Retrieves a page of action items for the authenticated user.
     """
     try:
         user_id = current_user.get("sub")
         if not user_id:
             raise HTTPException(status_code=400, detail="User ID not found in token.")
         
-        action_items = get_all_action_items_for_user(user_id)
-        return action_items
+        return await list_page_for_user(list_action_items, user_id, limit, cursor, endpoint="/action-items")
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error getting action items: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/action-items/upcoming")
+async def get_upcoming_action_items_endpoint(
+    limit: int = UPCOMING_ACTION_ITEMS_LIMIT,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Retrieves the authenticated user's open action items with a deadline, soonest first.
+    """
+    user_id = current_user.get("sub")
+    if not user_id:
+        raise HTTPException(status_code=400, detail="User ID not found in token.")
+    return await run_io(list_upcoming_action_items, user_id, limit, endpoint="/action-items/upcoming")
+
 @app.get("/minutes")
-async def get_all_minutes_endpoint(current_user: dict = Depends(get_current_user)):
+async def get_all_minutes_endpoint(
+    limit: int = PAGE_LIMIT,
+    cursor: str = None,
+    current_user: dict = Depends(get_current_user)
+):
     """
-    Retrieves minutes documents for the authenticated user.
+    Retrieves a page of minutes for the authenticated user (summary previews only).
     For free users, only returns the last 3 minutes.
     """
     user_id = current_user.get("sub")
     tier = current_user.get("metadata", {}).get("tier", "free")
     
-    minutes = get_all_minutes_for_user(user_id)
-    
     # TIER CHECK: Limit history for free users
-    if tier == "free" and len(minutes) > 3:
-        # Sort by date and return only the most recent 3
-        minutes = sorted(minutes, key=lambda x: x.get("created_at", ""), reverse=True)[:3]
-        
-    return minutes
+    if tier == "free":
+        page = await list_page_for_user(list_minutes, user_id, min(limit, FREE_TIER_MINUTES_HISTORY), None, endpoint="/minutes")
+        page["next_cursor"] = None
+        return page
+
+    return await list_page_for_user(list_minutes, user_id, limit, cursor, endpoint="/minutes")
 
 @app.get("/minutes/{minutes_id}")
 async def get_minute_detail_endpoint(minutes_id: str, current_user: dict = Depends(get_current_user)):
@@ -223,22 +360,44 @@ async def get_minute_detail_endpoint(minutes_id: str, current_user: dict = Depen
     Retrieves a single minutes document by its ID.
     """
     user_id = current_user.get("sub")
-    minute = get_minutes_by_id(minutes_id, user_id)
+    minute = await run_io(get_minutes_by_id, minutes_id, user_id, endpoint="/minutes/{minutes_id}")
     if not minute:
         raise HTTPException(status_code=404, detail="Minutes not found.")
     return minute
 
+EVENTS_DEFAULT_DAYS_BEFORE = 31
+EVENTS_DEFAULT_DAYS_AFTER = 62
+EVENTS_MAX_RANGE_DAYS = 400
+
 @app.get("/events")
-async def get_events_endpoint(current_user: dict = Depends(get_current_user)):
+async def get_events_endpoint(
+    start: datetime = None,
+    end: datetime = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Returns the meetings and action item deadlines between `start` and `end` (ISO dates;
+    without an offset they are in EVENT_TIMEZONE). Defaults to a window from a month ago
+    to two months ahead. Event dates are wall-clock dates in EVENT_TIMEZONE.
+    """
     user_id = current_user.get("sub")
-    meetings = get_all_meetings_for_user(user_id)
-    action_items = get_all_action_items_for_user(user_id)  # <-- Add this
+    now = datetime.utcnow()
+    start = to_utc(start) if start else now - timedelta(days=EVENTS_DEFAULT_DAYS_BEFORE)
+    end = to_utc(end) if end else now + timedelta(days=EVENTS_DEFAULT_DAYS_AFTER)
+    if end <= start or end - start > timedelta(days=EVENTS_MAX_RANGE_DAYS):
+        raise HTTPException(status_code=400, detail=f"end must be after start and at most {EVENTS_MAX_RANGE_DAYS} days later.")
+    return await run_io(build_calendar_events, user_id, start, end, endpoint="/events")
+
+def build_calendar_events(user_id: str, start: datetime, end: datetime):
+    """Builds calendar events from a user's meetings and action item deadlines in [start, end)."""
+    meetings = get_meetings_in_range(user_id, start, end)
+    action_items = get_action_items_in_range(user_id, start, end)
 
     events = []
 
     # Meetings as events
     for meeting in meetings:
-        event_date = dateparser.parse(meeting.get("meeting_date"))
+        event_date = to_local(meeting.get("meeting_date_utc"))
         if event_date:
             events.append({
                 "title": meeting.get("meeting_name", "Untitled Meeting"),
@@ -253,22 +412,20 @@ async def get_events_endpoint(current_user: dict = Depends(get_current_user)):
 
     # Action items as events
     for item in action_items:
-        deadline = item.get("deadline")
-        if deadline:
-            deadline_date = dateparser.parse(deadline)
-            if deadline_date:
-                events.append({
-                    "title": f"Action: {item.get('task', 'Task')}",
-                    "start": deadline_date,
-                    "end": deadline_date,
-                    "allDay": True,
-                    "resource": {
-                        "type": "action-item",
-                        "owner": item.get("owner"),
-                        "status": item.get("status"),
-                        "minutes_id": item.get("minutes_id")
-                    }
-                })
+        deadline_date = to_local(item.get("deadline_utc"))
+        if deadline_date:
+            events.append({
+                "title": f"Action: {item.get('task', 'Task')}",
+                "start": deadline_date,
+                "end": deadline_date,
+                "allDay": True,
+                "resource": {
+                    "type": "action-item",
+                    "owner": item.get("owner"),
+                    "status": item.get("status"),
+                    "minutes_id": item.get("minutes_id")
+                }
+            })
 
     return events
 
@@ -282,20 +439,22 @@ async def schedule_agenda_endpoint(
     if not agenda_id:
         raise HTTPException(status_code=400, detail="agenda_id is required.")
 
-    agenda = get_agenda(agenda_id, user_id)
+    agenda = await run_io(get_agenda, agenda_id, user_id, endpoint="/schedule-agenda")
     if not agenda:
         raise HTTPException(status_code=404, detail="Agenda not found.")
 
     try:
         description = "\n".join([item['topic'] for item in agenda.get("agenda", [])])
         # Schedule in Google Calendar
-        schedule_action_item(
+        await run_io(
+            schedule_action_item,
             user_id,
             task_name=agenda.get("meeting_name"),
             description=description,
             deadline_str=agenda.get("meeting_date"),
             owner="All",
-            duration_minutes=60
+            duration_minutes=60,
+            endpoint="/schedule-agenda"
         )
         # Create meeting document in DB
         meeting_data = {
@@ -304,8 +463,7 @@ async def schedule_agenda_endpoint(
             "agenda_id": agenda.get("meeting_id"),
             "status": "scheduled"
         }
-        from lib.database import save_meeting
-        save_meeting(meeting_data, user_id)
+        await run_io(save_meeting, meeting_data, user_id, endpoint="/schedule-agenda")
         return {"message": "Meeting scheduled successfully in Google Calendar and saved in DB."}
     except Exception as e:
         print(f"Error scheduling agenda: {e}")
@@ -331,21 +489,24 @@ async def transcribe_endpoint(
         # TIER CHECK: Video length and transcription quota
         if tier == "free":
             video_length_minutes = await get_video_length(video_url)
+            if video_length_minutes is None:
+                raise HTTPException(status_code=400, detail="Could not determine the video length. Make sure the link is public.")
             if video_length_minutes > 15:
                 raise HTTPException(status_code=403, detail="Free tier users can only transcribe meetings up to 15 minutes.")
             
-            exceeded, quota_info = check_free_tier_limits(user_id, "transcription")
+            exceeded, quota_info = await run_io(check_free_tier_limits, user_id, "transcription", endpoint="/transcribe")
             if exceeded:
                 raise HTTPException(status_code=403, detail=f"You've reached your monthly limit of {quota_info['limit']} video transcriptions.")
 
-        transcript_text = transcribe_video(video_url=video_url, user_id=user_id)
+        transcript_text = await run_transcription(transcribe_video, video_url=video_url, user_id=user_id, endpoint="/transcribe")
         
         if not transcript_text:
             raise HTTPException(status_code=500, detail="Transcription failed to produce text.")
 
         # Save the transcript and mark it as automated
-        from lib.database import save_transcript
-        transcript_id = save_transcript(
+        transcript_id = await run_io(
+            save_transcript,
+            endpoint="/transcribe",
             transcript_text=transcript_text,
             user_id=user_id,
             meeting_id=meeting_id,
@@ -355,6 +516,8 @@ async def transcribe_endpoint(
         )
         
         return {"message": "Transcription successful", "transcript_id": transcript_id}
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error in /transcribe: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -368,7 +531,9 @@ async def save_manual_transcript_endpoint(
     """Saves a manually provided transcript."""
     try:
         user_id = current_user.get("sub")
-        transcript_id = save_transcript(
+        transcript_id = await run_io(
+            save_transcript,
+            endpoint="/save-manual-transcript",
             transcript_text=request_body.get("transcript"),
             user_id=user_id,
             meeting_id=request_body.get("meeting_id"),
@@ -383,16 +548,30 @@ async def save_manual_transcript_endpoint(
 
 
 @app.get("/transcripts")
-async def get_transcripts_endpoint(current_user: dict = Depends(get_current_user)):
+async def get_transcripts_endpoint(
+    limit: int = PAGE_LIMIT,
+    cursor: str = None,
+    current_user: dict = Depends(get_current_user)
+):
     """
-    Retrieves all transcripts for the authenticated user.
+    Retrieves a page of transcripts for the authenticated user, with a `preview`
+    instead of the full transcript text.
     """
     user_id = current_user.get("sub")
-    db = get_db()
-    transcripts = list(db.transcripts.find({"user_id": user_id}))
-    for t in transcripts:
-        t["_id"] = str(t["_id"])
-    return transcripts
+    return await list_page_for_user(list_transcripts, user_id, limit, cursor, endpoint="/transcripts")
+
+@app.get("/transcripts/{transcript_id}")
+async def get_transcript_detail_endpoint(transcript_id: str, current_user: dict = Depends(get_current_user)):
+    """
+    Retrieves a single transcript, including its full text.
+    """
+    user_id = current_user.get("sub")
+    if not ObjectId.is_valid(transcript_id):
+        raise HTTPException(status_code=404, detail="Transcript not found.")
+    transcript = await run_io(get_transcript_by_id, transcript_id, user_id, endpoint="/transcripts/{transcript_id}")
+    if not transcript:
+        raise HTTPException(status_code=404, detail="Transcript not found.")
+    return transcript
 
 @app.post("/generate-minutes")
 async def generate_minutes_endpoint(request_body: dict = Body(None), current_user: dict = Depends(get_current_user)):
@@ -407,7 +586,7 @@ async def generate_minutes_endpoint(request_body: dict = Body(None), current_use
             transcript_id = request_body.get("transcript_id")
         
         # This function returns the full minutes document, including the new _id
-        minutes_data = generate_minutes(user_id=user_id, transcript_id=transcript_id)
+        minutes_data = await run_inference(generate_minutes, user_id=user_id, transcript_id=transcript_id, endpoint="/generate-minutes")
         
         if not minutes_data:
             raise HTTPException(status_code=500, detail="Failed to generate minutes from transcript.")
@@ -434,7 +613,7 @@ async def generate_action_items_endpoint(
             raise HTTPException(status_code=400, detail="minutes_id is required.")
         
         # This function now returns the list of created action items
-        result = extract_and_schedule_tasks(user_id=user_id, minutes_id=minutes_id)
+        result = await run_inference(extract_and_schedule_tasks, user_id=user_id, minutes_id=minutes_id, endpoint="/generate-action-items")
         
         if result is None:
             raise HTTPException(status_code=404, detail="Failed to process action items. Minutes not found.")
@@ -456,7 +635,7 @@ async def update_agenda_endpoint(
     """
     user_id = current_user.get("sub")
     # Implement update logic in lib/database.py
-    updated_agenda = update_agenda(agenda_id, update_data, user_id)
+    updated_agenda = await run_io(update_agenda, agenda_id, update_data, user_id, endpoint="/agenda/{agenda_id}")
     if not updated_agenda:
         raise HTTPException(status_code=404, detail="Agenda not found or update failed.")
     return updated_agenda
@@ -471,16 +650,9 @@ async def update_action_item_status(
     Updates the status or details of an action item.
     """
     user_id = current_user.get("sub")
-    db = get_db()
-    result = db.action_items.update_one(
-        {"_id": ObjectId(item_id), "user_id": user_id},
-        {"$set": update_data}
-    )
-    if result.modified_count == 0:
+    item = await run_io(update_action_item, item_id, update_data, user_id, endpoint="/action-items/{item_id}")
+    if not item:
         raise HTTPException(status_code=404, detail="Action item not found or update failed.")
-    item = db.action_items.find_one({"_id": ObjectId(item_id), "user_id": user_id})
-    if item and "_id" in item:
-        item["_id"] = str(item["_id"])
     return item
 
 @app.post("/meetings")
@@ -495,25 +667,27 @@ async def create_meeting_endpoint(
     tier = current_user.get("tier", "free")
     # Enforce meeting count for free users
     if tier == "free":
-        from lib.database import get_document_count
-        count = get_document_count("meetings", user_id)
-        if count >= 5:
-            raise HTTPException(status_code=403, detail="Free tier: max 5 meetings per month.")
+        exceeded, quota_info = await run_io(check_free_tier_limits, user_id, "meeting", endpoint="/meetings")
+        if exceeded:
+            raise HTTPException(status_code=403, detail=f"Free tier: max {quota_info['limit']} meetings per month.")
         # Enforce meeting length
         if meeting_data.get("duration", 0) > 15:
             raise HTTPException(status_code=403, detail="Free tier: max 15 min meetings.")
     # Proceed as normal for premium
-    meeting = save_meeting(meeting_data, user_id)
+    meeting = await run_io(save_meeting, meeting_data, user_id, endpoint="/meetings")
     return meeting
 
 @app.get("/meetings")
-async def get_meetings_endpoint(current_user: dict = Depends(get_current_user)):
+async def get_meetings_endpoint(
+    limit: int = PAGE_LIMIT,
+    cursor: str = None,
+    current_user: dict = Depends(get_current_user)
+):
     """
-    Retrieves all meetings for the authenticated user.
+    Retrieves a page of meetings for the authenticated user.
     """
     user_id = current_user.get("sub")
-    meetings = get_all_meetings_for_user(user_id)
-    return meetings
+    return await list_page_for_user(list_meetings, user_id, limit, cursor, endpoint="/meetings")
 
 @app.patch("/meetings/{meeting_id}")
 async def update_meeting_endpoint(
@@ -525,7 +699,7 @@ async def update_meeting_endpoint(
     Updates an existing meeting for the authenticated user.
     """
     user_id = current_user.get("sub")
-    updated_meeting = update_meeting(meeting_id, update_data, user_id)
+    updated_meeting = await run_io(update_meeting, meeting_id, update_data, user_id, endpoint="/meetings/{meeting_id}")
     if not updated_meeting:
         raise HTTPException(status_code=404, detail="Meeting not found or update failed.")
     return updated_meeting
@@ -539,7 +713,7 @@ async def delete_meeting_endpoint(
     Deletes a meeting for the authenticated user.
     """
     user_id = current_user.get("sub")
-    deleted = delete_meeting(meeting_id, user_id)
+    deleted = await run_io(delete_meeting, meeting_id, user_id, endpoint="/meetings/{meeting_id}")
     if not deleted:
         raise HTTPException(status_code=404, detail="Meeting not found or delete failed.")
     return {"message": "Meeting deleted."}
@@ -553,9 +727,8 @@ async def delete_agenda_endpoint(
     Deletes an agenda for the authenticated user.
     """
     user_id = current_user.get("sub")
-    db = get_db()
-    result = db.agendas.delete_one({"meeting_id": agenda_id, "user_id": user_id})
-    if result.deleted_count == 0:
+    deleted = await run_io(delete_agenda, agenda_id, user_id, endpoint="/agenda/{agenda_id}")
+    if not deleted:
         raise HTTPException(status_code=404, detail="Agenda not found or already deleted.")
     return {"message": "Agenda deleted successfully."}
 
@@ -568,7 +741,7 @@ async def list_users(current_user: dict = Depends(get_current_user)):
     # Example: Fetch users from Clerk (replace with your actual logic)
     from clerk_backend_api import Clerk
     clerk = Clerk(bearer_auth=os.getenv("CLERK_SECRET_KEY"))
-    users = clerk.users.list()
+    users = await run_io(clerk.users.list, endpoint="/admin/users")
     # Format users for frontend
     user_list = []
     for u in users:
@@ -583,6 +756,64 @@ async def list_users(current_user: dict = Depends(get_current_user)):
         user_list.append(user_data)
     return user_list
 
+@app.get("/admin/models")
+async def get_models_endpoint(current_user: dict = Depends(get_current_user)):
+    """Reports load time and memory for every model in the shared registry."""
+    if current_user.get("metadata", {}).get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return get_model_stats()
+
+@app.get("/admin/executors")
+async def get_executors_endpoint(current_user: dict = Depends(get_current_user)):
+    """Reports pool sizes and per-endpoint queue wait for the execution layer."""
+    if current_user.get("metadata", {}).get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return get_executor_stats()
+
+@app.get("/admin/auth")
+async def get_auth_endpoint(current_user: dict = Depends(get_current_user)):
+    """Reports session token verification counters and latency."""
+    if current_user.get("metadata", {}).get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return get_auth_stats()
+
+@app.get("/admin/transcription-cache")
+async def get_transcription_cache_endpoint(current_user: dict = Depends(get_current_user)):
+    """Reports transcription cache hit/miss counters and size."""
+    if current_user.get("metadata", {}).get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return get_transcription_cache_stats()
+
+@app.get("/admin/priority-cache")
+async def get_priority_cache_endpoint(current_user: dict = Depends(get_current_user)):
+    """Reports topic priority cache hit/miss counters."""
+    if current_user.get("metadata", {}).get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return get_priority_cache_stats()
+
+@app.get("/admin/llm")
+async def get_llm_endpoint(current_user: dict = Depends(get_current_user)):
+    """Reports per-model LLM call counts, retries, throttling and latency."""
+    if current_user.get("metadata", {}).get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return get_llm_stats()
+
+@app.get("/admin/llm-cache")
+async def get_llm_cache_endpoint(current_user: dict = Depends(get_current_user)):
+    """Reports LLM response cache hits per tier, coalesced calls and size."""
+    if current_user.get("metadata", {}).get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return get_llm_cache_stats()
+
+@app.post("/admin/usage/reconcile")
+async def reconcile_usage_endpoint(request_body: dict = Body(default={}), current_user: dict = Depends(get_current_user)):
+    """Queues a rebuild of the usage counters from the source collections (optionally for one month or user)."""
+    if current_user.get("metadata", {}).get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    payload = {"month": request_body.get("month"), "user_id": request_body.get("user_id")}
+    job_id = await run_io(enqueue_job, RECONCILE_USAGE_JOB, payload, user_id=current_user.get("sub"), endpoint="/admin/usage/reconcile")
+    return {"message": "Usage reconciliation queued.", "job_id": job_id}
+
 @app.patch("/admin/user/{user_id}/tier")
 async def update_user_tier(user_id: str, tier: str, current_user: dict = Depends(get_current_user)):
     print(f"--- ⚙️ ADMIN: ATTEMPTING TIER UPDATE ---")
@@ -596,7 +827,7 @@ async def update_user_tier(user_id: str, tier: str, current_user: dict = Depends
         clerk = Clerk(bearer_auth=os.getenv("CLERK_SECRET_KEY"))
         print("1. Clerk client initialized.")
         
-        user_to_update = clerk.users.get(user_id=user_id)
+        user_to_update = await run_io(clerk.users.get, user_id=user_id, endpoint="/admin/user/{user_id}/tier")
         print(f"2. Fetched user to update. Current metadata: {user_to_update.public_metadata}")
         
         current_metadata = user_to_update.public_metadata or {}
@@ -604,7 +835,7 @@ async def update_user_tier(user_id: str, tier: str, current_user: dict = Depends
         print(f"3. Prepared new metadata for update: {current_metadata}")
         
         # Fix: Change update_user to update
-        updated_user = clerk.users.update(user_id=user_id, public_metadata=current_metadata)
+        updated_user = await run_io(clerk.users.update, user_id=user_id, public_metadata=current_metadata, endpoint="/admin/user/{user_id}/tier")
         print(f"4. ✅ Successfully updated user in Clerk. New metadata: {updated_user.public_metadata}")
         
         return {"success": True, "user_id": updated_user.id, "new_tier": updated_user.public_metadata.get("tier")}
@@ -626,14 +857,14 @@ async def update_user_role(user_id: str, role: str, current_user: dict = Depends
         clerk = Clerk(bearer_auth=os.getenv("CLERK_SECRET_KEY"))
         print("1. Clerk client initialized.")
 
-        user_to_update = clerk.users.get(user_id=user_id)
+        user_to_update = await run_io(clerk.users.get, user_id=user_id, endpoint="/admin/user/{user_id}/role")
         print(f"2. Fetched user to update. Current metadata: {user_to_update.public_metadata}")
 
         current_metadata = user_to_update.public_metadata or {}
         current_metadata['role'] = role
         print(f"3. Prepared new metadata for update: {current_metadata}")
 
-        updated_user = clerk.users.update(user_id=user_id, public_metadata=current_metadata)
+        updated_user = await run_io(clerk.users.update, user_id=user_id, public_metadata=current_metadata, endpoint="/admin/user/{user_id}/role")
         print(f"4. ✅ Successfully updated user in Clerk. New metadata: {updated_user.public_metadata}")
         
         return {"success": True, "user_id": updated_user.id, "new_role": updated_user.public_metadata.get("role")}
@@ -652,7 +883,7 @@ async def delete_user(user_id: str, current_user: dict = Depends(get_current_use
     
     try:
         clerk = Clerk(bearer_auth=os.getenv("CLERK_SECRET_KEY"))
-        deleted_user_response = clerk.users.delete(user_id=user_id)
+        deleted_user_response = await run_io(clerk.users.delete, user_id=user_id, endpoint="/admin/user/{user_id}")
         
         # Optionally, you might want to clean up user-related data from your own database here.
         # For example: db.meetings.delete_many({"user_id": user_id})
@@ -672,7 +903,7 @@ async def get_notifications_endpoint(current_user: dict = Depends(get_current_us
     user_id = current_user.get("sub")
     tier = current_user.get("metadata", {}).get("tier", "free")
     
-    notifications = get_user_notifications(user_id)
+    notifications = await run_io(get_user_notifications, user_id, endpoint="/notifications")
     return notifications
 
 @app.post("/notifications/read-all")
@@ -681,7 +912,7 @@ async def read_all_notifications_endpoint(current_user: dict = Depends(get_curre
     Marks all notifications as read for the authenticated user.
     """
     user_id = current_user.get("sub")
-    result = mark_all_notifications_read(user_id)
+    result = await run_io(mark_all_notifications_read, user_id, endpoint="/notifications/read-all")
     return {"success": True, "updated": result}
 
 @app.patch("/notifications/{notification_id}/read")
@@ -693,9 +924,18 @@ async def read_notification_endpoint(
     Marks a specific notification as read.
     """
     user_id = current_user.get("sub")
-    result = mark_notification_read(notification_id, user_id)
+    result = await run_io(mark_notification_read, notification_id, user_id, endpoint="/notifications/{notification_id}/read")
     return {"success": result}
 
+@app.get("/user/quotas")
+async def get_quotas_endpoint(current_user: dict = Depends(get_current_user)):
+    """
+    Returns every monthly quota (meetings, automation cycles, transcriptions) in one read.
+    """
+    user_id = current_user.get("sub")
+    tier = current_user.get("metadata", {}).get("tier", "free")
+    return await run_io(get_all_quotas, user_id, tier, endpoint="/user/quotas")
+
 @app.get("/user/automation-quota")
 async def get_automation_quota_endpoint(current_user: dict = Depends(get_current_user)):
     """
@@ -708,7 +948,7 @@ async def get_automation_quota_endpoint(current_user: dict = Depends(get_current
     if tier == "premium":
         return {"limit": -1, "used": 0, "remaining": -1}
     
-    _, quota_info = check_free_tier_limits(user_id, "automation")
+    _, quota_info = await run_io(check_free_tier_limits, user_id, "automation", endpoint="/user/automation-quota")
     return quota_info
 
 @app.get("/user/transcription-quota")
@@ -723,7 +963,7 @@ async def get_transcription_quota_endpoint(current_user: dict = Depends(get_curr
     if tier == "premium":
         return {"limit": -1, "used": 0, "remaining": -1}
     
-    _, quota_info = check_free_tier_limits(user_id, "transcription")
+    _, quota_info = await run_io(check_free_tier_limits, user_id, "transcription", endpoint="/user/transcription-quota")
     return quota_info
 
 # --- Google Calendar Auth Routes ---
@@ -738,7 +978,8 @@ async def get_google_auth_url(current_user: dict = Depends(get_current_user)):
             status_code=403,
             detail="Google Calendar integration is a Premium feature. Please upgrade to connect your calendar."
         )
-        
+
+    from google_auth_oauthlib.flow import Flow
     flow = Flow.from_client_secrets_file(
         'credentials.json',
         scopes=SCOPES,
@@ -762,24 +1003,27 @@ async def exchange_google_auth_code(
     if not code:
         raise HTTPException(status_code=400, detail="Authorization code is required.")
 
+    from google_auth_oauthlib.flow import Flow
     try:
         flow = Flow.from_client_secrets_file(
             'credentials.json',
             scopes=SCOPES,
             redirect_uri="http://localhost:5173/settings"
         )
-        flow.fetch_token(code=code)
+        await run_io(flow.fetch_token, code=code, endpoint="/auth/google/exchange")
         creds = flow.credentials
 
         # Save credentials to the database
-        save_google_credentials(user_id, {
+        await run_io(save_google_credentials, user_id, {
             'token': creds.token,
             'refresh_token': creds.refresh_token,
             'token_uri': creds.token_uri,
             'client_id': creds.client_id,
             'client_secret': creds.client_secret,
-            'scopes': creds.scopes
-        })
+            'scopes': creds.scopes,
+            'expiry': creds.expiry.isoformat() + "Z" if creds.expiry else None
+        }, endpoint="/auth/google/exchange")
+        invalidate_calendar_service(user_id)
         return {"message": "Google Calendar connected successfully."}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to exchange code: {str(e)}")
@@ -788,12 +1032,13 @@ async def exchange_google_auth_code(
 async def get_google_auth_status(current_user: dict = Depends(get_current_user)):
     """Checks if the user has connected their Google Calendar."""
     user_id = current_user.get("sub")
-    credentials = get_google_credentials(user_id)
+    credentials = await run_io(get_google_credentials, user_id, endpoint="/auth/google/status")
     return {"is_connected": credentials is not None}
 
 @app.post("/auth/google/disconnect")
 async def disconnect_google_calendar(current_user: dict = Depends(get_current_user)):
     """Disconnects the user's Google Calendar."""
     user_id = current_user.get("sub")
-    delete_google_credentials(user_id)
+    await run_io(delete_google_credentials, user_id, endpoint="/auth/google/disconnect")
+    invalidate_calendar_service(user_id)
     return {"message": "Google Calendar disconnected successfully."}
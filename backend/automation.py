@@ -0,0 +1,141 @@
+from datetime import datetime
+from agents.minutes_generator.minutes_generator import generate_minutes
+from agents.action_item_tracker.tracker import (
+    prepare_action_items,
+    save_tracked_action_items,
+    schedule_tasks,
+    generate_next_agenda,
+)
+from agents.transcription_agent.transcription_agent import transcribe_video
+from lib.database import save_transcript, get_transcript_by_id, get_minutes_by_id
+from lib.checkpoints import automation_run_key, hash_input, run_stage, clear_run
+from lib.notifications import AutomationNotifier
+from lib.quota import increment_automation_cycle, RECONCILE_USAGE_JOB, handle_reconcile_usage_job
+
+# +++ AUTOMATION FLOW +++
+# Runs inside a job worker (see lib/jobs.py and worker.py), not in the API process.
+
+AUTOMATION_JOB = "automation"
+
+def run_full_automation_flow(user_id: str, meeting_id: str, video_url: str = None, transcript_text: str = None,
+                             attempt: int = 1, final_attempt: bool = True, job_id: str = None):
+    """
+    Orchestrates the entire agent chain. Every stage is checkpointed, so a retry of the
+    same run resumes from the first incomplete stage. Errors are re-raised so the job
+    queue can retry; the user is only notified of a failure once no attempts are left.
+    """
+    notifier = AutomationNotifier(user_id, meeting_id, job_id=job_id)
+    run_key = automation_run_key(user_id, meeting_id, video_url, transcript_text)
+
+    def stage(name, input_hash, func, is_valid=None):
+        return run_stage(run_key, name, input_hash, func, user_id=user_id, job_id=job_id, is_valid=is_valid)
+
+    try:
+        print(f"🤖 [Auto-Flow] Starting for user {user_id}, meeting {meeting_id} (attempt {attempt})")
+        if attempt == 1:
+            notifier.start()
+
+        # --- Step 1: Transcription (if needed) ---
+        transcript_id = None
+        if video_url:
+            notifier.step_transcribe()
+            print(f"🤖 [Auto-Flow] Step 1: Transcribing video...")
+
+            def _transcribe():
+                text = transcribe_video(
+                    video_url=video_url,
+                    user_id=user_id,
+                    on_segment_done=lambda segment, completed, total: notifier.transcription_progress(completed, total),
+                )
+                if not text:
+                    raise ValueError("Transcription failed to produce text.")
+                transcript_id = save_transcript(text, user_id, meeting_id, f"Meeting {meeting_id}", str(datetime.utcnow().date()), automated=True)
+                return {"transcript_id": transcript_id}
+
+            transcript_id = stage(
+                "transcript",
+                hash_input(video_url),
+                _transcribe,
+                is_valid=lambda output: get_transcript_by_id(output["transcript_id"], user_id) is not None,
+            )["transcript_id"]
+            transcript_doc = get_transcript_by_id(transcript_id, user_id)
+            if not transcript_doc:
+                raise ValueError("Saved transcript could not be loaded.")
+            transcript_text = transcript_doc["transcript"]
+            print(f"🤖 [Auto-Flow] Step 1 Complete: Transcription saved.")
+
+        # --- Step 2: Generate Minutes ---
+        notifier.step_minutes()
+        print(f"🤖 [Auto-Flow] Step 2: Generating minutes...")
+
+        def _minutes():
+            minutes_data = generate_minutes(user_id=user_id, transcript_id=transcript_id, transcript_text=transcript_text)
+            if not minutes_data or not minutes_data.get("_id"):
+                raise ValueError("Minutes generation failed.")
+            return {"minutes_id": minutes_data["_id"]}
+
+        minutes_id = stage(
+            "minutes",
+            hash_input(transcript_text),
+            _minutes,
+            is_valid=lambda output: get_minutes_by_id(output["minutes_id"], user_id) is not None,
+        )["minutes_id"]
+        minutes_doc = get_minutes_by_id(minutes_id, user_id)
+        if not minutes_doc:
+            raise ValueError(f"Minutes {minutes_id} could not be loaded.")
+        print(f"🤖 [Auto-Flow] Step 2 Complete: Minutes generated with ID {minutes_id}.")
+
+        # --- Step 3: Generate Action Items ---
+        notifier.step_actions()
+        print(f"🤖 [Auto-Flow] Step 3: Extracting action items...")
+        action_items = stage(
+            "action_items",
+            hash_input(minutes_id),
+            lambda: save_tracked_action_items(
+                user_id, minutes_doc, prepare_action_items(user_id, minutes_doc)["action_items"], replace_existing=True
+            ),
+        )
+        # Calendar event IDs are derived from the run key, so a partially scheduled run
+        # re-inserts the same IDs and Google rejects the duplicates.
+        stage(
+            "calendar_events",
+            hash_input(minutes_id, *[item.get("_id") for item in action_items]),
+            lambda: schedule_tasks(user_id, minutes_doc, action_items, event_key=run_key),
+        )
+        stage(
+            "next_agenda",
+            hash_input(minutes_id),
+            lambda: {"agenda_id": (generate_next_agenda(user_id, minutes_doc) or {}).get("meeting_id")},
+        )
+        print(f"🤖 [Auto-Flow] Step 3 Complete: Action items extracted and scheduled.")
+
+        # --- Final Step: Increment Quota & Notify ---
+        increment_automation_cycle(meeting_id, user_id)
+        clear_run(run_key)
+        notifier.success()
+        print(f"🤖 [Auto-Flow] Success for user {user_id}, meeting {meeting_id}")
+        return {"minutes_id": minutes_id}
+
+    except Exception as e:
+        error_reason = str(e)
+        print(f"🤖❌ [Auto-Flow] FAILED for user {user_id}, meeting {meeting_id}. Reason: {error_reason}")
+        if final_attempt:
+            notifier.error(error_reason)
+        raise
+
+def handle_automation_job(payload: dict, job: dict):
+    """Job-queue handler for AUTOMATION_JOB."""
+    return run_full_automation_flow(
+        user_id=payload["user_id"],
+        meeting_id=payload["meeting_id"],
+        video_url=payload.get("video_url"),
+        transcript_text=payload.get("transcript_text"),
+        attempt=job["attempts"],
+        final_attempt=job["attempts"] >= job["max_attempts"],
+        job_id=job["_id"],
+    )
+
+JOB_HANDLERS = {
+    AUTOMATION_JOB: handle_automation_job,
+    RECONCILE_USAGE_JOB: handle_reconcile_usage_job,
+}
@@ -0,0 +1,27 @@
+import argparse
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from lib.dates import DATE_FIELDS, backfill_normalized_dates
+
+# Stores normalized UTC dates (see lib/dates.py) on documents written before they existed
+# or normalized by an older DATES_VERSION. The API also runs this at startup
+# (BACKFILL_DATES_ON_STARTUP=1). Once a full run has completed at the current version
+# it is skipped; --force scans again. Safe to re-run; only those documents are touched:
+#   python backfill_dates.py
+#   python backfill_dates.py --collection meetings
+
+def main():
+    parser = argparse.ArgumentParser(description="MinuteMe normalized date backfill")
+    parser.add_argument("--collection", action="append", choices=sorted(DATE_FIELDS),
+                        help="Only backfill this collection (repeatable). Default: all.")
+    parser.add_argument("--batch-size", type=int, default=500, help="Updates per bulk write.")
+    parser.add_argument("--force", action="store_true",
+                        help="Scan even if a backfill at the current version has completed.")
+    args = parser.parse_args()
+
+    backfill_normalized_dates(collections=args.collection, batch_size=args.batch_size, force=args.force)
+
+if __name__ == "__main__":
+    main()
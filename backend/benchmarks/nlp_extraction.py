@@ -0,0 +1,74 @@
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from agents.action_item_tracker import nlp_extractor
+from lib.nltk_setup import require_nltk
+from lib.text_analysis import analyze_text
+
+# Compares the original per-sentence NLTK extractor with the staged one (keyword screen,
+# then batched tagging and NE chunking of the candidates) on the transcripts in
+# data/transcript_meeting: time per 1k sentences, share of sentences that reach the
+# tagger, and whether both return the same action items.
+#   python benchmarks/nlp_extraction.py --repeat 5
+
+DEFAULT_FIXTURES = os.path.join(os.path.dirname(__file__), "..", "data", "transcript_meeting")
+
+
+def load_fixtures(fixtures_dir: str) -> list:
+    """Returns the transcript text of every .txt and .json fixture."""
+    transcripts = []
+    for path in sorted(glob.glob(os.path.join(fixtures_dir, "*"))):
+        with open(path, "r", encoding="utf-8") as f:
+            if path.endswith(".txt"):
+                transcripts.append(f.read())
+            elif path.endswith(".json"):
+                transcripts.append(json.load(f).get("transcript", ""))
+    return [text for text in transcripts if text.strip()]
+
+
+def benchmark(extract, transcripts: list, sentence_count: int, repeat: int) -> dict:
+    results = [extract(text) for text in transcripts]  # warm-up run
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for text in transcripts:
+            extract(text)
+        timings.append(time.perf_counter() - started)
+    return {
+        "ms_per_1k_sentences": round(min(timings) / sentence_count * 1000 * 1000, 1),
+        "action_items": sum(len(items) for items in results),
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the NLTK action-item extractors on transcript fixtures")
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURES, help="Directory of transcript fixtures.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed passes over the fixtures per extractor.")
+    args = parser.parse_args()
+
+    require_nltk(*nlp_extractor.NLTK_PACKAGES)
+    transcripts = load_fixtures(args.fixtures)
+    sentences = [sentence for text in transcripts for sentence in analyze_text(text).sentences]
+    candidates = nlp_extractor.screen_sentences(sentences)
+    print(f"📋 {len(sentences)} sentences in {len(transcripts)} transcripts from {args.fixtures}; "
+          f"{len(candidates)} ({len(candidates) / len(sentences):.0%}) pass the screen")
+
+    unstaged = benchmark(nlp_extractor.extract_action_items_unstaged, transcripts, len(sentences), args.repeat)
+    staged = benchmark(nlp_extractor.extract_action_items, transcripts, len(sentences), args.repeat)
+
+    print(f"\n{'extractor':<10} {'ms/1k sentences':>16} {'action items':>13}")
+    for name, result in (("unstaged", unstaged), ("staged", staged)):
+        print(f"{name:<10} {result['ms_per_1k_sentences']:>16} {result['action_items']:>13}")
+    speedup = unstaged["ms_per_1k_sentences"] / max(staged["ms_per_1k_sentences"], 1e-9)
+    print(f"\nspeedup: {speedup:.1f}x, same output: {unstaged['results'] == staged['results']}")
+
+
+if __name__ == "__main__":
+    main()
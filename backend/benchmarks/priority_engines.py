@@ -0,0 +1,84 @@
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from agents.agenda_planner.priority import classify_topics, FAST_EMBEDDING_MODEL
+from lib.model_registry import get_pipeline, get_model_stats, ZERO_SHOT_CLASSIFIER
+
+# Compares the "nli" and "fast" priority engines on the agenda fixtures in data/agendas:
+# model load time, warm latency per agenda-sized batch, and agreement with the NLI engine
+# and with the priorities stored in the fixtures. The priority cache is bypassed.
+#   python benchmarks/priority_engines.py --repeat 5
+
+DEFAULT_FIXTURES = os.path.join(os.path.dirname(__file__), "..", "data", "agendas")
+ENGINE_MODELS = {"nli": ZERO_SHOT_CLASSIFIER, "fast": FAST_EMBEDDING_MODEL}
+
+
+def load_fixtures(fixtures_dir: str) -> list:
+    """Returns one (topics, expected_priorities) pair per agenda fixture."""
+    agendas = []
+    for path in sorted(glob.glob(os.path.join(fixtures_dir, "*.json"))):
+        with open(path, "r", encoding="utf-8") as f:
+            items = json.load(f).get("agenda", [])
+        if items:
+            agendas.append(([item["topic"] for item in items], [item.get("priority") for item in items]))
+    return agendas
+
+
+def _agreement(a: list, b: list) -> float:
+    pairs = [(x, y) for x, y in zip(a, b) if x is not None and y is not None]
+    return sum(x == y for x, y in pairs) / len(pairs) if pairs else 0.0
+
+
+def benchmark_engine(engine: str, agendas: list, repeat: int) -> dict:
+    started = time.perf_counter()
+    get_pipeline(*ENGINE_MODELS[engine])
+    load_seconds = time.perf_counter() - started
+
+    predictions = [classify_topics(topics, engine=engine) for topics, _ in agendas]  # warm-up run
+    latencies = []
+    for _ in range(repeat):
+        for topics, _ in agendas:
+            started = time.perf_counter()
+            classify_topics(topics, engine=engine)
+            latencies.append((time.perf_counter() - started) / len(topics))
+    latencies.sort()
+    return {
+        "load_seconds": round(load_seconds, 2),
+        "avg_ms_per_topic": round(sum(latencies) / len(latencies) * 1000, 2),
+        "p95_ms_per_topic": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000, 2),
+        "predictions": [p for agenda in predictions for p in agenda],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the priority engines on agenda fixtures")
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURES, help="Directory of agenda JSON fixtures.")
+    parser.add_argument("--engines", nargs="+", default=["nli", "fast"], choices=list(ENGINE_MODELS))
+    parser.add_argument("--repeat", type=int, default=3, help="Timed passes over the fixtures per engine.")
+    args = parser.parse_args()
+
+    agendas = load_fixtures(args.fixtures)
+    expected = [p for _, priorities in agendas for p in priorities]
+    print(f"📋 {sum(len(topics) for topics, _ in agendas)} topics in {len(agendas)} agendas from {args.fixtures}")
+
+    results = {engine: benchmark_engine(engine, agendas, args.repeat) for engine in args.engines}
+    memory = {stats["model"]: stats["memory_mb"] for stats in get_model_stats().get("models", [])}
+
+    print(f"\n{'engine':<6} {'load s':>7} {'avg ms/topic':>13} {'p95 ms/topic':>13} {'model MB':>9} {'vs fixtures':>12} {'vs nli':>7}")
+    for engine, result in results.items():
+        vs_nli = _agreement(result["predictions"], results["nli"]["predictions"]) if "nli" in results else None
+        print(
+            f"{engine:<6} {result['load_seconds']:>7} {result['avg_ms_per_topic']:>13} {result['p95_ms_per_topic']:>13} "
+            f"{memory.get(ENGINE_MODELS[engine][1], 0):>9.0f} {_agreement(result['predictions'], expected):>12.0%} "
+            f"{'-' if vs_nli is None else format(vs_nli, '.0%'):>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+import argparse
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from lib.indexes import ensure_indexes, missing_indexes
+
+# Creates the Mongo indexes declared in lib/indexes.py (safe to re-run):
+#   python create_indexes.py
+#   python create_indexes.py --check   # only report missing indexes; exits 1 if any
+
+def main():
+    parser = argparse.ArgumentParser(description="MinuteMe Mongo index bootstrap")
+    parser.add_argument("--check", action="store_true", help="Report missing indexes without creating them.")
+    args = parser.parse_args()
+
+    if args.check:
+        missing = missing_indexes()
+        for collection, keys in missing.items():
+            for key in keys:
+                print(f"❌ {collection}: missing index {key}")
+        if not missing:
+            print("✅ All declared indexes exist.")
+        raise SystemExit(1 if missing else 0)
+
+    for collection, names in ensure_indexes().items():
+        print(f"🗂️ {collection}: {', '.join(names)}")
+
+if __name__ == "__main__":
+    main()
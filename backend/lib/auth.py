@@ -1,55 +1,299 @@
+import hashlib
 import os
-from fastapi import Depends, HTTPException, status, Request
-# Correct imports for the 'clerk-backend-api' package
-from clerk_backend_api import Clerk, models # Import 'models' for error handling
-from clerk_backend_api.security import AuthenticateRequestOptions
-
-def get_clerk_client():
-    """Initializes and returns the Clerk client using the secret key."""
-    clerk_secret_key = os.getenv("CLERK_SECRET_KEY")
-    if not clerk_secret_key:
+import threading
+import time
+from collections import OrderedDict, deque
+from fastapi import HTTPException, status, Request
+from .executors import run_io, summarize_latencies
+
+# --- Session token verification ---
+# Clerk session tokens are RS256 JWTs, verified locally against Clerk's JWKS instead of
+# calling Clerk on every request. The JWKS is cached in memory for JWKS_CACHE_TTL_SECONDS
+# and refetched early when a token names a key id (kid) the cache does not know yet, i.e.
+# after a key rotation. Verified claims are kept in a small LRU keyed by the token's hash
+# for AUTH_CLAIMS_CACHE_SECONDS (never past the token's exp), so repeated requests with
+# the same token, such as notification polls, skip the signature check.
+# Set CLERK_JWT_KEY (the PEM public key from the Clerk dashboard) to verify without
+# fetching the JWKS at all.
+
+CLERK_JWKS_URL = os.getenv("CLERK_JWKS_URL", "https://api.clerk.com/v1/jwks")
+JWKS_CACHE_TTL_SECONDS = float(os.getenv("JWKS_CACHE_TTL_SECONDS", "3600"))
+JWKS_MIN_REFRESH_SECONDS = float(os.getenv("JWKS_MIN_REFRESH_SECONDS", "30"))
+AUTH_CLAIMS_CACHE_SECONDS = float(os.getenv("AUTH_CLAIMS_CACHE_SECONDS", "30"))
+AUTH_CLAIMS_CACHE_SIZE = int(os.getenv("AUTH_CLAIMS_CACHE_SIZE", "1024"))
+AUTH_CLOCK_SKEW_SECONDS = int(os.getenv("AUTH_CLOCK_SKEW_SECONDS", "5"))
+JWT_ALGORITHMS = ["RS256"]
+_STATS_WINDOW = 512
+
+
+class AuthError(Exception):
+    """A session token that is missing, malformed, expired or not signed by a known key."""
+
+
+def fetch_clerk_jwks() -> dict:
+    """Fetches Clerk's JWKS with the backend secret key."""
+    import requests
+    secret_key = os.getenv("CLERK_SECRET_KEY")
+    if not secret_key:
         raise ValueError("CLERK_SECRET_KEY not found in environment variables.")
-    # Per documentation, the client is initialized with the secret key as the bearer_auth token
-    return Clerk(bearer_auth=clerk_secret_key)
+    response = requests.get(CLERK_JWKS_URL, headers={"Authorization": f"Bearer {secret_key}"}, timeout=5)
+    response.raise_for_status()
+    return response.json()
 
-async def get_current_user(request: Request) -> dict:
-    """
-    A FastAPI dependency that verifies the bearer token from the request
-    using the official authenticate_request method.
-    """
-    clerk = get_clerk_client()
+
+class JWKSCache:
+    """Public keys by kid, loaded from `fetch_jwks()` (a callable returning a JWKS dict)."""
+    def __init__(self, fetch_jwks=fetch_clerk_jwks, ttl_seconds: float = JWKS_CACHE_TTL_SECONDS,
+                 min_refresh_seconds: float = JWKS_MIN_REFRESH_SECONDS):
+        self.fetch_jwks = fetch_jwks
+        self.ttl_seconds = ttl_seconds
+        self.min_refresh_seconds = min_refresh_seconds
+        self._keys = {}
+        self._fetched_at = None
+        self._lock = threading.Lock()
+
+    def get_key(self, kid: str):
+        with self._lock:
+            now = time.monotonic()
+            age = None if self._fetched_at is None else now - self._fetched_at
+            stale = age is None or age > self.ttl_seconds
+            # An unknown kid refetches at most every min_refresh_seconds, so tokens with
+            # made-up kids cannot turn into a stream of JWKS requests.
+            rotated = kid not in self._keys and (age is None or age >= self.min_refresh_seconds)
+            if stale or rotated:
+                self._refresh(now)
+            key = self._keys.get(kid)
+        if key is None:
+            raise AuthError(f"No signing key with kid '{kid}'.")
+        return key
+
+    def _refresh(self, now: float):
+        import jwt
+        try:
+            jwks = self.fetch_jwks()
+        except Exception as e:
+            if not self._keys:
+                raise
+            # Keep verifying with the keys we have while the JWKS endpoint is unreachable.
+            print(f"⚠️ JWKS refresh failed, using cached keys: {e}")
+            self._fetched_at = now
+            return
+        self._keys = {
+            jwk["kid"]: jwt.algorithms.RSAAlgorithm.from_jwk(jwk)
+            for jwk in jwks.get("keys", [])
+            if jwk.get("kty") == "RSA" and jwk.get("kid")
+        }
+        self._fetched_at = now
+        _count("jwks_refreshes")
+        print(f"🔑 Loaded {len(self._keys)} signing keys from JWKS.")
+
+
+class StaticKey:
+    """A single PEM public key (CLERK_JWT_KEY), used for every kid."""
+    def __init__(self, pem: str):
+        self.pem = pem.replace("\\n", "\n")
+
+    def get_key(self, kid: str):
+        return self.pem
+
+
+class ClaimsCache:
+    """LRU of verified claims keyed by token hash; entries expire with the token or after `ttl_seconds`."""
+    def __init__(self, max_size: int = AUTH_CLAIMS_CACHE_SIZE, ttl_seconds: float = AUTH_CLAIMS_CACHE_SECONDS):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def token_key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str):
+        key = self.token_key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            claims, expires_at = entry
+            if time.time() >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return claims
+
+    def put(self, token: str, claims: dict):
+        key = self.token_key(token)
+        expires_at = min(time.time() + self.ttl_seconds, claims.get("exp", float("inf")))
+        with self._lock:
+            self._entries[key] = (claims, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_key_source = None
+_key_source_lock = threading.Lock()
+_claims_cache = ClaimsCache()
+_stats = {"cache_hits": 0, "verified": 0, "rejected": 0, "jwks_refreshes": 0}
+_latency = deque(maxlen=_STATS_WINDOW)
+_stats_lock = threading.Lock()
+
+
+def _count(name: str):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def get_key_source():
+    """Returns the configured key source: CLERK_JWT_KEY if set, otherwise the cached Clerk JWKS."""
+    global _key_source
+    with _key_source_lock:
+        if _key_source is None:
+            jwt_key = os.getenv("CLERK_JWT_KEY")
+            _key_source = StaticKey(jwt_key) if jwt_key else JWKSCache()
+        return _key_source
+
+
+def set_key_source(source):
+    """Replaces the key source and drops cached claims (used by tests)."""
+    global _key_source
+    with _key_source_lock:
+        _key_source = source
+    _claims_cache.clear()
+
+
+def _authorized_parties() -> list:
+    return [party.strip() for party in os.getenv("CLERK_AUTHORIZED_PARTIES", "").split(",") if party.strip()]
+
+
+def verify_session_token(token: str) -> dict:
+    """Verifies a session token's signature, expiry and authorized party. Returns its claims or raises AuthError."""
+    import jwt
     try:
-        print("🔐 Verifying user token...")
-        # Use the official authenticate_request method from the SDK
-        request_state = clerk.authenticate_request(
-            request,
-            AuthenticateRequestOptions() # Add options like authorized_parties if needed
+        kid = jwt.get_unverified_header(token).get("kid")
+        key = get_key_source().get_key(kid)
+        claims = jwt.decode(
+            token, key, algorithms=JWT_ALGORITHMS, leeway=AUTH_CLOCK_SKEW_SECONDS,
+            options={"require": ["exp", "sub"]}
         )
+    except jwt.PyJWTError as e:
+        raise AuthError(str(e)) from e
+    parties = _authorized_parties()
+    if parties and claims.get("azp") and claims["azp"] not in parties:
+        raise AuthError(f"Token issued for unauthorized party '{claims['azp']}'.")
+    return claims
 
-        if not request_state.is_signed_in:
-             raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="User is not signed in.",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-
-        # The token payload is available in request_state.payload
-        session_claims = request_state.payload
-        print(f"✅ Token verified for user_id: {session_claims['sub']}")
-        return session_claims
-
-    # Catch the correct base error class from the 'models' submodule
-    except models.ClerkBaseError as e:
-        print(f"❌ Token verification failed: {e.message}")
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail=f"Invalid authentication credentials: {e.message}",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+
+def _cached_claims(token: str):
+    """The cached claims for a token, or None."""
+    claims = _claims_cache.get(token)
+    if claims is not None:
+        _count("cache_hits")
+    return claims
+
+
+def _verify_and_cache(token: str) -> dict:
+    started = time.perf_counter()
+    try:
+        claims = verify_session_token(token)
+    except AuthError:
+        _count("rejected")
+        raise
+    finally:
+        with _stats_lock:
+            _latency.append(time.perf_counter() - started)
+    _count("verified")
+    _claims_cache.put(token, claims)
+    return claims
+
+
+def authenticate_token(token: str) -> dict:
+    """Returns the claims for a token, from the claims cache or by verifying it."""
+    claims = _cached_claims(token)
+    return claims if claims is not None else _verify_and_cache(token)
+
+
+def get_auth_stats() -> dict:
+    """Reports claims-cache hits, verifications, rejections, JWKS refreshes and verification latency."""
+    with _stats_lock:
+        stats = dict(_stats)
+        latency = list(_latency)
+    return {**stats, "claims_cache_size": len(_claims_cache), "verify_latency": summarize_latencies(latency)}
+
+
+def _bearer_token(request: Request):
+    """Reads the token from the Authorization header."""
+    authorization = request.headers.get("Authorization", "")
+    if authorization.lower().startswith("bearer "):
+        return authorization[7:].strip()
+    return None
+
+
+def _unauthorized(detail: str):
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+async def _authenticate(token: str) -> dict:
+    # Cache hits are answered on the event loop; only verification goes to a thread.
+    claims = _cached_claims(token)
+    if claims is not None:
+        return claims
+    try:
+        # A JWKS refresh is a network call, so keep verification off the event loop.
+        claims = await run_io(_verify_and_cache, token, endpoint="auth")
+        print(f"✅ Token verified for user_id: {claims['sub']}")
+        return claims
+    except AuthError as e:
+        print(f"❌ Token verification failed: {e}")
+        raise _unauthorized(f"Invalid authentication credentials: {e}")
     except Exception as e:
         # Catch any other unexpected errors during authentication
         print(f"❌ An unexpected error occurred during authentication: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An internal error occurred during authentication."
-        )
\ No newline at end of file
+        )
+
+
+async def get_current_user(request: Request) -> dict:
+    """
+    A FastAPI dependency that verifies the Bearer token of the request and returns its claims.
+    Cookies are ignored, so cross-site requests cannot ride a signed-in browser session.
+    """
+    token = _bearer_token(request)
+    if not token:
+        raise _unauthorized("User is not signed in.")
+    return await _authenticate(token)
+
+
+async def get_current_user_for_stream(request: Request) -> dict:
+    """
+    get_current_user for Server-Sent Events routes: EventSource cannot set headers, so the
+    token may also come from Clerk's __session cookie. A cookie token is only accepted when
+    CLERK_AUTHORIZED_PARTIES is set and the token's azp is one of them.
+    """
+    token = _bearer_token(request)
+    if token:
+        return await _authenticate(token)
+    token = request.cookies.get("__session")
+    if not token:
+        raise _unauthorized("User is not signed in.")
+    parties = _authorized_parties()
+    if not parties:
+        raise _unauthorized("Cookie sessions require CLERK_AUTHORIZED_PARTIES to be configured.")
+    claims = await _authenticate(token)
+    if claims.get("azp") not in parties:
+        raise _unauthorized("Cookie session was not issued for an authorized party.")
+    return claims
@@ -0,0 +1,87 @@
+import hashlib
+from datetime import datetime
+from .database import get_db
+
+# --- Automation stage checkpoints ---
+# Each stage of an automation run persists its output in `automation_checkpoints`,
+# keyed by the run (user, meeting and input hash) and the stage name. A retry of the
+# same run, whether a queue retry or the user resubmitting, resumes from the first
+# stage whose checkpoint is missing or whose input hash no longer matches, or whose
+# output (e.g. a saved transcript or minutes document) has since been deleted.
+# A finished run's checkpoints are cleared, so resubmitting it starts over; abandoned
+# runs expire through a TTL index on created_at (AUTOMATION_CHECKPOINT_TTL_SECONDS).
+
+STAGES = ["transcript", "minutes", "action_items", "calendar_events", "next_agenda"]
+
+
+def hash_input(*parts) -> str:
+    """Stable hash of a stage's inputs."""
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(str(part if part is not None else "").encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def automation_run_key(user_id: str, meeting_id: str, video_url: str = None, transcript_text: str = None) -> str:
+    """Identifies an automation run by its user, meeting and inputs, independent of the job that runs it."""
+    return hash_input(user_id, meeting_id, video_url, hash_input(transcript_text) if transcript_text else None)
+
+
+def get_checkpoint(run_key: str, stage: str):
+    db = get_db()
+    return db.automation_checkpoints.find_one({"_id": f"{run_key}:{stage}"})
+
+
+def save_checkpoint(run_key: str, stage: str, input_hash: str, output, user_id: str = None, job_id: str = None):
+    db = get_db()
+    db.automation_checkpoints.update_one(
+        {"_id": f"{run_key}:{stage}"},
+        {"$set": {
+            "run_key": run_key,
+            "stage": stage,
+            "input_hash": input_hash,
+            "output": output,
+            "user_id": user_id,
+            "job_id": job_id,
+            "created_at": datetime.utcnow(),
+        }},
+        upsert=True,
+    )
+
+
+def delete_checkpoint(run_key: str, stage: str):
+    db = get_db()
+    db.automation_checkpoints.delete_one({"_id": f"{run_key}:{stage}"})
+
+
+def run_stage(run_key: str, stage: str, input_hash: str, func, user_id: str = None, job_id: str = None,
+              is_valid=None):
+    """
+    Returns the checkpointed output of a stage if it already ran with the same input
+    (and `is_valid(output)`, when given, still holds), otherwise runs func(),
+    checkpoints its output and returns it.
+    """
+    checkpoint = get_checkpoint(run_key, stage)
+    if checkpoint and checkpoint.get("input_hash") == input_hash:
+        output = checkpoint.get("output")
+        if is_valid is None or is_valid(output):
+            print(f"⏭️ [Checkpoint] Resuming past stage '{stage}' for run {run_key[:12]}.")
+            return output
+        print(f"♻️ [Checkpoint] Output of stage '{stage}' for run {run_key[:12]} is gone; running it again.")
+        delete_checkpoint(run_key, stage)
+    output = func()
+    save_checkpoint(run_key, stage, input_hash, output, user_id=user_id, job_id=job_id)
+    return output
+
+
+def clear_run(run_key: str):
+    """Drops every checkpoint of a finished run, so the same inputs submitted again run from scratch."""
+    db = get_db()
+    db.automation_checkpoints.delete_many({"run_key": run_key})
+
+
+def has_incomplete_run(run_key: str) -> bool:
+    """True if a run with these inputs has checkpoints, i.e. it has not finished and a retry would resume it."""
+    db = get_db()
+    return db.automation_checkpoints.find_one({"run_key": run_key}, {"_id": 1}) is not None
@@ -1,9 +1,11 @@
+import base64
 import os
-from pymongo import MongoClient
+from pymongo import MongoClient, UpdateOne
 from pymongo.errors import ConnectionFailure # Import the exception class
 from bson.objectid import ObjectId # Import the ObjectId class
 from dotenv import load_dotenv
 from datetime import datetime
+from .dates import normalize_dates
 
 load_dotenv()  # Load environment variables from .env file
 
@@ -42,6 +44,11 @@ def get_db():
             raise
     return _db_client
 
+def ping_db() -> bool:
+    """Round-trips a ping to MongoDB (used by the readiness probe). Raises if it is unreachable."""
+    get_db().command("ping")
+    return True
+
 # --- CRUD Functions for Agents ---
 
 def save_agenda(agenda_data: dict, user_id: str):
@@ -63,6 +70,7 @@ def save_minutes(minutes_data: dict, user_id: str):
     db = get_db()
     minutes_data["user_id"] = user_id
     minutes_data["created_at"] = datetime.utcnow()
+    normalize_dates("minutes", minutes_data)
     result = db.minutes.insert_one(minutes_data)
     return str(result.inserted_id)
 
@@ -121,8 +129,18 @@ def save_transcript(transcript_text: str, user_id: str, meeting_id: str, meeting
         "automated": automated
     }
     result = db.transcripts.insert_one(transcript_data)
+    if automated:
+        increment_usage_counter(user_id, "transcription")
     return str(result.inserted_id)
 
+def get_transcript_by_id(transcript_id: str, user_id: str):
+    """Retrieves a specific transcript for a given user."""
+    db = get_db()
+    transcript = db.transcripts.find_one({"_id": ObjectId(transcript_id), "user_id": user_id})
+    if transcript and "_id" in transcript:
+        transcript["_id"] = str(transcript["_id"])
+    return transcript
+
 def get_latest_transcript(user_id: str):
     """Retrieves the most recent transcript for a given user."""
     db = get_db()
@@ -134,40 +152,84 @@ def get_latest_transcript(user_id: str):
         latest_transcript["_id"] = str(latest_transcript["_id"])
     return latest_transcript
 
-def get_all_agendas_for_user(user_id: str):
-    """Retrieves all agendas for a given user, sorted by most recent."""
-    db = get_db()
-    agendas = list(db.agendas.find({"user_id": user_id}, sort=[("created_at", -1)]))
-    for agenda in agendas:
-        if "_id" in agenda:
-            agenda["_id"] = str(agenda["_id"])
-    return agendas
-
 def save_action_item(action_item: dict, user_id: str, minutes_id: str):
     db = get_db()
     action_item["user_id"] = user_id
     action_item["minutes_id"] = minutes_id
     action_item["created_at"] = datetime.utcnow()
+    normalize_dates("action_items", action_item)
     result = db.action_items.insert_one(action_item)
     action_item["_id"] = str(result.inserted_id)
     return action_item
 
-def get_all_action_items_for_user(user_id: str):
+def _embedded_action_item(item: dict) -> dict:
+    return {key: value for key, value in item.items() if key not in ("user_id", "minutes_id")}
+
+def save_action_items_for_minutes(minutes_id: str, action_items: list, user_id: str, replace_existing: bool = False) -> list:
+    """
+    Saves the action items extracted from a minutes document in bulk and returns them with
+    their IDs: one insert_many for the items, then one update that writes them back onto
+    the minutes document (minutes.action_items), so the detail view needs no second query.
+    With replace_existing, items saved by an earlier attempt on the same minutes are removed
+    first, which makes re-running the write idempotent.
+    """
     db = get_db()
-    action_items = list(db.action_items.find({"user_id": user_id}))
+    if replace_existing:
+        delete_action_items_for_minutes(minutes_id, user_id)
+    now = datetime.utcnow()
     for item in action_items:
-        if "_id" in item:
-            item["_id"] = str(item["_id"])
+        item["user_id"] = user_id
+        item["minutes_id"] = minutes_id
+        item["created_at"] = now
+        normalize_dates("action_items", item)
+    if action_items:
+        result = db.action_items.insert_many(action_items)
+        for item, inserted_id in zip(action_items, result.inserted_ids):
+            item["_id"] = str(inserted_id)
+    db.minutes.update_one(
+        {"_id": ObjectId(minutes_id), "user_id": user_id},
+        {"$set": {"action_items": [_embedded_action_item(item) for item in action_items], "updated_at": now}}
+    )
+    print(f"📝 Saved {len(action_items)} action items for minutes {minutes_id}.")
     return action_items
 
-def get_all_minutes_for_user(user_id: str):
-    """Retrieves all minutes documents for a given user."""
+def delete_action_items_for_minutes(minutes_id: str, user_id: str):
+    """Removes the action items extracted from a minutes document."""
     db = get_db()
-    minutes_docs = list(db.minutes.find({"user_id": user_id}))
-    for doc in minutes_docs:
-        if "_id" in doc:
-            doc["_id"] = str(doc["_id"])
-    return minutes_docs
+    result = db.action_items.delete_many({"minutes_id": minutes_id, "user_id": user_id})
+    return result.deleted_count
+
+def set_action_item_event_ids(user_id: str, event_ids: dict):
+    """Stores Google Calendar event IDs on action items ({action_item_id: event_id}) in one round trip."""
+    db = get_db()
+    operations = [
+        UpdateOne({"_id": ObjectId(item_id), "user_id": user_id}, {"$set": {"google_event_id": event_id}})
+        for item_id, event_id in event_ids.items()
+    ]
+    if not operations:
+        return 0
+    return db.action_items.bulk_write(operations, ordered=False).modified_count
+
+def update_action_item(item_id: str, update_data: dict, user_id: str):
+    """Updates an action item and returns the updated document, or None if nothing changed."""
+    db = get_db()
+    normalize_dates("action_items", update_data)
+    result = db.action_items.update_one(
+        {"_id": ObjectId(item_id), "user_id": user_id},
+        {"$set": update_data}
+    )
+    if result.modified_count == 0:
+        return None
+    item = db.action_items.find_one({"_id": ObjectId(item_id), "user_id": user_id})
+    if item and "_id" in item:
+        item["_id"] = str(item["_id"])
+    # Keep the copy embedded in the minutes document in sync.
+    if item and ObjectId.is_valid(item.get("minutes_id") or ""):
+        db.minutes.update_one(
+            {"_id": ObjectId(item["minutes_id"]), "user_id": user_id, "action_items._id": item_id},
+            {"$set": {f"action_items.$.{key}": value for key, value in update_data.items()}}
+        )
+    return item
 
 def get_document_count(collection_name: str, user_id: str):
     """Counts documents in a collection for a specific user."""
@@ -190,24 +252,24 @@ def update_agenda(agenda_id: str, update_data: dict, user_id: str):
         agenda["_id"] = str(agenda["_id"])
     return agenda
 
+def delete_agenda(agenda_id: str, user_id: str):
+    db = get_db()
+    result = db.agendas.delete_one({"meeting_id": agenda_id, "user_id": user_id})
+    return result.deleted_count
+
 def save_meeting(meeting_data: dict, user_id: str):
     db = get_db()
     meeting_data["user_id"] = user_id
     meeting_data["created_at"] = datetime.utcnow()
+    normalize_dates("meetings", meeting_data)
     result = db.meetings.insert_one(meeting_data)
+    increment_usage_counter(user_id, "meeting")
     meeting_data["_id"] = str(result.inserted_id)
     return meeting_data
 
-def get_all_meetings_for_user(user_id: str):
-    db = get_db()
-    meetings = list(db.meetings.find({"user_id": user_id}))
-    for meeting in meetings:
-        if "_id" in meeting:
-            meeting["_id"] = str(meeting["_id"])
-    return meetings
-
 def update_meeting(meeting_id: str, update_data: dict, user_id: str):
     db = get_db()
+    normalize_dates("meetings", update_data)
     result = db.meetings.update_one(
         {"_id": ObjectId(meeting_id), "user_id": user_id},
         {"$set": update_data}
@@ -220,9 +282,180 @@ def update_meeting(meeting_id: str, update_data: dict, user_id: str):
     return meeting
 
 def delete_meeting(meeting_id: str, user_id: str):
+    """Deletes a meeting and gives back the meeting (and automation) quota it used."""
     db = get_db()
-    result = db.meetings.delete_one({"_id": ObjectId(meeting_id), "user_id": user_id})
-    return result.deleted_count
+    meeting = db.meetings.find_one_and_delete(
+        {"_id": ObjectId(meeting_id), "user_id": user_id},
+        projection={"created_at": 1, "automation_used": 1, "automation_used_at": 1},
+    )
+    if not meeting:
+        return 0
+    created_at = meeting.get("created_at")
+    increment_usage_counter(user_id, "meeting", -1, when=created_at)
+    if meeting.get("automation_used"):
+        increment_usage_counter(user_id, "automation", -1, when=meeting.get("automation_used_at") or created_at)
+    return 1
+
+# --- List Pages ---
+# List endpoints return one page of a user's documents, newest first, with server-side
+# sort and limit. Pages are keyset-paginated on (created_at, _id): the cursor encodes the
+# last document of a page, so reading page N costs the same as reading page 1. List views
+# use LIST_PROJECTIONS, which leave out large fields (a transcript body, a minutes summary
+# and its decisions) and return a short preview instead; detail endpoints load the full document.
+
+LIST_PAGE_SIZE = int(os.getenv("LIST_PAGE_SIZE", "50"))
+MAX_LIST_PAGE_SIZE = 200
+LIST_SORT = [("created_at", -1), ("_id", -1)]
+PREVIEW_CHARS = 300
+
+def _preview(field: str) -> dict:
+    return {"$substrCP": [{"$ifNull": ["$" + field, ""]}, 0, PREVIEW_CHARS]}
+
+LIST_PROJECTIONS = {
+    "transcripts": {
+        "user_id": 1, "meeting_id": 1, "meeting_name": 1, "meeting_date": 1, "automated": 1, "created_at": 1,
+        "preview": _preview("transcript"),
+    },
+    # Minutes have no meeting name; list cards are titled by their date or meeting_id.
+    "minutes": {
+        "user_id": 1, "meeting_id": 1, "date": 1, "created_at": 1,
+        "summary_preview": _preview("summary"),
+    },
+}
+
+def encode_cursor(doc: dict) -> str:
+    raw = f"{doc['created_at'].isoformat()}|{doc['_id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor: str):
+    """Returns (created_at, ObjectId) for a cursor. Raises ValueError if it is malformed."""
+    try:
+        created_at, last_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), ObjectId(last_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+def list_page(collection_name: str, user_id: str, limit: int = LIST_PAGE_SIZE, cursor: str = None) -> dict:
+    """
+    Returns {"items": [...], "next_cursor": str or None} for one page of a user's documents.
+    next_cursor is None on the last page.
+    """
+    db = get_db()
+    limit = max(1, min(int(limit), MAX_LIST_PAGE_SIZE))
+    query = {"user_id": user_id}
+    if cursor:
+        created_at, last_id = decode_cursor(cursor)
+        query["$or"] = [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": last_id}},
+        ]
+    # One extra document tells whether another page exists.
+    docs = list(db[collection_name].find(
+        query, LIST_PROJECTIONS.get(collection_name), sort=LIST_SORT, limit=limit + 1
+    ))
+    next_cursor = encode_cursor(docs[limit - 1]) if len(docs) > limit else None
+    docs = docs[:limit]
+    for doc in docs:
+        doc["_id"] = str(doc["_id"])
+    return {"items": docs, "next_cursor": next_cursor}
+
+def list_transcripts(user_id: str, limit: int = LIST_PAGE_SIZE, cursor: str = None) -> dict:
+    """A page of transcripts with a `preview` instead of the transcript body."""
+    return list_page("transcripts", user_id, limit, cursor)
+
+def list_minutes(user_id: str, limit: int = LIST_PAGE_SIZE, cursor: str = None) -> dict:
+    """A page of minutes with a `summary_preview` instead of the summary, decisions and action items."""
+    return list_page("minutes", user_id, limit, cursor)
+
+def list_agendas(user_id: str, limit: int = LIST_PAGE_SIZE, cursor: str = None) -> dict:
+    return list_page("agendas", user_id, limit, cursor)
+
+def list_action_items(user_id: str, limit: int = LIST_PAGE_SIZE, cursor: str = None) -> dict:
+    return list_page("action_items", user_id, limit, cursor)
+
+def list_meetings(user_id: str, limit: int = LIST_PAGE_SIZE, cursor: str = None) -> dict:
+    return list_page("meetings", user_id, limit, cursor)
+
+# --- Calendar Range Queries ---
+# /events reads meetings and action items by their normalized UTC date (see lib/dates.py),
+# so a calendar view only touches the documents in its date range. Documents the startup
+# backfill has not reached yet are missing from the calendar until it finishes.
+
+def get_meetings_in_range(user_id: str, start: datetime, end: datetime) -> list:
+    """Meetings whose meeting_date falls in [start, end)."""
+    db = get_db()
+    meetings = list(db.meetings.find(
+        {"user_id": user_id, "meeting_date_utc": {"$gte": start, "$lt": end}},
+        {"meeting_name": 1, "meeting_date_utc": 1, "agenda_id": 1, "status": 1},
+        sort=[("meeting_date_utc", 1)]
+    ))
+    for meeting in meetings:
+        meeting["_id"] = str(meeting["_id"])
+    return meetings
+
+def get_action_items_in_range(user_id: str, start: datetime, end: datetime) -> list:
+    """Action items whose deadline falls in [start, end)."""
+    db = get_db()
+    items = list(db.action_items.find(
+        {"user_id": user_id, "deadline_utc": {"$gte": start, "$lt": end}},
+        {"task": 1, "owner": 1, "status": 1, "minutes_id": 1, "deadline_utc": 1},
+        sort=[("deadline_utc", 1)]
+    ))
+    for item in items:
+        item["_id"] = str(item["_id"])
+    return items
+
+UPCOMING_ACTION_ITEMS_LIMIT = 5
+
+def list_upcoming_action_items(user_id: str, limit: int = UPCOMING_ACTION_ITEMS_LIMIT) -> list:
+    """The user's open (not completed) action items with a deadline, soonest deadline first."""
+    db = get_db()
+    limit = max(1, min(int(limit), MAX_LIST_PAGE_SIZE))
+    items = list(db.action_items.find(
+        {"user_id": user_id, "deadline_utc": {"$ne": None}, "status": {"$ne": "completed"}},
+        sort=[("deadline_utc", 1)],
+        limit=limit
+    ))
+    for item in items:
+        item["_id"] = str(item["_id"])
+    return items
+
+# --- Usage Counters ---
+# One document per (user, month, action) in `usage_counters`, kept current with $inc by
+# the code paths that create meetings, automated transcripts and automation cycles, and
+# with a matching decrement when a meeting is deleted: a counter is the number of those
+# documents that currently exist for the month, the same number lib/quota.py rebuilds
+# from the source collections.
+
+def usage_month(when: datetime = None) -> str:
+    return (when or datetime.utcnow()).strftime("%Y-%m")
+
+def usage_counter_id(user_id: str, month: str, action: str) -> str:
+    return f"{user_id}:{month}:{action}"
+
+def increment_usage_counter(user_id: str, action: str, amount: int = 1, when: datetime = None):
+    """Atomically adds `amount` to the user's counter for `action` in the month of `when` (default: now)."""
+    db = get_db()
+    month = usage_month(when)
+    db.usage_counters.update_one(
+        {"_id": usage_counter_id(user_id, month, action)},
+        {
+            "$inc": {"count": amount},
+            "$set": {"updated_at": datetime.utcnow()},
+            "$setOnInsert": {"user_id": user_id, "month": month, "action": action},
+        },
+        upsert=True
+    )
+
+def get_usage_counters(user_id: str, actions: list, month: str = None) -> dict:
+    """Returns {action: count} for the given month (default: current) in a single read."""
+    db = get_db()
+    month = month or usage_month()
+    counts = {action: 0 for action in actions}
+    ids = [usage_counter_id(user_id, month, action) for action in actions]
+    for doc in db.usage_counters.find({"_id": {"$in": ids}}, {"action": 1, "count": 1}):
+        counts[doc["action"]] = doc.get("count", 0)
+    return counts
 
 # --- Google OAuth Credential Storage ---
 
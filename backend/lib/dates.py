@@ -0,0 +1,161 @@
+import os
+import threading
+from datetime import datetime, timezone, date
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+# --- Date normalization ---
+# Meetings, minutes and action items keep their dates as the strings users and the NLP
+# extractor produced ("2025-03-14", "next Friday", ...). Each string is parsed once, when
+# the document is written, and the result is stored next to it as a naive UTC datetime
+# (DATE_FIELDS: raw field -> normalized field), so reads such as /events can range-query
+# an index instead of parsing every document. Dates without an offset are wall-clock
+# times in EVENT_TIMEZONE, the zone calendar events are scheduled in; to_local() turns a
+# normalized value back into that wall-clock time. parse_date() tries the ISO formats
+# first and falls back to dateparser, memoized in a bounded LRU. Relative expressions
+# depend on the current day in EVENT_TIMEZONE, so that day is part of the cache key.
+# Documents written before normalization, or normalized by an older DATES_VERSION, are
+# updated by backfill_normalized_dates(): at API startup (BACKFILL_DATES_ON_STARTUP=1,
+# the default) and from `python backfill_dates.py`. A completed backfill records its
+# version in the `migrations` collection, so later startups skip the scan with one lookup.
+
+DATE_PARSE_CACHE_SIZE = int(os.getenv("DATE_PARSE_CACHE_SIZE", "4096"))
+EVENT_TIMEZONE = os.getenv("EVENT_TIMEZONE", "Asia/Colombo")
+BACKFILL_DATES_ON_STARTUP = os.getenv("BACKFILL_DATES_ON_STARTUP", "1") == "1"
+# Bumped when the meaning of the normalized fields changes (2: naive input is EVENT_TIMEZONE, not UTC).
+DATES_VERSION = 2
+DATES_MIGRATION_ID = "dates"
+
+DATE_FIELDS = {
+    "meetings": {"meeting_date": "meeting_date_utc"},
+    "action_items": {"deadline": "deadline_utc"},
+    "minutes": {"date": "date_utc", "next_meeting_date": "next_meeting_date_utc"},
+}
+_ISO_FORMATS = ("%Y-%m-%d", "%Y-%m-%d %H:%M", "%Y-%m-%dT%H:%M")
+
+
+def to_utc(value: datetime) -> datetime:
+    """Converts a datetime to naive UTC; naive datetimes are taken to be in EVENT_TIMEZONE."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=ZoneInfo(EVENT_TIMEZONE))
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def to_local(value: datetime):
+    """Converts a naive UTC datetime (a normalized field) to naive wall-clock time in EVENT_TIMEZONE."""
+    if value is None:
+        return None
+    return value.replace(tzinfo=timezone.utc).astimezone(ZoneInfo(EVENT_TIMEZONE)).replace(tzinfo=None)
+
+
+def _parse_iso(text: str):
+    try:
+        return datetime.fromisoformat(text.replace("Z", "+00:00"))
+    except ValueError:
+        pass
+    for fmt in _ISO_FORMATS:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+@lru_cache(maxsize=DATE_PARSE_CACHE_SIZE)
+def _parse_free_text(text: str, prefer_future: bool, today: date):
+    import dateparser
+    # Relative expressions ("tomorrow") are resolved against the current time in EVENT_TIMEZONE.
+    settings = {'TIMEZONE': EVENT_TIMEZONE}
+    if prefer_future:
+        settings['PREFER_DATES_FROM'] = 'future'
+    return dateparser.parse(text, settings=settings)
+
+
+def parse_date(text, prefer_future: bool = False):
+    """Parses a date string (ISO or free text) into a naive UTC datetime, or returns None."""
+    if isinstance(text, datetime):
+        return to_utc(text)
+    if not text or not isinstance(text, str) or text.strip().upper() == "TBD":
+        return None
+    text = text.strip()
+    parsed = _parse_iso(text)
+    if parsed is None:
+        # Keyed by the day in EVENT_TIMEZONE, the zone relative expressions are resolved in.
+        parsed = _parse_free_text(text, prefer_future, datetime.now(ZoneInfo(EVENT_TIMEZONE)).date())
+    return to_utc(parsed) if parsed else None
+
+
+def parse_local_date(text, prefer_future: bool = False):
+    """parse_date() as wall-clock time in EVENT_TIMEZONE, for scheduling calendar events."""
+    return to_local(parse_date(text, prefer_future=prefer_future))
+
+
+def normalize_dates(collection_name: str, doc: dict) -> dict:
+    """Sets the normalized UTC field for every raw date field present in `doc` (in place) and returns it."""
+    fields = DATE_FIELDS.get(collection_name, {})
+    for raw_field, utc_field in fields.items():
+        if raw_field in doc:
+            doc[utc_field] = parse_date(doc[raw_field])
+    if any(raw_field in doc for raw_field in fields):
+        doc["dates_version"] = DATES_VERSION
+    return doc
+
+
+def parse_cache_info():
+    return _parse_free_text.cache_info()._asdict()
+
+
+# --- Backfill ---
+
+def backfill_normalized_dates(db=None, collections=None, batch_size: int = 500, force: bool = False) -> dict:
+    """
+    Fills in the normalized fields of documents written before normalization or by an
+    older DATES_VERSION. Documents whose date cannot be parsed get None, so they are not
+    revisited. Returns {collection: documents updated}.
+    Does nothing once a full backfill at DATES_VERSION has been recorded, unless force is set.
+    """
+    from pymongo import UpdateOne
+    if db is None:
+        from .database import get_db
+        db = get_db()
+    if not force and db.migrations.find_one({"_id": DATES_MIGRATION_ID, "version": DATES_VERSION}):
+        print(f"🗓️ Normalized dates are up to date (version {DATES_VERSION}); skipping the backfill.")
+        return {}
+
+    updated = {}
+    for name in collections or DATE_FIELDS:
+        fields = DATE_FIELDS[name]
+        query = {"dates_version": {"$ne": DATES_VERSION}, "$or": [{raw: {"$exists": True}} for raw in fields]}
+        projection = {raw: 1 for raw in fields}
+        operations, count = [], 0
+        for doc in db[name].find(query, projection):
+            normalized = {utc: parse_date(doc.get(raw)) for raw, utc in fields.items() if raw in doc}
+            normalized["dates_version"] = DATES_VERSION
+            operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": normalized}))
+            if len(operations) >= batch_size:
+                count += db[name].bulk_write(operations, ordered=False).modified_count
+                operations = []
+        if operations:
+            count += db[name].bulk_write(operations, ordered=False).modified_count
+        updated[name] = count
+        print(f"🗓️ Backfilled normalized dates on {count} {name} documents.")
+    if not collections:
+        db.migrations.update_one(
+            {"_id": DATES_MIGRATION_ID},
+            {"$set": {"version": DATES_VERSION, "completed_at": datetime.utcnow()}},
+            upsert=True,
+        )
+    return updated
+
+
+def backfill_dates_in_background():
+    """Runs the backfill without delaying startup; failures (e.g. Mongo unreachable) are only logged."""
+    def _run():
+        try:
+            backfill_normalized_dates()
+        except Exception as e:
+            print(f"⚠️ Date backfill failed: {e}")
+
+    thread = threading.Thread(target=_run, name="date-backfill", daemon=True)
+    thread.start()
+    return thread
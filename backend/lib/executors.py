@@ -0,0 +1,105 @@
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# --- Execution layer for async handlers ---
+# FastAPI handlers are `async def`, so anything blocking (pymongo, HF inference,
+# Gemini, Google APIs) must run off the event loop. Each kind of work gets its own
+# bounded pool so a burst of inference cannot starve quick database reads.
+#   inference     - CPU-bound model / NLP work (torch releases the GIL)
+#   io            - short blocking I/O: Mongo CRUD, Clerk, Google Calendar
+#   transcription - long-running media + Gemini jobs
+
+POOL_SIZES = {
+    "inference": int(os.getenv("INFERENCE_POOL_SIZE", "2")),
+    "io": int(os.getenv("IO_POOL_SIZE", "16")),
+    "transcription": int(os.getenv("TRANSCRIPTION_POOL_SIZE", "2")),
+}
+_STATS_WINDOW = 512
+
+_pools = {}
+_pools_lock = threading.Lock()
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def _get_pool(name: str) -> ThreadPoolExecutor:
+    with _pools_lock:
+        if name not in _pools:
+            _pools[name] = ThreadPoolExecutor(max_workers=POOL_SIZES[name], thread_name_prefix=f"{name}-pool")
+        return _pools[name]
+
+
+def _record(endpoint: str, pool_name: str, queue_wait: float, run_time: float):
+    with _stats_lock:
+        entry = _stats.setdefault(endpoint, {
+            "pool": pool_name,
+            "calls": 0,
+            "queue_wait": deque(maxlen=_STATS_WINDOW),
+            "run_time": deque(maxlen=_STATS_WINDOW),
+        })
+        entry["calls"] += 1
+        entry["queue_wait"].append(queue_wait)
+        entry["run_time"].append(run_time)
+
+
+async def run_in_pool(pool_name: str, func, *args, endpoint: str = "unknown", **kwargs):
+    """Runs a blocking callable in the named pool and records its queue wait and run time."""
+    loop = asyncio.get_running_loop()
+    submitted = time.perf_counter()
+    context = contextvars.copy_context()
+
+    def _call():
+        started = time.perf_counter()
+        try:
+            return context.run(func, *args, **kwargs)
+        finally:
+            _record(endpoint, pool_name, started - submitted, time.perf_counter() - started)
+
+    return await loop.run_in_executor(_get_pool(pool_name), _call)
+
+
+run_io = functools.partial(run_in_pool, "io")
+run_inference = functools.partial(run_in_pool, "inference")
+run_transcription = functools.partial(run_in_pool, "transcription")
+
+
+def summarize_latencies(samples) -> dict:
+    """Average, p95 and maximum of latency samples in seconds, reported in milliseconds."""
+    if not samples:
+        return {"avg_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return {
+        "avg_ms": round(sum(ordered) / len(ordered) * 1000, 2),
+        "p95_ms": round(p95 * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2),
+    }
+
+
+def get_executor_stats() -> dict:
+    """Reports pool sizes and per-endpoint queue wait / run time over the last few hundred calls."""
+    with _stats_lock:
+        endpoints = {
+            name: {
+                "pool": entry["pool"],
+                "calls": entry["calls"],
+                "queue_wait": summarize_latencies(list(entry["queue_wait"])),
+                "run_time": summarize_latencies(list(entry["run_time"])),
+            }
+            for name, entry in _stats.items()
+        }
+    return {"pool_sizes": dict(POOL_SIZES), "endpoints": endpoints}
+
+
+def shutdown_pools():
+    """Stops all pools (called on application shutdown)."""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.shutdown(wait=False)
+        _pools.clear()
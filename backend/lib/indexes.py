@@ -0,0 +1,124 @@
+import os
+import threading
+
+# --- Mongo index declarations ---
+# The indexes every query in lib/ needs, per collection. Queries filter on user_id
+# (plus meeting_id, minutes_id, automated, automation_used or read) and sort or
+# range-filter on created_at, so compound keys follow equality -> sort -> range order.
+# List pages sort on (created_at, _id) for keyset pagination (see list_page in lib/database.py).
+# The calendar range-queries the normalized meeting_date_utc / deadline_utc fields.
+# Lookups by _id (with or without user_id) use the built-in _id index.
+# Cache collections expire entries through TTL indexes and evict by last_accessed_at.
+# ensure_indexes() is idempotent: it runs at API startup (MONGO_ENSURE_INDEXES=1,
+# the default) and from `python create_indexes.py`.
+
+MONGO_ENSURE_INDEXES = os.getenv("MONGO_ENSURE_INDEXES", "1") == "1"
+PROGRESS_EVENT_TTL_SECONDS = int(os.getenv("PROGRESS_EVENT_TTL_SECONDS", "86400"))
+AUTOMATION_CHECKPOINT_TTL_SECONDS = int(os.getenv("AUTOMATION_CHECKPOINT_TTL_SECONDS", str(7 * 86400)))
+
+INDEXES = {
+    "agendas": [
+        ([("user_id", 1), ("created_at", -1), ("_id", -1)], {}),
+        ([("user_id", 1), ("meeting_id", 1)], {}),
+    ],
+    "minutes": [
+        ([("user_id", 1), ("created_at", -1), ("_id", -1)], {}),
+    ],
+    "transcripts": [
+        ([("user_id", 1), ("created_at", -1), ("_id", -1)], {}),
+        ([("user_id", 1), ("automated", 1), ("created_at", -1)], {}),
+    ],
+    "meetings": [
+        ([("user_id", 1), ("created_at", -1), ("_id", -1)], {}),
+        ([("user_id", 1), ("automation_used", 1), ("created_at", -1)], {}),
+        ([("user_id", 1), ("meeting_date_utc", 1)], {}),
+    ],
+    "action_items": [
+        ([("user_id", 1), ("created_at", -1), ("_id", -1)], {}),
+        ([("user_id", 1), ("minutes_id", 1)], {}),
+        ([("user_id", 1), ("deadline_utc", 1)], {}),
+    ],
+    "notifications": [
+        ([("user_id", 1), ("created_at", -1)], {}),
+        ([("user_id", 1), ("read", 1)], {}),
+    ],
+    "usage_counters": [
+        ([("month", 1), ("user_id", 1)], {}),
+    ],
+    "google_credentials": [
+        ([("user_id", 1)], {}),
+    ],
+    "jobs": [
+        ([("status", 1), ("run_after", 1)], {}),
+        ([("status", 1), ("lease_expires_at", 1)], {}),
+        ([("user_id", 1), ("created_at", -1)], {}),
+    ],
+    "job_progress": [
+        ([("topic", 1), ("created_at", -1)], {}),
+        ([("created_at", 1)], {"expireAfterSeconds": PROGRESS_EVENT_TTL_SECONDS}),
+    ],
+    "automation_checkpoints": [
+        ([("run_key", 1)], {}),
+        ([("created_at", 1)], {"expireAfterSeconds": AUTOMATION_CHECKPOINT_TTL_SECONDS}),
+    ],
+    "llm_response_cache": [
+        ([("expires_at", 1)], {"expireAfterSeconds": 0}),
+        ([("last_accessed_at", 1)], {}),
+    ],
+    "transcription_cache": [
+        ([("source_key", 1)], {"sparse": True}),
+        ([("last_accessed_at", 1)], {}),
+        ([("created_at", 1)], {}),
+    ],
+}
+
+
+def ensure_indexes(db=None, collections=None) -> dict:
+    """
+    Creates every declared index that does not exist yet and returns {collection: [index names]}.
+    An index that conflicts with an existing one (same keys, different options) is reported and skipped.
+    """
+    from pymongo import IndexModel
+    from pymongo.errors import OperationFailure
+    if db is None:
+        from .database import get_db
+        db = get_db()
+
+    created = {}
+    for name in collections or INDEXES:
+        models = [IndexModel(keys, **options) for keys, options in INDEXES[name]]
+        try:
+            created[name] = db[name].create_indexes(models)
+        except OperationFailure as e:
+            print(f"⚠️ Could not create indexes on '{name}': {e}")
+    return created
+
+
+def missing_indexes(db=None) -> dict:
+    """Returns {collection: [key lists]} for declared indexes that do not exist yet."""
+    if db is None:
+        from .database import get_db
+        db = get_db()
+
+    missing = {}
+    for name, declared in INDEXES.items():
+        existing = {tuple((field, int(direction)) for field, direction in info["key"])
+                    for info in db[name].index_information().values()}
+        absent = [keys for keys, _ in declared if tuple(keys) not in existing]
+        if absent:
+            missing[name] = absent
+    return missing
+
+
+def ensure_indexes_in_background():
+    """Builds indexes without delaying startup; failures (e.g. Mongo unreachable) are only logged."""
+    def _run():
+        try:
+            created = ensure_indexes()
+            print(f"🗂️ Ensured indexes on {len(created)} collections.")
+        except Exception as e:
+            print(f"⚠️ Index bootstrap failed: {e}")
+
+    thread = threading.Thread(target=_run, name="index-bootstrap", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,430 @@
+import json
+import os
+import random
+import socket
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from contextlib import closing
+from datetime import datetime
+
+# --- Durable Job Queue ---
+# Jobs live in a persistent store (the Mongo `jobs` collection, or a SQLite file for
+# local runs and tests) and are processed by JobWorker instances in one or more
+# worker processes. A worker claims a job by taking a time-limited lease, renews
+# the lease with heartbeats while the handler runs, and either completes the job
+# or schedules a retry with exponential backoff. A lease that expires (crashed or
+# redeployed worker) makes the job claimable again by any worker, unless it was on its
+# last attempt: then it is marked failed, so a job that kills its worker cannot cycle forever.
+# That sweep (fail_abandoned) runs on each worker's reaper timer, every
+# JOB_REAP_INTERVAL_SECONDS, rather than on every claim poll.
+
+JOB_STORE = os.getenv("JOB_STORE", "mongo")
+JOB_SQLITE_PATH = os.getenv("JOB_SQLITE_PATH", os.path.join("data", "jobs.sqlite3"))
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "120"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_BACKOFF_SECONDS = float(os.getenv("JOB_RETRY_BACKOFF_SECONDS", "30"))
+JOB_POLL_INTERVAL_SECONDS = float(os.getenv("JOB_POLL_INTERVAL_SECONDS", "2"))
+JOB_REAP_INTERVAL_SECONDS = float(os.getenv("JOB_REAP_INTERVAL_SECONDS", "60"))
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+LEASE_EXPIRED_ERROR = "Worker stopped responding on the last attempt (lease expired)."
+
+
+def _new_job(job_type: str, payload: dict, user_id: str, max_attempts: int) -> dict:
+    now = time.time()
+    return {
+        "_id": uuid.uuid4().hex,
+        "type": job_type,
+        "payload": payload,
+        "user_id": user_id,
+        "status": QUEUED,
+        "attempts": 0,
+        "max_attempts": max_attempts,
+        "run_after": now,
+        "lease_owner": None,
+        "lease_expires_at": None,
+        "last_error": None,
+        "result": None,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def _to_public(job: dict) -> dict:
+    """Converts epoch timestamps to datetimes for API responses."""
+    if not job:
+        return job
+    job = dict(job)
+    for field in ("run_after", "lease_expires_at", "created_at", "updated_at", "started_at", "finished_at"):
+        if isinstance(job.get(field), (int, float)):
+            job[field] = datetime.utcfromtimestamp(job[field])
+    return job
+
+
+class MongoJobStore:
+    """Job store backed by the `jobs` collection; claims use find_one_and_update so they are atomic."""
+    def __init__(self, db=None):
+        self._db = db
+
+    @property
+    def collection(self):
+        if self._db is None:
+            from .database import get_db
+            self._db = get_db()
+        return self._db.jobs
+
+    def enqueue(self, job_type: str, payload: dict, user_id: str = None, max_attempts: int = JOB_MAX_ATTEMPTS) -> str:
+        job = _new_job(job_type, payload, user_id, max_attempts)
+        self.collection.insert_one(job)
+        return job["_id"]
+
+    def fail_abandoned(self, now: float) -> int:
+        """Marks jobs whose lease expired on their last attempt as failed."""
+        update = self.collection.update_many(
+            {"status": RUNNING, "lease_expires_at": {"$lt": now},
+             "$expr": {"$gte": ["$attempts", "$max_attempts"]}},
+            {"$set": {"status": FAILED, "last_error": LEASE_EXPIRED_ERROR, "lease_owner": None,
+                      "lease_expires_at": None, "finished_at": now, "updated_at": now}},
+        )
+        return update.modified_count
+
+    def claim(self, worker_id: str, lease_seconds: int = JOB_LEASE_SECONDS, job_types=None):
+        from pymongo import ReturnDocument
+        now = time.time()
+        query = {"$or": [
+            {"status": QUEUED, "run_after": {"$lte": now}},
+            {"status": RUNNING, "lease_expires_at": {"$lt": now},
+             "$expr": {"$lt": ["$attempts", "$max_attempts"]}},
+        ]}
+        if job_types:
+            query["type"] = {"$in": list(job_types)}
+        return self.collection.find_one_and_update(
+            query,
+            {"$set": {
+                "status": RUNNING,
+                "lease_owner": worker_id,
+                "lease_expires_at": now + lease_seconds,
+                "started_at": now,
+                "updated_at": now,
+            }, "$inc": {"attempts": 1}},
+            sort=[("run_after", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: int = JOB_LEASE_SECONDS) -> bool:
+        now = time.time()
+        result = self.collection.update_one(
+            {"_id": job_id, "status": RUNNING, "lease_owner": worker_id},
+            {"$set": {"lease_expires_at": now + lease_seconds, "updated_at": now}},
+        )
+        return result.matched_count > 0
+
+    def complete(self, job_id: str, worker_id: str, result=None) -> bool:
+        now = time.time()
+        update = self.collection.update_one(
+            {"_id": job_id, "status": RUNNING, "lease_owner": worker_id},
+            {"$set": {"status": SUCCEEDED, "result": result, "lease_owner": None,
+                      "lease_expires_at": None, "finished_at": now, "updated_at": now}},
+        )
+        return update.matched_count > 0
+
+    def fail(self, job_id: str, worker_id: str, error: str, retry_at: float = None) -> bool:
+        now = time.time()
+        fields = {"last_error": error, "lease_owner": None, "lease_expires_at": None, "updated_at": now}
+        if retry_at is None:
+            fields.update({"status": FAILED, "finished_at": now})
+        else:
+            fields.update({"status": QUEUED, "run_after": retry_at})
+        update = self.collection.update_one(
+            {"_id": job_id, "status": RUNNING, "lease_owner": worker_id},
+            {"$set": fields},
+        )
+        return update.matched_count > 0
+
+    def get(self, job_id: str, user_id: str = None):
+        query = {"_id": job_id}
+        if user_id:
+            query["user_id"] = user_id
+        return _to_public(self.collection.find_one(query))
+
+    def list_for_user(self, user_id: str, limit: int = 20) -> list:
+        jobs = self.collection.find({"user_id": user_id}, sort=[("created_at", -1)], limit=limit)
+        return [_to_public(job) for job in jobs]
+
+
+class SQLiteJobStore:
+    """Single-file job store for local development and tests. Safe across threads and processes."""
+    _COLUMNS = ("_id", "type", "payload", "user_id", "status", "attempts", "max_attempts", "run_after",
+                "lease_owner", "lease_expires_at", "last_error", "result", "created_at", "updated_at",
+                "started_at", "finished_at")
+
+    def __init__(self, path: str = JOB_SQLITE_PATH):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    _id TEXT PRIMARY KEY, type TEXT, payload TEXT, user_id TEXT, status TEXT,
+                    attempts INTEGER, max_attempts INTEGER, run_after REAL, lease_owner TEXT,
+                    lease_expires_at REAL, last_error TEXT, result TEXT, created_at REAL,
+                    updated_at REAL, started_at REAL, finished_at REAL
+                )""")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status_run_after ON jobs (status, run_after)")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_user_created ON jobs (user_id, created_at)")
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _row_to_job(self, row):
+        if row is None:
+            return None
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"]) if job["payload"] else {}
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def enqueue(self, job_type: str, payload: dict, user_id: str = None, max_attempts: int = JOB_MAX_ATTEMPTS) -> str:
+        job = _new_job(job_type, payload, user_id, max_attempts)
+        job["payload"] = json.dumps(payload)
+        job["started_at"] = job["finished_at"] = None
+        with closing(self._connect()) as conn:
+            conn.execute(
+                f"INSERT INTO jobs ({', '.join(self._COLUMNS)}) VALUES ({', '.join('?' * len(self._COLUMNS))})",
+                [job.get(c) for c in self._COLUMNS],
+            )
+        return job["_id"]
+
+    def fail_abandoned(self, now: float) -> int:
+        """Marks jobs whose lease expired on their last attempt as failed."""
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, last_error = ?, lease_owner = NULL, lease_expires_at = NULL, "
+                "finished_at = ?, updated_at = ? WHERE status = ? AND lease_expires_at < ? AND attempts >= max_attempts",
+                (FAILED, LEASE_EXPIRED_ERROR, now, now, RUNNING, now),
+            )
+            return cursor.rowcount
+
+    def claim(self, worker_id: str, lease_seconds: int = JOB_LEASE_SECONDS, job_types=None):
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            sql = ("SELECT _id FROM jobs WHERE ((status = ? AND run_after <= ?) "
+                   "OR (status = ? AND lease_expires_at < ? AND attempts < max_attempts))")
+            params = [QUEUED, now, RUNNING, now]
+            if job_types:
+                sql += f" AND type IN ({', '.join('?' * len(job_types))})"
+                params.extend(job_types)
+            row = conn.execute(sql + " ORDER BY run_after LIMIT 1", params).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = ?, lease_owner = ?, lease_expires_at = ?, started_at = ?, "
+                "updated_at = ?, attempts = attempts + 1 WHERE _id = ?",
+                (RUNNING, worker_id, now + lease_seconds, now, now, row["_id"]),
+            )
+            job = conn.execute("SELECT * FROM jobs WHERE _id = ?", (row["_id"],)).fetchone()
+            conn.execute("COMMIT")
+            return self._row_to_job(job)
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def _update_owned(self, job_id: str, worker_id: str, fields: dict) -> bool:
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                f"UPDATE jobs SET {assignments} WHERE _id = ? AND status = ? AND lease_owner = ?",
+                list(fields.values()) + [job_id, RUNNING, worker_id],
+            )
+            return cursor.rowcount > 0
+
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: int = JOB_LEASE_SECONDS) -> bool:
+        now = time.time()
+        return self._update_owned(job_id, worker_id, {"lease_expires_at": now + lease_seconds, "updated_at": now})
+
+    def complete(self, job_id: str, worker_id: str, result=None) -> bool:
+        now = time.time()
+        return self._update_owned(job_id, worker_id, {
+            "status": SUCCEEDED, "result": json.dumps(result, default=str), "lease_owner": None,
+            "lease_expires_at": None, "finished_at": now, "updated_at": now,
+        })
+
+    def fail(self, job_id: str, worker_id: str, error: str, retry_at: float = None) -> bool:
+        now = time.time()
+        fields = {"last_error": error, "lease_owner": None, "lease_expires_at": None, "updated_at": now}
+        if retry_at is None:
+            fields.update({"status": FAILED, "finished_at": now})
+        else:
+            fields.update({"status": QUEUED, "run_after": retry_at})
+        return self._update_owned(job_id, worker_id, fields)
+
+    def get(self, job_id: str, user_id: str = None):
+        sql, params = "SELECT * FROM jobs WHERE _id = ?", [job_id]
+        if user_id:
+            sql, params = sql + " AND user_id = ?", params + [user_id]
+        with closing(self._connect()) as conn:
+            return _to_public(self._row_to_job(conn.execute(sql, params).fetchone()))
+
+    def list_for_user(self, user_id: str, limit: int = 20) -> list:
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT * FROM jobs WHERE user_id = ? ORDER BY created_at DESC LIMIT ?", (user_id, limit)
+            ).fetchall()
+        return [_to_public(self._row_to_job(row)) for row in rows]
+
+
+# --- Singleton store, chosen by JOB_STORE ---
+_job_store = None
+
+
+def get_job_store():
+    """Returns the process-wide job store (JOB_STORE=mongo|sqlite)."""
+    global _job_store
+    if _job_store is None:
+        _job_store = SQLiteJobStore() if JOB_STORE == "sqlite" else MongoJobStore()
+    return _job_store
+
+
+def enqueue_job(job_type: str, payload: dict, user_id: str = None, max_attempts: int = JOB_MAX_ATTEMPTS) -> str:
+    """Adds a job to the queue and returns its ID."""
+    job_id = get_job_store().enqueue(job_type, payload, user_id=user_id, max_attempts=max_attempts)
+    print(f"📥 Enqueued {job_type} job {job_id} for user {user_id}")
+    return job_id
+
+
+def retry_delay_seconds(attempts: int, base: float = JOB_RETRY_BACKOFF_SECONDS) -> float:
+    """Exponential backoff with +/-20% jitter: base, 2*base, 4*base, ..."""
+    return base * (2 ** max(0, attempts - 1)) * random.uniform(0.8, 1.2)
+
+
+class JobWorker:
+    """
+    Processes jobs from a store with at most `concurrency` jobs in flight.
+    `handlers` maps a job type to a callable(payload, job) whose return value is stored as the result.
+    `on_status`, if given, is called as on_status(job, status, error) on every status change.
+    """
+    def __init__(self, store, handlers: dict, concurrency: int = 1, lease_seconds: int = JOB_LEASE_SECONDS,
+                 poll_interval: float = JOB_POLL_INTERVAL_SECONDS, worker_id: str = None,
+                 backoff_seconds: float = JOB_RETRY_BACKOFF_SECONDS, on_status=None,
+                 reap_interval: float = JOB_REAP_INTERVAL_SECONDS):
+        self.store = store
+        self.handlers = handlers
+        self.on_status = on_status
+        self.concurrency = max(1, concurrency)
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.backoff_seconds = backoff_seconds
+        self.reap_interval = reap_interval
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self._stop = threading.Event()
+        self._threads = []
+        self._active = set()
+        self._active_lock = threading.Lock()
+
+    def run_once(self) -> bool:
+        """Claims and processes a single job. Returns False if nothing was claimable."""
+        job = self.store.claim(self.worker_id, self.lease_seconds, job_types=list(self.handlers))
+        if not job:
+            return False
+        self._process(job)
+        return True
+
+    def _notify(self, job: dict, status: str, error: str = None):
+        if not self.on_status:
+            return
+        try:
+            self.on_status(job, status, error)
+        except Exception as e:
+            print(f"⚠️ Status hook failed for job {job['_id']}: {e}")
+
+    def _process(self, job: dict):
+        job_id = job["_id"]
+        with self._active_lock:
+            self._active.add(job_id)
+        print(f"⚙️ [{self.worker_id}] Running {job['type']} job {job_id} (attempt {job['attempts']}/{job['max_attempts']})")
+        self._notify(job, RUNNING)
+        try:
+            result = self.handlers[job["type"]](job.get("payload") or {}, job)
+        except Exception as e:
+            traceback.print_exc()
+            retry_at = None
+            if job["attempts"] < job["max_attempts"]:
+                retry_at = time.time() + retry_delay_seconds(job["attempts"], self.backoff_seconds)
+            self.store.fail(job_id, self.worker_id, str(e), retry_at=retry_at)
+            print(f"❌ Job {job_id} failed: {e}. " + ("Retry scheduled." if retry_at else "No attempts left."))
+            self._notify(job, QUEUED if retry_at else FAILED, str(e))
+        else:
+            if self.store.complete(job_id, self.worker_id, result):
+                self._notify(job, SUCCEEDED)
+            else:
+                print(f"⚠️ Job {job_id} finished but its lease was lost; another worker may have re-run it.")
+        finally:
+            with self._active_lock:
+                self._active.discard(job_id)
+
+    def _heartbeat_loop(self):
+        interval = max(1.0, self.lease_seconds / 3)
+        while not self._stop.wait(interval):
+            with self._active_lock:
+                active = list(self._active)
+            for job_id in active:
+                try:
+                    if not self.store.heartbeat(job_id, self.worker_id, self.lease_seconds):
+                        print(f"⚠️ Lost lease on job {job_id}.")
+                except Exception as e:
+                    print(f"⚠️ Heartbeat failed for job {job_id}: {e}")
+
+    def reap_abandoned(self) -> int:
+        """Fails jobs whose lease expired on their last attempt. Returns how many were failed."""
+        failed = self.store.fail_abandoned(time.time())
+        if failed:
+            print(f"🪦 [{self.worker_id}] Marked {failed} abandoned job(s) as failed.")
+        return failed
+
+    def _reaper_loop(self):
+        while not self._stop.is_set():
+            try:
+                self.reap_abandoned()
+            except Exception as e:
+                print(f"⚠️ Reaper error: {e}")
+            self._stop.wait(self.reap_interval)
+
+    def _slot_loop(self):
+        while not self._stop.is_set():
+            try:
+                if self.run_once():
+                    continue
+            except Exception as e:
+                print(f"⚠️ Worker loop error: {e}")
+            self._stop.wait(self.poll_interval)
+
+    def start(self):
+        """Starts `concurrency` processing threads plus a heartbeat thread and a reaper thread."""
+        print(f"👷 Starting job worker {self.worker_id} with concurrency {self.concurrency}")
+        self._threads = [
+            threading.Thread(target=self._heartbeat_loop, name="job-heartbeat", daemon=True),
+            threading.Thread(target=self._reaper_loop, name="job-reaper", daemon=True),
+        ]
+        self._threads += [
+            threading.Thread(target=self._slot_loop, name=f"job-slot-{i}", daemon=True)
+            for i in range(self.concurrency)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, wait: bool = True, timeout: float = None):
+        """Stops claiming new jobs; in-flight jobs finish (or their leases expire if the process dies)."""
+        self._stop.set()
+        if wait:
+            for thread in self._threads:
+                thread.join(timeout)
@@ -0,0 +1,227 @@
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from . import llm_gateway
+
+# --- LLM response cache ---
+# Deterministic text prompts are answered from a cache keyed by sha256(model + prompt
+# template name and version + whitespace-normalized input), so the same input does not
+# pay for the same call twice. Bump a template's version whenever its wording changes.
+# Action-item extraction (gemini_provider, used by /generate-action-items and the
+# automation flow when ACTION_ITEMS_PROVIDER=gemini) goes through it, so re-running either
+# on the same minutes does not repeat the paid call. Transcripts are cached separately by
+# lib/transcript_cache.
+#   - memory tier: an LRU of LLM_CACHE_MEMORY_ENTRIES responses per process
+#   - Mongo tier: the `llm_response_cache` collection, shared by the API and workers;
+#     entries expire through a TTL index on expires_at, and beyond LLM_CACHE_MAX_ENTRIES
+#     the least recently used are evicted
+# Both tiers keep entries for LLM_CACHE_TTL_SECONDS. Concurrent calls for the same key are
+# coalesced: one thread calls the model and the others wait for its answer (single-flight).
+# Errors are never cached, and Mongo failures count as misses.
+
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+LLM_CACHE_MEMORY_ENTRIES = int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", "256"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+LLM_CACHE_PERSIST = os.getenv("LLM_CACHE_PERSIST", "1") == "1"
+
+_memory = OrderedDict()  # key -> (response, expires_at monotonic)
+_memory_lock = threading.Lock()
+_in_flight = {}  # key -> _Flight
+_in_flight_lock = threading.Lock()
+_stats = {"memory_hits": 0, "mongo_hits": 0, "misses": 0, "coalesced": 0, "stores": 0, "evictions": 0, "errors": 0}
+_stats_lock = threading.Lock()
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.response = None
+        self.error = None
+
+
+def _count(name: str, amount: int = 1):
+    with _stats_lock:
+        _stats[name] += amount
+
+
+def _collection():
+    from .database import get_db
+    return get_db().llm_response_cache
+
+
+def normalize_input(text: str) -> str:
+    """Whitespace differences do not change the answer; case can (names), so it is kept."""
+    return _WHITESPACE_RE.sub(" ", (text or "").strip())
+
+
+def cache_key(model: str, template: str, version: str, input_text: str) -> str:
+    h = hashlib.sha256()
+    for part in (model, template, version, normalize_input(input_text)):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+# --- Memory tier ---
+
+def _memory_get(key: str):
+    with _memory_lock:
+        entry = _memory.get(key)
+        if entry is None:
+            return None
+        response, expires_at = entry
+        if time.monotonic() >= expires_at:
+            del _memory[key]
+            return None
+        _memory.move_to_end(key)
+        return response
+
+
+def _memory_put(key: str, response: str, ttl_seconds: float):
+    with _memory_lock:
+        _memory[key] = (response, time.monotonic() + ttl_seconds)
+        _memory.move_to_end(key)
+        while len(_memory) > LLM_CACHE_MEMORY_ENTRIES:
+            _memory.popitem(last=False)
+
+
+# --- Mongo tier ---
+
+def _mongo_get(key: str):
+    """Returns (response, seconds left) for a live entry, or None."""
+    if not LLM_CACHE_PERSIST:
+        return None
+    now = datetime.utcnow()
+    try:
+        doc = _collection().find_one_and_update(
+            {"_id": key, "expires_at": {"$gt": now}},
+            {"$set": {"last_accessed_at": now}, "$inc": {"hits": 1}},
+            projection={"response": 1, "expires_at": 1},
+        )
+    except Exception as e:
+        print(f"⚠️ LLM cache lookup failed: {e}")
+        _count("errors")
+        return None
+    if not doc:
+        return None
+    return doc["response"], (doc["expires_at"] - now).total_seconds()
+
+
+def _mongo_put(key: str, response: str, model: str, template: str, version: str):
+    if not LLM_CACHE_PERSIST:
+        return
+    now = datetime.utcnow()
+    try:
+        collection = _collection()
+        collection.update_one(
+            {"_id": key},
+            {"$set": {
+                "response": response, "model": model, "template": template, "version": version,
+                "created_at": now, "last_accessed_at": now,
+                "expires_at": now + timedelta(seconds=LLM_CACHE_TTL_SECONDS),
+            }, "$setOnInsert": {"hits": 0}},
+            upsert=True,
+        )
+        _count("stores")
+        _enforce_limit(collection)
+    except Exception as e:
+        print(f"⚠️ Could not store LLM response in cache: {e}")
+        _count("errors")
+
+
+def _enforce_limit(collection):
+    excess = collection.estimated_document_count() - LLM_CACHE_MAX_ENTRIES
+    if excess <= 0:
+        return
+    oldest = [doc["_id"] for doc in collection.find({}, {"_id": 1}).sort("last_accessed_at", 1).limit(excess)]
+    _count("evictions", collection.delete_many({"_id": {"$in": oldest}}).deleted_count)
+
+
+# --- Lookups ---
+
+def cached_call(key: str, compute, cacheable=None, describe: tuple = ("", "", "")) -> str:
+    """
+    Returns the cached response for `key`, or calls `compute()` once (even when several
+    threads ask at the same time) and caches its result if `cacheable(result)` allows it.
+    `describe` is (model, template, version), stored with the Mongo entry.
+    """
+    response = _memory_get(key)
+    if response is not None:
+        _count("memory_hits")
+        return response
+
+    with _in_flight_lock:
+        flight = _in_flight.get(key)
+        leader = flight is None
+        if leader:
+            flight = _in_flight[key] = _Flight()
+    if not leader:
+        _count("coalesced")
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.response
+
+    try:
+        # Another leader may have finished between the memory check and taking the flight.
+        response = _memory_get(key)
+        found = None if response is not None else _mongo_get(key)
+        if response is not None:
+            _count("memory_hits")
+        elif found is not None:
+            _count("mongo_hits")
+            response, seconds_left = found
+            _memory_put(key, response, min(seconds_left, LLM_CACHE_TTL_SECONDS))
+        else:
+            _count("misses")
+            response = compute()
+            if cacheable is None or cacheable(response):
+                _memory_put(key, response, LLM_CACHE_TTL_SECONDS)
+                _mongo_put(key, response, *describe)
+        flight.response = response
+        return response
+    except Exception as e:
+        flight.error = e
+        raise
+    finally:
+        with _in_flight_lock:
+            _in_flight.pop(key, None)
+        flight.done.set()
+
+
+def cached_generate(template: str, version: str, input_text: str, prompt, model: str = None,
+                    cacheable=None, **kwargs) -> str:
+    """llm_gateway.generate(prompt, model, **kwargs), answered from the cache when the same input was seen."""
+    model = model or llm_gateway.LLM_DEFAULT_MODEL
+    return cached_call(
+        cache_key(model, template, version, input_text),
+        lambda: llm_gateway.generate(prompt, model=model, **kwargs),
+        cacheable=cacheable,
+        describe=(model, template, version),
+    )
+
+
+def clear_memory():
+    with _memory_lock:
+        _memory.clear()
+
+
+def get_cache_stats() -> dict:
+    """Returns process-local hit/miss/coalescing counters and the tiers' sizes."""
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = stats["memory_hits"] + stats["mongo_hits"] + stats["misses"]
+    stats["hit_rate"] = round((stats["memory_hits"] + stats["mongo_hits"]) / lookups, 3) if lookups else 0.0
+    with _memory_lock:
+        stats["memory_entries"] = len(_memory)
+    if LLM_CACHE_PERSIST:
+        try:
+            stats["mongo_entries"] = _collection().estimated_document_count()
+        except Exception as e:
+            print(f"⚠️ Could not read LLM cache size: {e}")
+    return stats
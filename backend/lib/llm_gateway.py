@@ -0,0 +1,542 @@
+import asyncio
+import os
+import random
+import threading
+import time
+import weakref
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from .executors import summarize_latencies
+
+# --- LLM gateway ---
+# Every Gemini call goes through generate() / agenerate(), which add:
+#   - lazy configuration: the SDK is imported and configured with GOOGLE_API_KEY on the
+#     first call, once per process, and GenerativeModel clients are reused per model
+#   - a token bucket per model, LLM_RATE_LIMITS requests per minute ("model=rpm,...",
+#     LLM_DEFAULT_RPM for unlisted models) with bursts of LLM_BURST, so a batch of calls
+#     queues here instead of being rejected with 429
+#   - at most LLM_MAX_CONCURRENCY requests in flight per process
+#   - a per-call timeout (LLM_TIMEOUT_SECONDS unless the caller passes one)
+#   - up to LLM_MAX_ATTEMPTS attempts on 429 / 5xx / timeouts, with full-jitter
+#     exponential backoff (LLM_RETRY_BASE_SECONDS, capped at LLM_RETRY_MAX_SECONDS)
+#   - hedging: once LLM_HEDGE_MIN_SAMPLES calls of an operation (e.g. "action_items") have
+#     completed, a call still running after the operation's LLM_HEDGE_PERCENTILE latency
+#     gets a duplicate request (if the rate limit has a token to spare) and the first
+#     answer wins. LLM_HEDGE=0 turns it off.
+#   - a circuit breaker per model: when at least LLM_BREAKER_ERROR_RATE of the last
+#     LLM_BREAKER_WINDOW calls failed with 429 / 5xx / timeouts, calls fail fast with
+#     CircuitOpenError for LLM_BREAKER_COOLDOWN_SECONDS, then one probe call decides
+#     whether to close it again. Callers catch LLMError to fall back (e.g. the tracker
+#     falls back to the NLTK extractor).
+# LLM_BACKEND=fake swaps Gemini for FakeBackend (no network, no key), for offline tests
+# and load runs; LLM_FAKE_LATENCY_SECONDS sets its response time. Tests can also install
+# their own backend with set_backend().
+
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini")
+LLM_DEFAULT_MODEL = os.getenv("LLM_DEFAULT_MODEL", "gemini-2.5-flash")
+LLM_RATE_LIMITS = os.getenv("LLM_RATE_LIMITS", "gemini-2.5-pro=150,gemini-2.5-flash=1000")
+LLM_DEFAULT_RPM = float(os.getenv("LLM_DEFAULT_RPM", "60"))
+LLM_BURST = int(os.getenv("LLM_BURST", "5"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "120"))
+LLM_MAX_ATTEMPTS = int(os.getenv("LLM_MAX_ATTEMPTS", "4"))
+LLM_RETRY_BASE_SECONDS = float(os.getenv("LLM_RETRY_BASE_SECONDS", "1"))
+LLM_RETRY_MAX_SECONDS = float(os.getenv("LLM_RETRY_MAX_SECONDS", "30"))
+LLM_FAKE_LATENCY_SECONDS = float(os.getenv("LLM_FAKE_LATENCY_SECONDS", "0"))
+LLM_HEDGE = os.getenv("LLM_HEDGE", "1") == "1"
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "0.95"))
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+LLM_HEDGE_MIN_SECONDS = float(os.getenv("LLM_HEDGE_MIN_SECONDS", "1"))
+LLM_BREAKER_WINDOW = int(os.getenv("LLM_BREAKER_WINDOW", "20"))
+LLM_BREAKER_MIN_CALLS = int(os.getenv("LLM_BREAKER_MIN_CALLS", "10"))
+LLM_BREAKER_ERROR_RATE = float(os.getenv("LLM_BREAKER_ERROR_RATE", "0.5"))
+LLM_BREAKER_COOLDOWN_SECONDS = float(os.getenv("LLM_BREAKER_COOLDOWN_SECONDS", "60"))
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+_STATS_WINDOW = 512
+
+
+class LLMError(Exception):
+    """A failed LLM call; `status` is the HTTP status when the backend reported one."""
+    def __init__(self, message: str, status: int = None):
+        super().__init__(message)
+        self.status = status
+
+
+class LLMTimeout(LLMError):
+    def __init__(self, message: str):
+        super().__init__(message, status=504)
+
+
+class CircuitOpenError(LLMError):
+    """The model's circuit breaker is open; the call was not sent."""
+
+
+def status_of(exc: Exception):
+    """The HTTP status of a backend error (google.api_core errors carry it as `code`), or None."""
+    if isinstance(exc, LLMError):
+        return exc.status
+    if isinstance(exc, (TimeoutError, asyncio.TimeoutError)):
+        return 504
+    code = getattr(exc, "code", None)
+    return code if isinstance(code, int) else None
+
+
+def is_retryable(exc: Exception) -> bool:
+    return status_of(exc) in RETRYABLE_STATUSES
+
+
+class TokenBucket:
+    """`rate` requests per second with bursts of up to `capacity`. Callers are served in arrival order."""
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Takes a token and returns how long the caller must wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def try_acquire(self) -> bool:
+        """Takes a token only if one is available right now."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    def acquire(self) -> float:
+        wait = self.reserve()
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self) -> float:
+        wait = self.reserve()
+        if wait:
+            await asyncio.sleep(wait)
+        return wait
+
+
+class CircuitBreaker:
+    """
+    Closed until at least `error_rate` of the last `window` outcomes (and `min_calls` or more)
+    are failures; then open for `cooldown_seconds`, after which one probe call is let through
+    (half-open) and its outcome closes or reopens the circuit.
+    """
+    def __init__(self, window: int = LLM_BREAKER_WINDOW, min_calls: int = LLM_BREAKER_MIN_CALLS,
+                 error_rate: float = LLM_BREAKER_ERROR_RATE, cooldown_seconds: float = LLM_BREAKER_COOLDOWN_SECONDS):
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.cooldown_seconds = cooldown_seconds
+        self.state = "closed"
+        self.trips = 0
+        self._outcomes = deque(maxlen=window)
+        self._opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "open" and time.monotonic() - self._opened_at >= self.cooldown_seconds:
+                self.state, self._probing = "half_open", False
+            if self.state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            return self.state == "closed"
+
+    def record(self, ok: bool) -> bool:
+        """Records an outcome; returns True if it tripped the breaker."""
+        with self._lock:
+            if self.state == "half_open":
+                self._probing = False
+                if ok:
+                    self.state = "closed"
+                    self._outcomes.clear()
+                    return False
+                return self._trip()
+            self._outcomes.append(ok)
+            failures = self._outcomes.count(False)
+            if (self.state == "closed" and len(self._outcomes) >= self.min_calls
+                    and failures / len(self._outcomes) >= self.error_rate):
+                return self._trip()
+            return False
+
+    def _trip(self) -> bool:
+        self.state = "open"
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self.trips += 1
+        return True
+
+
+# --- Backends ---
+
+class GeminiBackend:
+    """google-generativeai, configured on first use."""
+    name = "gemini"
+
+    def __init__(self):
+        self._models = {}
+        self._lock = threading.Lock()
+        self._configured = False
+
+    def _configure(self):
+        if self._configured:
+            return
+        try:
+            from dotenv import load_dotenv
+            load_dotenv()
+        except ImportError:
+            pass
+        api_key = os.getenv("GOOGLE_API_KEY")
+        if not api_key:
+            raise LLMError("GOOGLE_API_KEY not found. Make sure it's set in your .env file.")
+        import google.generativeai as genai
+        genai.configure(api_key=api_key)
+        self._configured = True
+        print("🤖 Gemini client configured.")
+
+    def _model(self, model: str):
+        with self._lock:
+            self._configure()
+            if model not in self._models:
+                from google.generativeai import GenerativeModel
+                self._models[model] = GenerativeModel(model)
+            return self._models[model]
+
+    def generate(self, model: str, contents, timeout: float) -> str:
+        response = self._model(model).generate_content(contents, request_options={"timeout": timeout})
+        return response.text
+
+    async def agenerate(self, model: str, contents, timeout: float) -> str:
+        response = await self._model(model).generate_content_async(contents, request_options={"timeout": timeout})
+        return response.text
+
+
+class FakeBackend:
+    """
+    Offline backend. Answers with `respond(model, contents)` after `latency` seconds (a number,
+    or a callable returning one per call). `failures` lists statuses to fail the first calls with.
+    """
+    name = "fake"
+
+    def __init__(self, respond=None, latency=LLM_FAKE_LATENCY_SECONDS, failures=None):
+        self.respond = respond or (lambda model, contents: "[]")
+        self.latency = latency
+        self.failures = deque(failures or [])
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def _start(self, model: str, contents):
+        with self._lock:
+            self.calls.append((model, contents))
+            status = self.failures.popleft() if self.failures else None
+        latency = self.latency() if callable(self.latency) else self.latency
+        return status, latency
+
+    def _finish(self, model: str, contents, status) -> str:
+        if status:
+            raise LLMError(f"Fake backend returned {status}.", status=status)
+        return self.respond(model, contents)
+
+    def generate(self, model: str, contents, timeout: float) -> str:
+        status, latency = self._start(model, contents)
+        if latency > timeout:
+            time.sleep(timeout)
+            raise LLMTimeout(f"{model} did not answer within {timeout}s.")
+        time.sleep(latency)
+        return self._finish(model, contents, status)
+
+    async def agenerate(self, model: str, contents, timeout: float) -> str:
+        status, latency = self._start(model, contents)
+        await asyncio.sleep(latency)
+        return self._finish(model, contents, status)
+
+
+# --- Gateway ---
+
+_backend = None
+_backend_lock = threading.Lock()
+_buckets = {}
+_breakers = {}
+_latencies = {}  # (model, operation) -> recent successful call latencies, for hedge budgets
+_registry_lock = threading.Lock()
+_concurrency = threading.BoundedSemaphore(LLM_MAX_CONCURRENCY)
+_async_concurrency = weakref.WeakKeyDictionary()  # event loop -> asyncio.Semaphore
+_hedge_pool = None
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def get_backend():
+    """Returns the configured backend: FakeBackend if LLM_BACKEND=fake, otherwise Gemini."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = FakeBackend() if LLM_BACKEND == "fake" else GeminiBackend()
+        return _backend
+
+
+def set_backend(backend):
+    """Replaces the backend and resets breakers and hedge budgets (used by tests and load runs)."""
+    global _backend
+    with _backend_lock:
+        _backend = backend
+    with _registry_lock:
+        _breakers.clear()
+        _latencies.clear()
+
+
+def _rate_limits() -> dict:
+    limits = {}
+    for entry in LLM_RATE_LIMITS.split(","):
+        model, _, rpm = entry.partition("=")
+        if model.strip() and rpm.strip():
+            limits[model.strip()] = float(rpm)
+    return limits
+
+
+def _bucket(model: str) -> TokenBucket:
+    with _registry_lock:
+        if model not in _buckets:
+            rpm = _rate_limits().get(model, LLM_DEFAULT_RPM)
+            _buckets[model] = TokenBucket(rpm / 60.0, LLM_BURST)
+        return _buckets[model]
+
+
+def get_breaker(model: str) -> CircuitBreaker:
+    with _registry_lock:
+        if model not in _breakers:
+            _breakers[model] = CircuitBreaker()
+        return _breakers[model]
+
+
+def _latency_window(model: str, operation: str) -> deque:
+    with _registry_lock:
+        return _latencies.setdefault((model, operation), deque(maxlen=_STATS_WINDOW))
+
+
+def hedge_budget(model: str, operation: str = None):
+    """Seconds after which a call gets a hedge request, or None while there are too few samples."""
+    samples = sorted(_latency_window(model, operation))
+    if not LLM_HEDGE or len(samples) < LLM_HEDGE_MIN_SAMPLES:
+        return None
+    budget = samples[min(len(samples) - 1, int(len(samples) * LLM_HEDGE_PERCENTILE))]
+    return max(budget, LLM_HEDGE_MIN_SECONDS)
+
+
+def _get_hedge_pool() -> ThreadPoolExecutor:
+    global _hedge_pool
+    with _registry_lock:
+        if _hedge_pool is None:
+            _hedge_pool = ThreadPoolExecutor(max_workers=LLM_MAX_CONCURRENCY * 2, thread_name_prefix="llm-hedge")
+        return _hedge_pool
+
+
+def _async_semaphore() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    with _registry_lock:
+        if loop not in _async_concurrency:
+            _async_concurrency[loop] = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+        return _async_concurrency[loop]
+
+
+def _backoff(attempt: int) -> float:
+    return random.uniform(0, min(LLM_RETRY_MAX_SECONDS, LLM_RETRY_BASE_SECONDS * 2 ** (attempt - 1)))
+
+
+def _record(model: str, name: str, amount: float = 1, latency: float = None):
+    with _stats_lock:
+        entry = _stats.setdefault(model, {
+            "completed": 0, "errors": 0, "retries": 0, "timeouts": 0, "rejected": 0,
+            "hedges": 0, "hedge_wins": 0, "breaker_trips": 0,
+            "throttled_seconds": 0.0, "latency": deque(maxlen=_STATS_WINDOW),
+        })
+        entry[name] += amount
+        if latency is not None:
+            entry["latency"].append(latency)
+
+
+def _admit(model: str) -> CircuitBreaker:
+    breaker = get_breaker(model)
+    if not breaker.allow():
+        _record(model, "rejected")
+        raise CircuitOpenError(f"Circuit breaker for {model} is open.", status=503)
+    return breaker
+
+
+def _failed(model: str, breaker: CircuitBreaker, exc: Exception, attempt: int, attempts: int) -> float:
+    """
+    Records a failed attempt; returns the backoff before the next one. If there is none,
+    raises the error as an LLMError (backend exceptions such as google.api_core's are
+    wrapped, keeping their status), so callers need to catch only LLMError.
+    """
+    status = status_of(exc)
+    _record(model, "timeouts" if status == 504 else "errors")
+    # Client errors (400, 403, ...) say nothing about the model's health.
+    if breaker.record(status not in RETRYABLE_STATUSES):
+        _record(model, "breaker_trips")
+        print(f"🔌 Circuit breaker for {model} opened after repeated failures.")
+    if status not in RETRYABLE_STATUSES or attempt >= attempts:
+        if isinstance(exc, LLMError):
+            raise exc
+        raise LLMError(f"{model} call failed: {exc}", status=status) from exc
+    _record(model, "retries")
+    wait = _backoff(attempt)
+    print(f"⚠️ {model} call failed ({status}): {exc}. Retrying in {wait:.1f}s (attempt {attempt + 1}/{attempts})...")
+    return wait
+
+
+def _succeeded(model: str, breaker: CircuitBreaker, started: float):
+    breaker.record(True)
+    _record(model, "completed", latency=time.perf_counter() - started)
+
+
+def _first_success(futures: list, hedge, model: str):
+    """Waits for the first of `futures` to succeed; raises the first error if all fail."""
+    pending, error = set(futures), None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                if future is hedge:
+                    _record(model, "hedge_wins")
+                return future.result()
+            error = error or future.exception()
+    raise error
+
+
+def _call(backend, model: str, contents, timeout: float, operation: str, hedge: bool) -> str:
+    """One attempt, hedged with a duplicate request if it runs past the operation's budget."""
+    latencies = _latency_window(model, operation)
+
+    def _once():
+        started = time.perf_counter()
+        with _concurrency:
+            text = backend.generate(model, contents, timeout)
+        latencies.append(time.perf_counter() - started)
+        return text
+
+    budget = hedge_budget(model, operation) if hedge else None
+    if budget is None:
+        return _once()
+    pool = _get_hedge_pool()
+    primary = pool.submit(_once)
+    done, _ = wait([primary], timeout=budget)
+    if done or not _bucket(model).try_acquire():
+        return primary.result()
+    _record(model, "hedges")
+    # The slower request cannot be cancelled; it finishes in the background and is ignored.
+    hedge_future = pool.submit(_once)
+    return _first_success([primary, hedge_future], hedge_future, model)
+
+
+def generate(contents, model: str = None, timeout: float = None, attempts: int = None,
+             operation: str = None, hedge: bool = True) -> str:
+    """
+    Sends a prompt (a string, or a list of parts such as {"mime_type", "data"} blobs) and
+    returns the response text. Retryable failures are retried; the last error is raised
+    as an LLMError.
+    `operation` names the kind of call, so hedge budgets compare like with like.
+    """
+    model = model or LLM_DEFAULT_MODEL
+    timeout = timeout or LLM_TIMEOUT_SECONDS
+    attempts = attempts or LLM_MAX_ATTEMPTS
+    backend = get_backend()
+    for attempt in range(1, attempts + 1):
+        breaker = _admit(model)
+        _record(model, "throttled_seconds", _bucket(model).acquire())
+        started = time.perf_counter()
+        try:
+            text = _call(backend, model, contents, timeout, operation, hedge)
+        except Exception as e:
+            time.sleep(_failed(model, breaker, e, attempt, attempts))
+            continue
+        _succeeded(model, breaker, started)
+        return text
+
+
+async def _acall(backend, model: str, contents, timeout: float, operation: str, hedge: bool) -> str:
+    latencies = _latency_window(model, operation)
+
+    async def _once():
+        started = time.perf_counter()
+        try:
+            async with _async_semaphore():
+                text = await asyncio.wait_for(backend.agenerate(model, contents, timeout), timeout)
+        except asyncio.TimeoutError:
+            raise LLMTimeout(f"{model} did not answer within {timeout}s.")
+        latencies.append(time.perf_counter() - started)
+        return text
+
+    budget = hedge_budget(model, operation) if hedge else None
+    primary = asyncio.ensure_future(_once())
+    if budget is None:
+        return await primary
+    done, _ = await asyncio.wait({primary}, timeout=budget)
+    if done or not _bucket(model).try_acquire():
+        return await primary
+    _record(model, "hedges")
+    hedge_task = asyncio.ensure_future(_once())
+    pending, error = {primary, hedge_task}, None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is hedge_task:
+                        _record(model, "hedge_wins")
+                    return task.result()
+                error = error or task.exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def agenerate(contents, model: str = None, timeout: float = None, attempts: int = None,
+                    operation: str = None, hedge: bool = True) -> str:
+    """The async form of generate(), for callers running on an event loop. The losing hedge is cancelled."""
+    model = model or LLM_DEFAULT_MODEL
+    timeout = timeout or LLM_TIMEOUT_SECONDS
+    attempts = attempts or LLM_MAX_ATTEMPTS
+    backend = get_backend()
+    for attempt in range(1, attempts + 1):
+        breaker = _admit(model)
+        _record(model, "throttled_seconds", await _bucket(model).acquire_async())
+        started = time.perf_counter()
+        try:
+            text = await _acall(backend, model, contents, timeout, operation, hedge)
+        except Exception as e:
+            await asyncio.sleep(_failed(model, breaker, e, attempt, attempts))
+            continue
+        _succeeded(model, breaker, started)
+        return text
+
+
+def get_llm_stats() -> dict:
+    """
+    Reports per-model completed calls, errors, retries, timeouts, calls rejected by an open
+    breaker, hedges and hedge wins, breaker trips and state, time spent throttled and latency.
+    """
+    with _stats_lock:
+        models = {
+            model: {**{k: v for k, v in entry.items() if k != "latency"}, "latency": summarize_latencies(list(entry["latency"]))}
+            for model, entry in _stats.items()
+        }
+    for model, entry in models.items():
+        entry["breaker_state"] = get_breaker(model).state
+    with _registry_lock:
+        windows = dict(_latencies)
+    budgets = {f"{model}/{operation or 'default'}": hedge_budget(model, operation) for model, operation in windows}
+    return {"backend": get_backend().name, "models": models, "hedge_budgets_seconds": budgets}
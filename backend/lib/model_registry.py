@@ -0,0 +1,157 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# --- Process-wide Model Registry ---
+# Every agent asks this module for its HF pipeline instead of building its own.
+# Models are loaded once on first use, kept in LRU order and evicted when the
+# total resident size would exceed MODEL_REGISTRY_MAX_MB (0 = unbounded).
+
+SUMMARIZER_SMALL = ("summarization", "sshleifer/distilbart-cnn-12-6")
+SUMMARIZER_LARGE = ("summarization", "facebook/bart-large-cnn")
+ZERO_SHOT_CLASSIFIER = ("zero-shot-classification", "facebook/bart-large-mnli")
+WARMUP_MODELS = [SUMMARIZER_SMALL, ZERO_SHOT_CLASSIFIER, SUMMARIZER_LARGE]
+
+_models = OrderedDict()   # (task, model_name) -> pipeline, most recently used last
+_stats = {}               # (task, model_name) -> {"load_seconds", "memory_mb", ...}
+_registry_lock = threading.Lock()
+_load_locks = {}
+
+
+def _max_memory_mb() -> float:
+    return float(os.getenv("MODEL_REGISTRY_MAX_MB", "0") or 0)
+
+
+def _estimate_memory_mb(pipe) -> float:
+    """Estimates the resident size of a pipeline from its parameters and buffers."""
+    model = getattr(pipe, "model", None)
+    if model is None or not hasattr(model, "parameters"):
+        return 0.0
+    total = sum(p.numel() * p.element_size() for p in model.parameters())
+    total += sum(b.numel() * b.element_size() for b in model.buffers())
+    return total / (1024 * 1024)
+
+
+def _default_loader(task: str, model_name: str):
+    # Imported here so that processes which never run inference never pay for torch.
+    from transformers import pipeline
+    return pipeline(task, model=model_name)
+
+
+_loader = _default_loader
+
+
+def set_loader(loader):
+    """Replaces the function used to build pipelines (e.g. a fake for offline tests)."""
+    global _loader
+    _loader = loader or _default_loader
+
+
+def _evict_for(incoming_mb: float, keep_key):
+    """Drops least recently used models until incoming_mb fits in the budget. Caller holds _registry_lock."""
+    budget = _max_memory_mb()
+    if budget <= 0:
+        return
+    resident = sum(_stats[k]["memory_mb"] for k in _models)
+    for key in list(_models.keys()):
+        if resident + incoming_mb <= budget:
+            break
+        if key == keep_key:
+            continue
+        _models.pop(key)
+        resident -= _stats[key]["memory_mb"]
+        _stats[key]["evictions"] += 1
+        _stats[key]["loaded"] = False
+        print(f"♻️ Evicted model {key[1]} ({_stats[key]['memory_mb']:.0f} MB) from registry.")
+
+
+def get_pipeline(task: str, model_name: str):
+    """
+    Returns a shared HF pipeline for (task, model_name), loading it on first use.
+    Concurrent callers asking for the same model wait for a single load.
+    """
+    key = (task, model_name)
+    with _registry_lock:
+        if key in _models:
+            _models.move_to_end(key)
+            _stats[key]["hits"] += 1
+            return _models[key]
+        load_lock = _load_locks.setdefault(key, threading.Lock())
+
+    with load_lock:
+        with _registry_lock:
+            if key in _models:
+                _models.move_to_end(key)
+                _stats[key]["hits"] += 1
+                return _models[key]
+
+        print(f"📦 Loading model {model_name} for '{task}'...")
+        started = time.perf_counter()
+        pipe = _loader(task, model_name)
+        load_seconds = time.perf_counter() - started
+        memory_mb = _estimate_memory_mb(pipe)
+        print(f"✅ Loaded {model_name} in {load_seconds:.1f}s (~{memory_mb:.0f} MB).")
+
+        with _registry_lock:
+            stats = _stats.setdefault(key, {"loads": 0, "hits": 0, "evictions": 0})
+            stats.update({
+                "task": task,
+                "model": model_name,
+                "loaded": True,
+                "load_seconds": round(load_seconds, 3),
+                "memory_mb": round(memory_mb, 1),
+                "last_loaded_at": time.time(),
+            })
+            stats["loads"] += 1
+            _evict_for(memory_mb, key)
+            _models[key] = pipe
+        return pipe
+
+
+def warmup_models(models=None, background: bool = True):
+    """
+    Loads the given (task, model_name) pairs ahead of the first request.
+    With background=True the loads run in a daemon thread and this returns immediately.
+    """
+    models = list(models or WARMUP_MODELS)
+
+    def _run():
+        for task, model_name in models:
+            try:
+                get_pipeline(task, model_name)
+            except Exception as e:
+                print(f"⚠️ Warmup failed for {model_name}: {e}")
+
+    if not background:
+        _run()
+        return None
+    thread = threading.Thread(target=_run, name="model-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def models_loaded(models=None) -> bool:
+    """True if every given (task, model_name) pair (default: WARMUP_MODELS) is resident."""
+    with _registry_lock:
+        return all(tuple(key) in _models for key in (models or WARMUP_MODELS))
+
+
+def get_model_stats() -> dict:
+    """Reports load time, memory and usage counters for every model seen by the registry."""
+    with _registry_lock:
+        models = [dict(stats) for stats in _stats.values()]
+        resident = sum(_stats[k]["memory_mb"] for k in _models)
+    return {
+        "max_memory_mb": _max_memory_mb(),
+        "resident_memory_mb": round(resident, 1),
+        "models": models,
+    }
+
+
+def clear_models():
+    """Drops every loaded model (used by tests and on shutdown)."""
+    with _registry_lock:
+        for key in _models:
+            _stats[key]["loaded"] = False
+        _models.clear()
@@ -1,6 +1,61 @@
-import nltk
+import threading
 
-# Paths to check -> package names to download
-RESOURCES = [
-    ("tokenizers/punkt", "punkt"),
-    ("taggers/averaged_perceptr
\ No newline at end of file
+# --- NLTK resources ---
+# Every NLTK resource the agents use: name -> (package, data path) for NLTK before 3.9 and
+# from 3.9 on, which loads pickle-free replacements (punkt_tab, averaged_perceptron_tagger_eng,
+# maxent_ne_chunker_tab). Agents call require_nltk(...) with the names below when they
+# first need NLTK, so importing an agent (and starting the API) never touches the NLTK
+# data directory or the network. To download everything ahead of time (e.g. in a Docker
+# build), run `python setup_nltk.py`.
+
+RESOURCES = {
+    "punkt": (("punkt", "tokenizers/punkt"), ("punkt_tab", "tokenizers/punkt_tab")),
+    "averaged_perceptron_tagger": (
+        ("averaged_perceptron_tagger", "taggers/averaged_perceptron_tagger"),
+        ("averaged_perceptron_tagger_eng", "taggers/averaged_perceptron_tagger_eng"),
+    ),
+    "maxent_ne_chunker": (
+        ("maxent_ne_chunker", "chunkers/maxent_ne_chunker"),
+        ("maxent_ne_chunker_tab", "chunkers/maxent_ne_chunker_tab"),
+    ),
+    "words": (("words", "corpora/words"),) * 2,
+    "stopwords": (("stopwords", "corpora/stopwords"),) * 2,
+}
+
+_available = set()
+_lock = threading.Lock()
+
+
+def _uses_tab_resources(nltk) -> bool:
+    major, minor = (int(part) for part in nltk.__version__.split(".")[:2])
+    return (major, minor) >= (3, 9)
+
+
+def resource_package(nltk, name: str) -> tuple:
+    """The (package, data path) of a resource for the installed NLTK version."""
+    legacy, current = RESOURCES[name]
+    return current if _uses_tab_resources(nltk) else legacy
+
+
+def require_nltk(*names):
+    """
+    Imports NLTK, makes sure the given resources (default: all RESOURCES) are available,
+    downloading any that are missing, and returns the nltk module. Raises LookupError if a
+    resource can be neither found nor downloaded. Each resource is only checked once per
+    process after it was found.
+    """
+    import nltk
+    names = names or tuple(RESOURCES)
+    with _lock:
+        for name in names:
+            if name in _available:
+                continue
+            package, path = resource_package(nltk, name)
+            try:
+                nltk.data.find(path)
+            except LookupError:
+                print(f"Downloading NLTK resource: {package}")
+                nltk.download(package, quiet=True)
+                nltk.data.find(path)  # still missing (e.g. offline): raises LookupError
+            _available.add(name)
+    return nltk
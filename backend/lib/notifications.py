@@ -1,6 +1,7 @@
 from datetime import datetime
 from bson.objectid import ObjectId
 from .database import get_db
+from .progress import publish_progress
 import os
 
 def create_notification(user_id: str, message: str, type: str = "info", related_id: str = None) -> str:
@@ -18,56 +19,61 @@ def create_notification(user_id: str, message: str, type: str = "info", related_
     result = db.notifications.insert_one(notification)
     return str(result.inserted_id)
 
+# Percent-complete reported when each automation stage starts. Transcription progress
+# between TRANSCRIBE and MINUTES is reported per finished audio segment.
+AUTOMATION_PROGRESS = {
+    "started": 0,
+    "transcript": 5,
+    "minutes": 50,
+    "action_items": 75,
+    "completed": 100,
+}
+
 class AutomationNotifier:
-    """A helper class to send standardized notifications for the automation flow."""
-    def __init__(self, user_id: str, meeting_id: str):
+    """
+    A helper class to send standardized notifications for the automation flow.
+    When a job_id is given, each step is also published as a progress event for that job.
+    """
+    def __init__(self, user_id: str, meeting_id: str, job_id: str = None):
         self.user_id = user_id
         self.meeting_id = meeting_id
+        self.job_id = job_id
+
+    def _notify(self, message: str, type: str, stage: str):
+        create_notification(self.user_id, message, type, self.meeting_id)
+        publish_progress(self.job_id, stage=stage, percent=AUTOMATION_PROGRESS[stage], message=message,
+                         meeting_id=self.meeting_id)
 
     def start(self):
         """Notify that the automation process has started."""
-        create_notification(
-            self.user_id,
-            "🚀 Automation process has started...",
-            "info",
-            self.meeting_id
-        )
+        self._notify("🚀 Automation process has started...", "info", "started")
 
     def step_transcribe(self):
         """Notify that transcription is starting."""
-        create_notification(
-            self.user_id,
-            "Step 1: Transcribing video...",
-            "info",
-            self.meeting_id
+        self._notify("Step 1: Transcribing video...", "info", "transcript")
+
+    def transcription_progress(self, completed: int, total: int):
+        """Publish chunk-level transcription progress (progress event only, no notification)."""
+        start, end = AUTOMATION_PROGRESS["transcript"], AUTOMATION_PROGRESS["minutes"]
+        publish_progress(
+            self.job_id,
+            stage="transcript",
+            percent=start + (end - start) * completed / max(1, total),
+            message=f"Transcribed {completed} of {total} audio segments...",
+            meeting_id=self.meeting_id,
         )
 
     def step_minutes(self):
         """Notify that minute generation is starting."""
-        create_notification(
-            self.user_id,
-            "Step 2: Generating minutes...",
-            "info",
-            self.meeting_id
-        )
+        self._notify("Step 2: Generating minutes...", "info", "minutes")
 
     def step_actions(self):
         """Notify that action item extraction is starting."""
-        create_notification(
-            self.user_id,
-            "Step 3: Extracting action items...",
-            "info",
-            self.meeting_id
-        )
+        self._notify("Step 3: Extracting action items...", "info", "action_items")
 
     def success(self):
         """Notify that the entire process was successful."""
-        create_notification(
-            self.user_id,
-            "✅ Automation complete! Your meeting has been processed.",
-            "success",
-            self.meeting_id
-        )
+        self._notify("✅ Automation complete! Your meeting has been processed.", "success", "completed")
 
     def error(self, reason: str):
         """Notify that the process failed."""
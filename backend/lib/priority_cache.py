@@ -0,0 +1,86 @@
+import hashlib
+import re
+import threading
+from datetime import datetime
+
+# --- Persistent topic priority cache ---
+# Zero-shot priority labels are stored in the `topic_priority_cache` collection, keyed
+# by sha256(model version + candidate labels + normalized topic text). Recurring topics
+# ("Review previous action items") are classified once per model version instead of
+# on every agenda regeneration. Lookups and writes are batched per agenda.
+
+_stats = {"hits": 0, "misses": 0, "stores": 0, "errors": 0}
+_stats_lock = threading.Lock()
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def _count(name: str, amount: int = 1):
+    with _stats_lock:
+        _stats[name] += amount
+
+
+def _collection():
+    from .database import get_db
+    return get_db().topic_priority_cache
+
+
+def normalize_topic(topic: str) -> str:
+    """Case, whitespace and trailing punctuation do not change a topic's priority."""
+    return _WHITESPACE_RE.sub(" ", (topic or "").strip().lower()).rstrip(" .!?;:")
+
+
+def cache_key(topic: str, model_version: str, labels) -> str:
+    h = hashlib.sha256()
+    for part in (model_version, "|".join(labels), normalize_topic(topic)):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def get_many(keys: list) -> dict:
+    """Returns {key: priority} for the keys that are cached. Errors count as misses."""
+    if not keys:
+        return {}
+    try:
+        found = {
+            doc["_id"]: doc["priority"]
+            for doc in _collection().find({"_id": {"$in": list(keys)}}, {"priority": 1})
+        }
+    except Exception as e:
+        print(f"⚠️ Priority cache lookup failed: {e}")
+        _count("errors")
+        found = {}
+    _count("hits", len(found))
+    _count("misses", len(set(keys)) - len(found))
+    return found
+
+
+def store_many(entries: dict, model_version: str):
+    """Stores {key: (topic, priority)} in one bulk write."""
+    if not entries:
+        return
+    from pymongo import UpdateOne
+    now = datetime.utcnow()
+    operations = [
+        UpdateOne(
+            {"_id": key},
+            {"$set": {"topic": normalize_topic(topic), "priority": priority, "model": model_version, "created_at": now}},
+            upsert=True,
+        )
+        for key, (topic, priority) in entries.items()
+    ]
+    try:
+        _collection().bulk_write(operations, ordered=False)
+        _count("stores", len(operations))
+    except Exception as e:
+        print(f"⚠️ Could not store topic priorities in cache: {e}")
+        _count("errors")
+
+
+def get_cache_stats() -> dict:
+    """Returns process-local hit/miss counters."""
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+    return stats
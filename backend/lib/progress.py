@@ -0,0 +1,268 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from datetime import datetime, timedelta
+from .indexes import ensure_indexes
+
+# --- Job progress pub/sub ---
+# Job workers publish status changes, stage transitions and percent-complete for a
+# job; the API streams them to clients over Server-Sent Events (/jobs/{job_id}/events)
+# instead of clients polling /notifications. Subscribers in this process are served
+# by an in-process broker. The backend decides how events reach that broker:
+#   memory - events published in this process only (API with an in-process worker)
+#   mongo  - events go through the `job_progress` collection, which every API node
+#            tails, so progress from separate `worker.py` processes is streamed too
+
+PROGRESS_BACKEND = os.getenv("PROGRESS_BACKEND", "memory")
+PROGRESS_POLL_INTERVAL_SECONDS = float(os.getenv("PROGRESS_POLL_INTERVAL_SECONDS", "0.5"))
+PROGRESS_KEEPALIVE_SECONDS = float(os.getenv("PROGRESS_KEEPALIVE_SECONDS", "15"))
+TERMINAL_STATUSES = ("succeeded", "failed")
+_LAST_EVENT_CACHE_SIZE = 1024
+_TAIL_OVERLAP = timedelta(seconds=2)
+
+
+class Subscription:
+    """Receives the events of one topic on the subscriber's event loop."""
+    def __init__(self, broker, topic: str, loop):
+        self.broker = broker
+        self.topic = topic
+        self.loop = loop
+        self.queue = asyncio.Queue()
+
+    def deliver(self, event: dict):
+        # Publishers run in worker threads; hand the event over to the subscriber's loop.
+        try:
+            self.loop.call_soon_threadsafe(self.queue.put_nowait, event)
+        except RuntimeError:
+            self.close()  # The loop is closed; the subscriber is gone.
+
+    async def get(self, timeout: float = None):
+        """Returns the next event, or None if none arrives within `timeout` seconds."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class InProcessBroker:
+    """Fans published events out to the subscribers of a topic and remembers each topic's last event."""
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._last = OrderedDict()
+        self._lock = threading.Lock()
+
+    def deliver(self, topic: str, event: dict):
+        with self._lock:
+            self._last[topic] = event
+            self._last.move_to_end(topic)
+            while len(self._last) > _LAST_EVENT_CACHE_SIZE:
+                self._last.popitem(last=False)
+            subscribers = list(self._subscribers.get(topic, ()))
+        for subscription in subscribers:
+            subscription.deliver(event)
+
+    def subscribe(self, topic: str, loop=None) -> Subscription:
+        subscription = Subscription(self, topic, loop or asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers[topic].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.topic)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.topic]
+
+    def last_event(self, topic: str):
+        with self._lock:
+            return self._last.get(topic)
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+
+class MemoryProgressBackend:
+    """Delivers events straight to the local broker."""
+    def __init__(self, broker: InProcessBroker):
+        self.broker = broker
+
+    def publish(self, topic: str, event: dict):
+        self.broker.deliver(topic, event)
+
+    def latest(self, topic: str):
+        return self.broker.last_event(topic)
+
+    def stop(self):
+        pass
+
+
+class MongoProgressBackend:
+    """
+    Writes events to the `job_progress` collection and tails it from a background
+    thread, delivering new events to the local broker. The collection is only polled
+    while this process has subscribers; events expire via a TTL index (see lib/indexes.py).
+    """
+    def __init__(self, broker: InProcessBroker, db=None, poll_interval: float = PROGRESS_POLL_INTERVAL_SECONDS):
+        self.broker = broker
+        self.poll_interval = poll_interval
+        if db is None:
+            from .database import get_db
+            db = get_db()
+        self.collection = db.job_progress
+        ensure_indexes(db, ["job_progress"])
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._tail_loop, name="progress-tail", daemon=True)
+        self._thread.start()
+
+    def publish(self, topic: str, event: dict):
+        self.collection.insert_one({"topic": topic, "event": event, "created_at": datetime.utcnow()})
+
+    def latest(self, topic: str):
+        doc = self.collection.find_one({"topic": topic}, sort=[("created_at", -1), ("_id", -1)])
+        return doc["event"] if doc else self.broker.last_event(topic)
+
+    def _tail_loop(self):
+        since = datetime.utcnow()
+        seen = {}  # _id -> created_at, for events inside the overlap window
+        while not self._stop.wait(self.poll_interval):
+            if not self.broker.subscriber_count():
+                since = datetime.utcnow()
+                seen.clear()
+                continue
+            try:
+                # Writers on other nodes can commit slightly out of order, so re-read a short
+                # overlap window and skip events that were already delivered.
+                docs = self.collection.find({"created_at": {"$gte": since - _TAIL_OVERLAP}}).sort("created_at", 1)
+                for doc in docs:
+                    if doc["_id"] in seen:
+                        continue
+                    seen[doc["_id"]] = doc["created_at"]
+                    since = max(since, doc["created_at"])
+                    self.broker.deliver(doc["topic"], doc["event"])
+                cutoff = since - _TAIL_OVERLAP
+                seen = {_id: created_at for _id, created_at in seen.items() if created_at >= cutoff}
+            except Exception as e:
+                print(f"⚠️ Progress tail failed: {e}")
+
+    def stop(self):
+        self._stop.set()
+
+
+_broker = InProcessBroker()
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_progress_backend():
+    """Returns the configured progress backend (PROGRESS_BACKEND=memory|mongo)."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            if PROGRESS_BACKEND == "mongo":
+                _backend = MongoProgressBackend(_broker)
+            else:
+                _backend = MemoryProgressBackend(_broker)
+        return _backend
+
+
+def set_progress_backend(backend):
+    """Replaces the progress backend (used by tests)."""
+    global _backend
+    with _backend_lock:
+        if _backend is not None:
+            _backend.stop()
+        _backend = backend
+
+
+def get_broker() -> InProcessBroker:
+    return _broker
+
+
+def publish_progress(job_id: str, status: str = "running", stage: str = None, percent: float = None,
+                     message: str = None, **extra):
+    """Publishes a progress event for a job. Never raises: progress must not fail the job itself."""
+    if not job_id:
+        return
+    event = {
+        "job_id": job_id,
+        "status": status,
+        "stage": stage,
+        "percent": round(percent, 1) if percent is not None else None,
+        "message": message,
+        "ts": time.time(),
+        **extra,
+    }
+    try:
+        get_progress_backend().publish(job_id, event)
+    except Exception as e:
+        print(f"⚠️ Could not publish progress for job {job_id}: {e}")
+
+
+def publish_job_status(job: dict, status: str, error: str = None):
+    """JobWorker status hook: publishes running / queued (retry) / succeeded / failed transitions."""
+    messages = {
+        "running": f"Attempt {job.get('attempts')} of {job.get('max_attempts')} started.",
+        "queued": f"Attempt {job.get('attempts')} failed; a retry is scheduled.",
+        "succeeded": "Job complete.",
+        "failed": "Job failed.",
+    }
+    publish_progress(
+        job["_id"],
+        status=status,
+        percent=100 if status == "succeeded" else None,
+        message=messages.get(status),
+        attempt=job.get("attempts"),
+        error=error,
+    )
+
+
+def subscribe(job_id: str, loop=None) -> Subscription:
+    """Subscribes to a job's events; call .close() when done. Make sure the backend is running first."""
+    get_progress_backend()
+    return _broker.subscribe(job_id, loop)
+
+
+def latest_progress(job_id: str):
+    return get_progress_backend().latest(job_id)
+
+
+def format_sse(event: dict, event_name: str = "progress") -> str:
+    return f"event: {event_name}\ndata: {json.dumps(event, default=str)}\n\n"
+
+
+async def stream_job_events(subscription: Subscription, snapshot: dict = None,
+                            keepalive_seconds: float = PROGRESS_KEEPALIVE_SECONDS):
+    """
+    Yields Server-Sent Events for a subscription, starting with `snapshot` (the job's
+    current state), until the job succeeds or fails. Comment lines are sent as
+    keepalives so proxies do not close an idle stream.
+    """
+    try:
+        if snapshot:
+            yield format_sse(snapshot)
+            if snapshot.get("status") in TERMINAL_STATUSES:
+                return
+        while True:
+            event = await subscription.get(timeout=keepalive_seconds)
+            if event is None:
+                yield ": keepalive\n\n"
+                continue
+            yield format_sse(event)
+            if event.get("status") in TERMINAL_STATUSES:
+                return
+    finally:
+        subscription.close()
+
+
+def shutdown_progress():
+    """Stops the backend's background thread (called on application shutdown)."""
+    set_progress_backend(None)
@@ -1,89 +1,134 @@
 from datetime import datetime
 from bson.objectid import ObjectId
-from .database import get_db
+from pymongo import UpdateOne
+from .database import get_db, get_usage_counters, increment_usage_counter, usage_month, usage_counter_id
+
+# Monthly free-tier limits per action. Usage is read from the materialized
+# `usage_counters` documents (see lib/database.py), not counted per request. Usage means
+# the meetings, automation cycles and automated transcripts of the month that still
+# exist, so deleting a meeting frees its quota.
+FREE_TIER_LIMITS = {
+    "meeting": 5,
+    "automation": 5,
+    "transcription": 5,
+}
+# Free users only see their most recent minutes.
+FREE_TIER_MINUTES_HISTORY = 3
+RECONCILE_USAGE_JOB = "reconcile_usage"
 
 def get_monthly_meeting_count(user_id: str) -> int:
     """Counts meetings created by a user in the current month."""
-    db = get_db()
-    
-    # Get the first day of the current month
-    now = datetime.now()
-    first_day = datetime(now.year, now.month, 1)
-    
-    # Find all meetings created by the user this month
-    count = db.meetings.count_documents({
-        "user_id": user_id,
-        "created_at": {"$gte": first_day}
-    })
-    return count
+    return get_usage_counters(user_id, ["meeting"])["meeting"]
 
 def get_monthly_automation_cycles(user_id: str) -> int:
     """Counts automated processing cycles used by a user in the current month."""
-    db = get_db()
-    
-    # Get the first day of the current month
-    now = datetime.now()
-    first_day = datetime(now.year, now.month, 1)
-    
-    # Count documents where automation was used
-    count = db.meetings.count_documents({
-        "user_id": user_id,
-        "created_at": {"$gte": first_day},
-        "automation_used": True
-    })
-    return count
+    return get_usage_counters(user_id, ["automation"])["automation"]
+
+def get_monthly_transcription_count(user_id: str) -> int:
+    """
+    Counts automated transcription operations performed by a user in the current month.
+    """
+    return get_usage_counters(user_id, ["transcription"])["transcription"]
 
 def increment_automation_cycle(meeting_id: str, user_id: str) -> bool:
-    """Marks a meeting as having used an automation cycle."""
+    """Marks a meeting as having used an automation cycle and counts it once."""
     db = get_db()
+    now = datetime.utcnow()
     result = db.meetings.update_one(
-        {"_id": ObjectId(meeting_id), "user_id": user_id},
-        {"$set": {"automation_used": True}}
+        {"_id": ObjectId(meeting_id), "user_id": user_id, "automation_used": {"$ne": True}},
+        {"$set": {"automation_used": True, "automation_used_at": now}}
     )
-    return result.modified_count > 0
+    if result.modified_count > 0:
+        increment_usage_counter(user_id, "automation", when=now)
+        return True
+    return False
+
+def _quota_info(limit: int, used: int) -> dict:
+    return {"limit": limit, "used": used, "remaining": max(0, limit - used)}
 
 def check_free_tier_limits(user_id: str, action_type: str = "meeting"):
     """
     Checks if a free tier user has exceeded their limits.
-    
+
     Args:
         user_id: The user ID to check
         action_type: The type of action being performed ("meeting", "transcription", "automation")
-        
+
     Returns:
         tuple: (exceeded_limit, limit_info)
     """
-    if action_type == "meeting":
-        limit = 5
-        current = get_monthly_meeting_count(user_id)
-        return (current >= limit, {"limit": limit, "used": current, "remaining": max(0, limit - current)})
-    
-    elif action_type == "automation":
-        limit = 5
-        current = get_monthly_automation_cycles(user_id)
-        return (current >= limit, {"limit": limit, "used": current, "remaining": max(0, limit - current)})
-    
-    elif action_type == "transcription":
-        limit = 5
-        current = get_monthly_transcription_count(user_id)
-        return (current >= limit, {"limit": limit, "used": current, "remaining": max(0, limit - current)})
-    
-    return (False, {})
+    if action_type not in FREE_TIER_LIMITS:
+        return (False, {})
+    limit = FREE_TIER_LIMITS[action_type]
+    current = get_usage_counters(user_id, [action_type])[action_type]
+    return (current >= limit, _quota_info(limit, current))
 
-def get_monthly_transcription_count(user_id: str) -> int:
+def get_all_quotas(user_id: str, tier: str = "free") -> dict:
+    """Returns every quota for the current month from a single read of the usage counters."""
+    used = get_usage_counters(user_id, list(FREE_TIER_LIMITS))
+    quotas = {}
+    for action, limit in FREE_TIER_LIMITS.items():
+        if tier == "premium":
+            quotas[action] = {"limit": -1, "used": used[action], "remaining": -1}
+        else:
+            quotas[action] = _quota_info(limit, used[action])
+    return {"tier": tier, "month": usage_month(), "quotas": quotas}
+
+# --- Reconciliation ---
+# Rebuilds the counters of a month from the source collections, repairing drift from
+# writes that failed between the source insert and the counter update.
+
+def _month_range(month: str):
+    start = datetime.strptime(month, "%Y-%m")
+    end = datetime(start.year + (start.month == 12), start.month % 12 + 1, 1)
+    return {"$gte": start, "$lt": end}
+
+def _count_by_user(collection, match: dict) -> dict:
+    pipeline = [{"$match": match}, {"$group": {"_id": "$user_id", "count": {"$sum": 1}}}]
+    return {doc["_id"]: doc["count"] for doc in collection.aggregate(pipeline) if doc["_id"]}
+
+def reconcile_usage_counters(month: str = None, user_id: str = None) -> dict:
     """
-    Counts automated transcription operations performed by a user in the current month.
+    Recomputes the usage counters for `month` (default: current), for one user or all users.
+    Returns the number of counters written per action.
     """
     db = get_db()
-    
-    # Get the first day of the current month
-    now = datetime.now()
-    first_day = datetime(now.year, now.month, 1)
-    
-    # Count documents where automated transcription was used
-    count = db.transcripts.count_documents({
-        "user_id": user_id,
-        "created_at": {"$gte": first_day},
-        "automated": True  # Only count automated transcriptions
-    })
-    return count
\ No newline at end of file
+    month = month or usage_month()
+    in_month = _month_range(month)
+    scope = {"user_id": user_id} if user_id else {}
+
+    actual = {
+        "meeting": _count_by_user(db.meetings, {**scope, "created_at": in_month}),
+        "transcription": _count_by_user(db.transcripts, {**scope, "automated": True, "created_at": in_month}),
+        "automation": _count_by_user(db.meetings, {**scope, "automation_used": True, "$or": [
+            {"automation_used_at": in_month},
+            # Meetings automated before automation_used_at was recorded count in their creation month.
+            {"automation_used_at": {"$exists": False}, "created_at": in_month},
+        ]}),
+    }
+
+    now = datetime.utcnow()
+    operations, written_ids = [], []
+    for action, counts in actual.items():
+        for uid, count in counts.items():
+            counter_id = usage_counter_id(uid, month, action)
+            written_ids.append(counter_id)
+            operations.append(UpdateOne(
+                {"_id": counter_id},
+                {"$set": {"user_id": uid, "month": month, "action": action, "count": count, "updated_at": now}},
+                upsert=True
+            ))
+    if operations:
+        db.usage_counters.bulk_write(operations, ordered=False)
+    # Counters with no matching source documents are reset.
+    db.usage_counters.update_many(
+        {**scope, "month": month, "_id": {"$nin": written_ids}},
+        {"$set": {"count": 0, "updated_at": now}}
+    )
+    summary = {action: len(counts) for action, counts in actual.items()}
+    print(f"🧮 Reconciled usage counters for {month}: {summary}")
+    return summary
+
+def handle_reconcile_usage_job(payload: dict, job: dict):
+    """Job-queue handler for RECONCILE_USAGE_JOB."""
+    return reconcile_usage_counters(month=payload.get("month"), user_id=payload.get("user_id"))
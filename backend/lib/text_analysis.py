@@ -0,0 +1,171 @@
+import hashlib
+import os
+import re
+import threading
+from bisect import bisect_right
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+
+from .nltk_setup import require_nltk
+
+# --- Shared transcript analysis ---
+# Minutes generation and action-item extraction used to sentence-tokenize the same text
+# separately and lowercase every sentence once per keyword list. analyze() does that work
+# once per text: sentences with their lowercase form, character offsets, speaker (from the
+# "Speaker N:" labels the transcription agent writes) and cues, the labels of the
+# CUE_PHRASES found in the sentence. All cue phrases are compiled into one Aho-Corasick
+# automaton, so each sentence is scanned once whatever the number of phrases.
+# Analyses are cached per key (transcript_analysis_key / summary_analysis_key) in an
+# LRU of ANALYSIS_CACHE_SIZE entries; a hit is only served if the text is unchanged.
+
+ANALYSIS_CACHE_SIZE = int(os.getenv("ANALYSIS_CACHE_SIZE", "64"))
+
+# Phrases are matched as lowercase substrings of a sentence ("will" also matches "willing").
+CUE_PHRASES = {
+    # Phrases that often indicate a decision has been made
+    "decision": ["we will", "we decided", "the decision is", "agreed to", "will proceed with"],
+    # Phrases that often indicate a future topic
+    "future_topic": ["next meeting", "discuss later", "in the future", "next time we should"],
+    # Phrases indicating a task is being assigned
+    "action": ["will", "needs to", "to-do", "action item", "task for", "responsible for"],
+}
+_SPEAKER_RE = re.compile(r"(Speaker\s+\d+)\s*:")
+
+
+class PhraseMatcher:
+    """Aho-Corasick automaton over {label: [phrases]}; finds every labelled phrase in one pass."""
+    def __init__(self, phrases_by_label: dict):
+        self._goto = [{}]
+        self._fail = [0]
+        outputs = [set()]
+        for label, phrases in phrases_by_label.items():
+            for phrase in phrases:
+                state = 0
+                for char in phrase.lower():
+                    if char not in self._goto[state]:
+                        self._goto.append({})
+                        self._fail.append(0)
+                        outputs.append(set())
+                        self._goto[state][char] = len(self._goto) - 1
+                    state = self._goto[state][char]
+                outputs[state].add(label)
+
+        # Breadth-first, so a state's failure target is finished before the state itself.
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                outputs[child] |= outputs[self._fail[child]]
+                queue.append(child)
+        self._labels = [frozenset(labels) for labels in outputs]
+
+    def labels(self, text: str) -> frozenset:
+        """Returns the labels of every phrase occurring in `text` (already lowercased)."""
+        goto, fail, labels = self._goto, self._fail, self._labels
+        found = set()
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if labels[state]:
+                found |= labels[state]
+        return frozenset(found)
+
+
+@dataclass
+class Sentence:
+    text: str
+    lower: str
+    start: int
+    end: int
+    speaker: str
+    cues: frozenset
+
+
+@dataclass
+class AnalyzedDocument:
+    digest: str
+    sentences: list
+
+    def with_cue(self, label: str) -> list:
+        """The stripped text of every sentence tagged with `label`, in order."""
+        return [sentence.text.strip() for sentence in self.sentences if label in sentence.cues]
+
+
+_matcher = PhraseMatcher(CUE_PHRASES)
+_cache = OrderedDict()  # key -> AnalyzedDocument
+_cache_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def transcript_analysis_key(transcript_id) -> str:
+    return f"transcript:{transcript_id}" if transcript_id else None
+
+
+def summary_analysis_key(minutes_id) -> str:
+    return f"minutes:{minutes_id}" if minutes_id else None
+
+
+def analyze_text(text: str) -> AnalyzedDocument:
+    """Sentence-tokenizes `text` and tags every sentence with its offsets, speaker and cues."""
+    speaker_offsets, speakers = [], []
+    for match in _SPEAKER_RE.finditer(text):
+        speaker_offsets.append(match.start())
+        speakers.append(re.sub(r"\s+", " ", match.group(1)))
+
+    sentences = []
+    cursor = 0
+    for sent in require_nltk("punkt").sent_tokenize(text):
+        start = text.find(sent, cursor)
+        if start < 0:
+            start = cursor
+        end = start + len(sent)
+        cursor = end
+        # The speaker whose label comes last at or before the sentence start
+        idx = bisect_right(speaker_offsets, start) - 1
+        lower = sent.lower()
+        sentences.append(Sentence(
+            text=sent, lower=lower, start=start, end=end,
+            speaker=speakers[idx] if idx >= 0 else None,
+            cues=_matcher.labels(lower),
+        ))
+    return AnalyzedDocument(digest=_digest(text), sentences=sentences)
+
+
+def analyze(text: str, key: str = None) -> AnalyzedDocument:
+    """
+    Returns the analysis of `text`. With a key, the analysis is cached and reused by later
+    calls with the same key and text.
+    """
+    if key is None:
+        return analyze_text(text)
+    digest = _digest(text)
+    with _cache_lock:
+        document = _cache.get(key)
+        if document is not None and document.digest == digest:
+            _cache.move_to_end(key)
+            _stats["hits"] += 1
+            return document
+        _stats["misses"] += 1
+
+    document = analyze_text(text)
+    with _cache_lock:
+        _cache[key] = document
+        _cache.move_to_end(key)
+        while len(_cache) > ANALYSIS_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return document
+
+
+def get_analysis_stats() -> dict:
+    with _cache_lock:
+        return {**_stats, "size": len(_cache)}
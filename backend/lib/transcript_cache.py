@@ -0,0 +1,154 @@
+import hashlib
+import os
+import threading
+from datetime import datetime, timedelta
+from .database import get_db
+
+# --- Content-addressed transcription cache ---
+# Entries are keyed by sha256(normalized audio bytes + source URL + model + prompt).
+# When the source server returns an ETag, entries are also indexed by
+# sha256(URL + ETag + model + prompt) so a resubmission can skip download and extraction.
+
+CACHE_MAX_MB = float(os.getenv("TRANSCRIPTION_CACHE_MAX_MB", "512"))
+CACHE_TTL_DAYS = int(os.getenv("TRANSCRIPTION_CACHE_TTL_DAYS", "30"))
+_HASH_CHUNK_BYTES = 1024 * 1024
+
+_stats = {"source_hits": 0, "audio_hits": 0, "misses": 0, "stores": 0, "evictions": 0, "errors": 0}
+_stats_lock = threading.Lock()
+
+
+def _count(name: str, amount: int = 1):
+    with _stats_lock:
+        _stats[name] += amount
+
+
+def _digest(*parts: str) -> str:
+    h = hashlib.sha256()
+    for part in parts:
+        h.update((part or "").encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def audio_cache_key(audio_path: str, source_url: str, model_name: str, prompt: str) -> str:
+    """Hashes the normalized audio file (streamed, not read into memory) with the request parameters."""
+    h = hashlib.sha256()
+    with open(audio_path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_BYTES), b""):
+            h.update(chunk)
+    return _digest(h.hexdigest(), source_url, model_name, prompt)
+
+
+def source_cache_key(source_url: str, etag: str, model_name: str, prompt: str) -> str:
+    return _digest("etag", source_url, etag, model_name, prompt)
+
+
+def fetch_etag(url: str):
+    """Returns the ETag the source server reports for url, or None. Never downloads the body."""
+    try:
+        import requests
+        response = requests.head(url, allow_redirects=True, timeout=5)
+        return response.headers.get("ETag") if response.ok else None
+    except Exception as e:
+        print(f"⚠️ Could not fetch ETag for {url}: {e}")
+        return None
+
+
+def _lookup(query: dict, stat_name: str):
+    try:
+        db = get_db()
+        doc = db.transcription_cache.find_one_and_update(
+            query,
+            {"$set": {"last_accessed_at": datetime.utcnow()}, "$inc": {"hits": 1}},
+        )
+    except Exception as e:
+        print(f"⚠️ Transcription cache lookup failed: {e}")
+        _count("errors")
+        return None
+    if not doc:
+        return None
+    if doc.get("created_at") and doc["created_at"] < datetime.utcnow() - timedelta(days=CACHE_TTL_DAYS):
+        return None
+    _count(stat_name)
+    print(f"⚡ Transcription cache hit ({stat_name[:-5]} key).")
+    return doc.get("transcript")
+
+
+def get_by_source(source_key: str):
+    """Looks up a transcript by URL + ETag key."""
+    return _lookup({"source_key": source_key}, "source_hits")
+
+
+def get_by_audio(audio_key: str):
+    """Looks up a transcript by audio content key. Counts a miss when absent."""
+    transcript = _lookup({"_id": audio_key}, "audio_hits")
+    if transcript is None:
+        _count("misses")
+    return transcript
+
+
+def store(audio_key: str, transcript: str, source_url: str, model_name: str, source_key: str = None):
+    """Stores a transcript and evicts least recently used entries beyond CACHE_MAX_MB."""
+    now = datetime.utcnow()
+    doc = {
+        "transcript": transcript,
+        "source_url": source_url,
+        "model": model_name,
+        "size_bytes": len(transcript.encode("utf-8")),
+        "created_at": now,
+        "last_accessed_at": now,
+    }
+    if source_key:
+        doc["source_key"] = source_key
+    try:
+        db = get_db()
+        db.transcription_cache.update_one(
+            {"_id": audio_key},
+            {"$set": doc, "$setOnInsert": {"hits": 0}},
+            upsert=True,
+        )
+        _count("stores")
+        _enforce_limits(db)
+    except Exception as e:
+        print(f"⚠️ Could not store transcript in cache: {e}")
+        _count("errors")
+
+
+def _enforce_limits(db):
+    expired = db.transcription_cache.delete_many(
+        {"created_at": {"$lt": datetime.utcnow() - timedelta(days=CACHE_TTL_DAYS)}}
+    ).deleted_count
+    _count("evictions", expired)
+
+    total = _total_size_bytes(db)
+    limit = CACHE_MAX_MB * 1024 * 1024
+    if total <= limit:
+        return
+    cursor = db.transcription_cache.find({}, {"size_bytes": 1}).sort("last_accessed_at", 1)
+    for entry in cursor:
+        if total <= limit:
+            break
+        db.transcription_cache.delete_one({"_id": entry["_id"]})
+        total -= entry.get("size_bytes", 0)
+        _count("evictions")
+
+
+def _total_size_bytes(db) -> int:
+    result = list(db.transcription_cache.aggregate([{"$group": {"_id": None, "total": {"$sum": "$size_bytes"}}}]))
+    return result[0]["total"] if result else 0
+
+
+def get_cache_stats() -> dict:
+    """Returns process-local hit/miss counters and the cache's current size in Mongo."""
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = stats["source_hits"] + stats["audio_hits"] + stats["misses"]
+    stats["hit_rate"] = round((stats["source_hits"] + stats["audio_hits"]) / lookups, 3) if lookups else 0.0
+    try:
+        db = get_db()
+        stats["entries"] = db.transcription_cache.count_documents({})
+        stats["size_mb"] = round(_total_size_bytes(db) / (1024 * 1024), 2)
+    except Exception as e:
+        print(f"⚠️ Could not read transcription cache size: {e}")
+    stats["max_mb"] = CACHE_MAX_MB
+    return stats
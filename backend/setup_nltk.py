@@ -1,5 +1,6 @@
 import nltk
 import ssl
+from lib.nltk_setup import RESOURCES, resource_package
 
 def perform_full_nltk_setup():
     """
@@ -17,15 +18,10 @@ def perform_full_nltk_setup():
         ssl._create_default_https_context = _create_unverified_https_context
         print("✅ Applied SSL context workaround for downloader.")
 
-    # A comprehensive list of packages needed for tokenization, POS tagging,
-    # named entity recognition, and other common NLP tasks.
-    packages = [
-        "punkt",          # Sentence Tokenizer
-        "stopwords",      # Stopwords for various languages
-        "averaged_perceptron_tagger", # Part-of-speech tagger
-        "words",          # A corpus of English words
-        "maxent_ne_chunker", # The standard Named Entity Chunker
-    ]
+    # Every package the agents need (see lib/nltk_setup.py): tokenization, stopwords,
+    # POS tagging, the English words corpus and named entity chunking, under the names
+    # the installed NLTK version loads.
+    packages = [resource_package(nltk, name)[0] for name in RESOURCES]
 
     print("\nDownloading required NLTK packages...")
     for package in packages:
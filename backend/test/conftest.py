@@ -0,0 +1,52 @@
+import sys
+import os
+import importlib
+import pytest
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# --- Shared database fixtures ---
+# `db` is an in-memory mongomock database, so data-layer tests run without a server.
+# `mongo_db` is a scratch database on a real MongoDB server, for tests that need the
+# server itself (e.g. the query planner); it skips when no server answers at
+# MONGO_TEST_URI (default mongodb://localhost:27017).
+# Both replace get_db() in every module of DB_MODULES.
+
+MONGO_TEST_URI = os.getenv("MONGO_TEST_URI", "mongodb://localhost:27017")
+MONGO_TEST_DB = os.getenv("MONGO_TEST_DB", "minuteme_test")
+DB_MODULES = ("lib.database", "lib.quota", "lib.notifications", "lib.checkpoints")
+
+
+def _use_db(monkeypatch, test_db):
+    for name in DB_MODULES:
+        monkeypatch.setattr(importlib.import_module(name), "get_db", lambda: test_db)
+
+
+@pytest.fixture
+def db(monkeypatch):
+    pytest.importorskip("pymongo")
+    mongomock = pytest.importorskip("mongomock")
+    # pymongo >= 4.9 passes sort= to bulk update and replace operations, which mongomock 4.x rejects.
+    builder = mongomock.collection.BulkOperationBuilder
+    for name in ("add_update", "add_replace"):
+        def _without_sort(self, *args, sort=None, _original=getattr(builder, name), **kwargs):
+            return _original(self, *args, **kwargs)
+        monkeypatch.setattr(builder, name, _without_sort)
+    test_db = mongomock.MongoClient()[MONGO_TEST_DB]
+    _use_db(monkeypatch, test_db)
+    yield test_db
+
+
+@pytest.fixture
+def mongo_db(monkeypatch):
+    pymongo = pytest.importorskip("pymongo")
+    client = pymongo.MongoClient(MONGO_TEST_URI, serverSelectionTimeoutMS=1000)
+    try:
+        client.admin.command("ping")
+    except Exception:
+        pytest.skip(f"No MongoDB server at {MONGO_TEST_URI}")
+    client.drop_database(MONGO_TEST_DB)
+    test_db = client[MONGO_TEST_DB]
+    _use_db(monkeypatch, test_db)
+    yield test_db
+    client.drop_database(MONGO_TEST_DB)
+    client.close()
@@ -0,0 +1,43 @@
+import sys
+import os
+import pytest
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+pytest.importorskip("pymongo")
+
+from lib import database
+
+WRITE_METHODS = ("insert_one", "insert_many", "update_one", "update_many", "bulk_write", "delete_many")
+
+
+@pytest.fixture
+def round_trips(db, monkeypatch):
+    """Records every write call made through a collection of the test database."""
+    calls = []
+    collection_class = type(db.action_items)
+    for name in WRITE_METHODS:
+        def _record(self, *args, _name=name, _original=getattr(collection_class, name), **kwargs):
+            calls.append(_name)
+            return _original(self, *args, **kwargs)
+        monkeypatch.setattr(collection_class, name, _record)
+    return calls
+
+
+def test_items_are_saved_in_two_round_trips_and_written_back(db, round_trips):
+    user = "bulk_user"
+    minutes_id = database.save_minutes({"summary": "s", "action_items": []}, user)
+    items = [{"task": f"Task {i}", "owner": "Alex", "status": "pending"} for i in range(25)]
+
+    round_trips.clear()
+    saved = database.save_action_items_for_minutes(minutes_id, items, user)
+    assert round_trips == ["insert_many", "update_one"]
+
+    minutes = database.get_minutes_by_id(minutes_id, user)
+    assert [item["_id"] for item in minutes["action_items"]] == [item["_id"] for item in saved]
+    assert db.action_items.count_documents({"minutes_id": minutes_id}) == 25
+
+    database.update_action_item(saved[0]["_id"], {"status": "completed"}, user)
+    assert database.get_minutes_by_id(minutes_id, user)["action_items"][0]["status"] == "completed"
+
+    database.save_action_items_for_minutes(minutes_id, [{"task": "Again"}], user, replace_existing=True)
+    assert db.action_items.count_documents({"minutes_id": minutes_id}) == 1
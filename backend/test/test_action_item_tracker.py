@@ -0,0 +1,83 @@
+import sys
+import os
+import pytest
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+pytest.importorskip("pymongo")
+pytest.importorskip("googleapiclient")
+
+from agents.action_item_tracker import tracker
+from agents.action_item_tracker.ai_providers import gemini_provider
+from lib import llm_cache, llm_gateway
+from lib.llm_gateway import FakeBackend
+from lib.text_analysis import summary_analysis_key
+
+MINUTES = {"_id": "minutes_1", "summary": "Priya will send the slides.", "date": "2025-03-14"}
+
+
+@pytest.fixture
+def gateway(monkeypatch):
+    monkeypatch.setattr(llm_gateway, "LLM_RETRY_BASE_SECONDS", 0.001)
+    monkeypatch.setattr(llm_gateway, "LLM_DEFAULT_RPM", 60000)
+    monkeypatch.setattr(llm_gateway, "_buckets", {})
+    monkeypatch.setattr(llm_gateway, "_stats", {})
+    monkeypatch.setattr(llm_cache, "LLM_CACHE_PERSIST", False)
+    monkeypatch.setattr(tracker, "ACTION_ITEMS_PROVIDER", "gemini")
+    monkeypatch.setattr(tracker, "_read_agenda_items", lambda minutes_id, user_id: [])
+    fallbacks = []
+
+    def _nlp(meeting_text, analysis_key=None):
+        fallbacks.append(analysis_key)
+        return {"provider": "NLP (NLTK)", "action_items": [{"owner": "Priya", "task": meeting_text, "deadline": None}]}
+    monkeypatch.setattr(tracker, "extract_action_items_nlp", _nlp)
+    llm_cache.clear_memory()
+    backend = FakeBackend(respond=lambda model, contents: '[{"owner": "Priya", "task": "Send the slides", "deadline": null}]')
+    llm_gateway.set_backend(backend)
+    yield backend, fallbacks
+    llm_gateway.set_backend(None)
+    llm_cache.clear_memory()
+
+
+def test_gemini_answers_are_used_and_cached(gateway):
+    backend, fallbacks = gateway
+    first = tracker.prepare_action_items("user_1", MINUTES)
+    second = tracker.prepare_action_items("user_1", MINUTES)
+    assert first["provider"] == "Gemini" and first["action_items"][0]["task"] == "Send the slides"
+    assert first["action_items"][0]["deadline"] == "2025-03-14"
+    assert second["action_items"] == first["action_items"]
+    assert len(backend.calls) == 1 and not fallbacks
+
+
+def test_open_breaker_falls_back_to_nltk(gateway):
+    backend, fallbacks = gateway
+    breaker = llm_gateway.get_breaker(gemini_provider.ACTION_ITEMS_MODEL)
+    backend.failures.extend([503] * breaker.min_calls * llm_gateway.LLM_MAX_ATTEMPTS)
+
+    # Gemini keeps failing: each extraction falls back, and the failures trip the breaker.
+    while breaker.state != "open":
+        assert tracker.prepare_action_items("user_1", MINUTES)["provider"] == "NLP (NLTK)"
+    calls = len(backend.calls)
+
+    # With the breaker open the call is not sent at all.
+    result = tracker.prepare_action_items("user_1", MINUTES)
+    assert result["provider"] == "NLP (NLTK)" and result["action_items"][0]["owner"] == "Priya"
+    assert len(backend.calls) == calls
+    assert fallbacks[-1] == summary_analysis_key("minutes_1")
+
+
+def test_rerunning_extraction_replaces_earlier_items(gateway, monkeypatch):
+    saved = {}
+
+    def _save(minutes_id, action_items, user_id, replace_existing=False):
+        if replace_existing:
+            saved.pop(minutes_id, None)
+        saved.setdefault(minutes_id, []).extend(dict(item, _id=f"item_{len(saved[minutes_id])}") for item in action_items)
+        return saved[minutes_id]
+    monkeypatch.setattr(tracker, "save_action_items", _save)
+    monkeypatch.setattr(tracker, "get_minutes_by_id", lambda minutes_id, user_id: MINUTES)
+    monkeypatch.setattr(tracker, "generate_next_agenda", lambda user_id, minutes_doc: None)
+
+    tracker.extract_and_schedule_tasks("user_1", "minutes_1", schedule=False)
+    result = tracker.extract_and_schedule_tasks("user_1", "minutes_1", schedule=False)
+    assert len(saved["minutes_1"]) == 1
+    assert result["action_items"] == saved["minutes_1"]
@@ -0,0 +1,114 @@
+import sys
+import os
+import time
+import pytest
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# A locally generated RSA keypair stands in for Clerk's signing keys.
+jwt = pytest.importorskip("jwt")
+pytest.importorskip("cryptography")
+pytest.importorskip("fastapi")
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from lib import auth
+
+
+def _keypair(kid):
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key(), as_dict=True)
+    return private_key, {**jwk, "kid": kid, "kty": "RSA", "use": "sig"}
+
+
+def _token(private_key, kid, **claims):
+    now = int(time.time())
+    payload = {"sub": "user_123", "iat": now, "exp": now + 60, **claims}
+    return jwt.encode(payload, private_key, algorithm="RS256", headers={"kid": kid})
+
+
+@pytest.fixture
+def jwks():
+    keys, fetches = [], []
+
+    def fetch():
+        fetches.append(time.time())
+        return {"keys": list(keys)}
+
+    auth.set_key_source(auth.JWKSCache(fetch, min_refresh_seconds=0))
+    yield keys, fetches
+    auth.set_key_source(None)
+
+
+def test_verifies_locally_and_caches_claims(jwks):
+    keys, fetches = jwks
+    private_key, jwk = _keypair("key1")
+    keys.append(jwk)
+    token = _token(private_key, "key1")
+
+    assert auth.authenticate_token(token)["sub"] == "user_123"
+    hits = auth.get_auth_stats()["cache_hits"]
+    assert auth.authenticate_token(token)["sub"] == "user_123"
+    assert auth.get_auth_stats()["cache_hits"] == hits + 1
+    assert len(fetches) == 1
+
+
+def test_unknown_kid_refreshes_the_jwks(jwks):
+    keys, fetches = jwks
+    old_key, old_jwk = _keypair("old")
+    keys.append(old_jwk)
+    auth.authenticate_token(_token(old_key, "old"))
+
+    new_key, new_jwk = _keypair("new")
+    keys.append(new_jwk)  # Clerk rotated its signing key
+    assert auth.authenticate_token(_token(new_key, "new"))["sub"] == "user_123"
+    assert len(fetches) == 2
+
+
+def test_rejects_expired_forged_and_unknown_tokens(jwks):
+    keys, _ = jwks
+    private_key, jwk = _keypair("key1")
+    keys.append(jwk)
+    forger, _ = _keypair("key1")
+
+    with pytest.raises(auth.AuthError):
+        auth.authenticate_token(_token(private_key, "key1", exp=int(time.time()) - 60))
+    with pytest.raises(auth.AuthError):
+        auth.authenticate_token(_token(forger, "key1"))
+    with pytest.raises(auth.AuthError):
+        auth.authenticate_token(_token(private_key, "missing"))
+
+
+def _app():
+    from fastapi import Depends, FastAPI
+    app = FastAPI()
+
+    @app.post("/meetings")
+    async def create(current_user: dict = Depends(auth.get_current_user)):
+        return current_user
+
+    @app.get("/jobs/{job_id}/events")
+    async def events(job_id: str, current_user: dict = Depends(auth.get_current_user_for_stream)):
+        return current_user
+
+    return app
+
+
+def test_cookie_session_only_authenticates_event_streams(jwks, monkeypatch):
+    from fastapi.testclient import TestClient
+    keys, _ = jwks
+    private_key, jwk = _keypair("key1")
+    keys.append(jwk)
+    token = _token(private_key, "key1", azp="http://localhost:5173")
+    client = TestClient(_app())
+    client.cookies.set("__session", token)
+
+    # A cross-site POST carrying only the cookie is rejected.
+    assert client.post("/meetings").status_code == 401
+    assert client.post("/meetings", headers={"Authorization": f"Bearer {token}"}).status_code == 200
+
+    # The stream takes the cookie only with an authorized party that matches azp.
+    monkeypatch.delenv("CLERK_AUTHORIZED_PARTIES", raising=False)
+    assert client.get("/jobs/job1/events").status_code == 401
+    monkeypatch.setenv("CLERK_AUTHORIZED_PARTIES", "https://elsewhere.example")
+    assert client.get("/jobs/job1/events").status_code == 401
+    monkeypatch.setenv("CLERK_AUTHORIZED_PARTIES", "http://localhost:5173")
+    assert client.get("/jobs/job1/events").json()["sub"] == "user_123"
@@ -0,0 +1,121 @@
+import sys
+import os
+import json
+import threading
+from datetime import datetime, timedelta
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# A local HTTP stand-in for the Calendar API: it serves the batch endpoint and keeps
+# created events in memory, rejecting a duplicate event ID with 409 like Google does.
+pytest.importorskip("googleapiclient")
+pytest.importorskip("google_auth_httplib2")
+pytest.importorskip("dateparser")
+pytest.importorskip("pymongo")
+
+from agents.action_item_tracker import calendar_service
+
+BOUNDARY = "stand_in_boundary"
+
+
+class CalendarStandIn(BaseHTTPRequestHandler):
+    events = {}
+    batch_requests = []
+
+    def log_message(self, *args):
+        pass
+
+    def _handle_part(self, http_request: str):
+        head, _, body = http_request.partition("\r\n\r\n") if "\r\n\r\n" in http_request else http_request.partition("\n\n")
+        method, path, _ = head.splitlines()[0].split(" ")
+        path = path.split("?")[0]
+        if method == "POST" and path.endswith("/calendars/primary/events"):
+            event = json.loads(body)
+            if event.get("id") in self.events:
+                return 409, {"error": {"code": 409, "message": "The requested identifier already exists."}}
+            event.setdefault("id", f"generated{len(self.events)}")
+            event["htmlLink"] = f"http://calendar.local/{event['id']}"
+            self.events[event["id"]] = event
+            return 200, event
+        if method == "GET" and "/calendars/primary/events/" in path:
+            event_id = path.rsplit("/", 1)[1]
+            if event_id in self.events:
+                return 200, self.events[event_id]
+        return 404, {"error": {"code": 404, "message": "Not Found"}}
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        message = BytesParser().parsebytes(f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode() + body)
+        type(self).batch_requests.append(len(message.get_payload()))
+
+        parts = []
+        for part in message.get_payload():
+            status, payload = self._handle_part(part.get_payload())
+            content_id = "<response-" + part["Content-ID"][1:]
+            parts.append(
+                f"--{BOUNDARY}\r\nContent-Type: application/http\r\nContent-ID: {content_id}\r\n\r\n"
+                f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\nContent-Type: application/json\r\n\r\n"
+                f"{json.dumps(payload)}\r\n"
+            )
+        response = ("".join(parts) + f"--{BOUNDARY}--\r\n").encode()
+        self.send_response(200)
+        self.send_header("Content-Type", f"multipart/mixed; boundary={BOUNDARY}")
+        self.send_header("Content-Length", str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+
+@pytest.fixture
+def stand_in(monkeypatch):
+    CalendarStandIn.events = {}
+    CalendarStandIn.batch_requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), CalendarStandIn)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    expiry = (datetime.utcnow() + timedelta(hours=1)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    credentials = {"credentials": {
+        "token": "test-token", "refresh_token": "refresh", "client_id": "client", "client_secret": "secret",
+        "token_uri": f"{base}/token", "expiry": expiry,
+    }}
+    builds = []
+    build_service = calendar_service._build_service
+    monkeypatch.setattr(calendar_service, "get_google_credentials", lambda user_id: credentials)
+    monkeypatch.setattr(calendar_service, "_build_service", lambda creds: builds.append(1) or build_service(creds))
+    monkeypatch.setattr(calendar_service, "CALENDAR_API_ENDPOINT", f"{base}/calendar/v3/")
+    monkeypatch.setattr(calendar_service, "CALENDAR_BATCH_URI", f"{base}/batch/calendar/v3")
+    monkeypatch.setattr(calendar_service, "CALENDAR_BATCH_SIZE", 2)
+    calendar_service.invalidate_calendar_service("user_1")
+    yield CalendarStandIn, builds
+    calendar_service.invalidate_calendar_service("user_1")
+    server.shutdown()
+
+
+def _events(count, prefix="ev"):
+    return [
+        calendar_service.build_event(f"Task {i}", "desc", "2030-01-01 09:00", "Alex", event_id=f"{prefix}{i:04d}")
+        for i in range(count)
+    ]
+
+
+def test_events_of_a_run_are_batched_and_the_service_is_cached(stand_in):
+    server, builds = stand_in
+    created = calendar_service.schedule_events("user_1", _events(3))
+
+    assert [event["id"] for event in created] == ["ev0000", "ev0001", "ev0002"]
+    assert server.batch_requests == [2, 1]  # CALENDAR_BATCH_SIZE inserts per HTTP request
+
+    calendar_service.schedule_events("user_1", _events(1, prefix="other"))
+    assert len(builds) == 1
+
+
+def test_retried_run_returns_existing_events(stand_in):
+    server, _ = stand_in
+    calendar_service.schedule_events("user_1", _events(2))
+    created = calendar_service.schedule_events("user_1", _events(3))
+
+    assert [event["id"] for event in created] == ["ev0000", "ev0001", "ev0002"]
+    assert len(server.events) == 3
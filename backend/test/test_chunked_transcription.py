@@ -0,0 +1,96 @@
+import sys
+import os
+import pytest
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from agents.transcription_agent.chunked_transcription import (
+    AudioSegment,
+    plan_cut_points,
+    stitch_transcripts,
+    transcribe_segments,
+)
+
+
+class FakeSegmentProvider:
+    """Local stand-in for Gemini: returns canned text per segment and fails the first N calls."""
+    def __init__(self, texts_by_audio: dict, failures: int = 0):
+        self.texts_by_audio = texts_by_audio
+        self.failures = failures
+        self.calls = 0
+
+    def __call__(self, audio_bytes, mime_type, prompt):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise TimeoutError("simulated upstream timeout")
+        return self.texts_by_audio[audio_bytes]
+
+
+def _write_segments(tmp_path, count):
+    segments = []
+    for i in range(count):
+        path = tmp_path / f"segment_{i}.mp3"
+        path.write_bytes(f"audio-{i}".encode())
+        segments.append(AudioSegment(index=i, start=i * 60.0, end=(i + 1) * 60.0, path=str(path)))
+    return segments
+
+
+def test_cut_points_snap_to_nearby_silence():
+    cuts = plan_cut_points(duration=700, silences=[95.0, 310.0, 480.0], segment_seconds=300, search_seconds=20)
+    assert cuts == [310.0, 610.0]
+
+
+def test_stitch_removes_overlap_and_maps_speakers():
+    first = (
+        "Speaker 1: Welcome everyone, let's get started with the budget review.\n"
+        "Speaker 2: Thanks. The marketing spend came in under forecast this quarter.\n"
+        "Speaker 1: Great, so we can move some of it to the hiring pl"
+    )
+    # The second segment numbers speakers the other way round and repeats the overlap.
+    second = (
+        "Speaker 2: Thanks. The marketing spend came in under forecast this quarter.\n"
+        "Speaker 1: Great, so we can move some of it to the hiring plan next month.\n"
+        "Speaker 2: Agreed, I will draft the proposal.\n"
+    )
+    stitched = stitch_transcripts([first, second])
+    assert stitched.splitlines() == [
+        "Speaker 1: Welcome everyone, let's get started with the budget review.",
+        "Speaker 2: Thanks. The marketing spend came in under forecast this quarter.",
+        "Speaker 1: Great, so we can move some of it to the hiring plan next month.",
+        "Speaker 2: Agreed, I will draft the proposal.",
+    ]
+
+
+def test_stitch_relabels_unanchored_speaker_that_collides():
+    first = "Speaker 1: Opening remarks about the roadmap and priorities for the year.\nSpeaker 2: Sounds good to me, let's continue."
+    second = (
+        "Speaker 3: Sounds good to me, let's continue.\n"
+        "Speaker 2: I am new here, joining from the design team."
+    )
+    lines = stitch_transcripts([first, second]).splitlines()
+    assert lines[-2].startswith("Speaker 2: Sounds good")
+    assert lines[-1] == "Speaker 3: I am new here, joining from the design team."
+
+
+def test_segments_are_retried_and_kept_in_order(tmp_path):
+    segments = _write_segments(tmp_path, 3)
+    provider = FakeSegmentProvider(
+        {f"audio-{i}".encode(): f"Speaker 1: Part {i} of the meeting." for i in range(3)},
+        failures=2,
+    )
+    texts = transcribe_segments(segments, transcriber=provider, max_workers=2, retries=3, backoff_seconds=0)
+    assert texts == [f"Speaker 1: Part {i} of the meeting." for i in range(3)]
+    assert provider.calls == 5
+
+
+def test_gateway_transcriber_is_not_retried_again(tmp_path, monkeypatch):
+    from lib import llm_gateway
+    monkeypatch.setattr(llm_gateway, "LLM_RETRY_BASE_SECONDS", 0.001)
+    backend = llm_gateway.FakeBackend(failures=[503, 503, 400])
+    llm_gateway.set_backend(backend)
+    try:
+        with pytest.raises(RuntimeError):
+            transcribe_segments(_write_segments(tmp_path, 1), max_workers=1, backoff_seconds=0)
+    finally:
+        llm_gateway.set_backend(None)
+    # Two retryable failures are retried by the gateway; the 400 is not retried by anyone.
+    assert len(backend.calls) == 3
@@ -0,0 +1,51 @@
+import sys
+import os
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+import pytest
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from lib import dates
+
+
+def test_iso_dates_are_parsed_without_dateparser():
+    dates._parse_free_text.cache_clear()
+    # Dates without an offset are in EVENT_TIMEZONE (Asia/Colombo, UTC+05:30)
+    assert dates.parse_date("2025-03-14") == datetime(2025, 3, 13, 18, 30)
+    assert dates.parse_date("2025-03-14 09:30") == datetime(2025, 3, 14, 4, 0)
+    assert dates.parse_local_date("2025-03-14 09:30") == datetime(2025, 3, 14, 9, 30)
+    # Offsets are converted to naive UTC
+    assert dates.parse_date("2025-03-14T09:30:00+01:00") == datetime(2025, 3, 14, 8, 30)
+    assert dates.parse_date("TBD") is None
+    assert dates.parse_date(None) is None
+    assert dates.parse_cache_info()["currsize"] == 0
+
+
+def test_normalize_dates_sets_utc_fields_next_to_raw_ones():
+    meeting = dates.normalize_dates("meetings", {"meeting_name": "Weekly", "meeting_date": "2025-03-14"})
+    assert dates.to_local(meeting["meeting_date_utc"]) == datetime(2025, 3, 14)
+    assert meeting["dates_version"] == dates.DATES_VERSION
+    assert meeting["meeting_date"] == "2025-03-14"
+    assert dates.normalize_dates("action_items", {"deadline": "TBD"})["deadline_utc"] is None
+    assert dates.normalize_dates("action_items", {"task": "No deadline"}) == {"task": "No deadline"}
+
+
+def test_free_text_is_memoized():
+    pytest.importorskip("dateparser")
+    dates._parse_free_text.cache_clear()
+    first = dates.parse_date("tomorrow")
+    assert dates.parse_date("tomorrow") == first
+    assert dates.parse_cache_info()["hits"] == 1
+    tomorrow = datetime.now(ZoneInfo(dates.EVENT_TIMEZONE)) + timedelta(days=1)
+    assert dates.to_local(first).date() == tomorrow.date()
+
+
+def test_backfill_records_its_version_and_is_skipped_afterwards(db):
+    db.meetings.insert_one({"meeting_name": "Old", "meeting_date": "2025-03-14"})
+    assert dates.backfill_normalized_dates(db) == {"meetings": 1, "action_items": 0, "minutes": 0}
+    assert dates.to_local(db.meetings.find_one()["meeting_date_utc"]) == datetime(2025, 3, 14)
+    assert db.migrations.find_one({"_id": dates.DATES_MIGRATION_ID})["version"] == dates.DATES_VERSION
+
+    db.meetings.insert_one({"meeting_name": "Unscanned", "meeting_date": "2025-03-15"})
+    assert dates.backfill_normalized_dates(db) == {}
+    assert dates.backfill_normalized_dates(db, force=True)["meetings"] == 1
@@ -0,0 +1,56 @@
+import sys
+import os
+import struct
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from agents.transcription_agent.duration_probe import mp4_duration_from_url
+
+
+def _box(box_type: bytes, payload: bytes) -> bytes:
+    return struct.pack(">I4s", 8 + len(payload), box_type) + payload
+
+
+def _mvhd(timescale: int, duration: int) -> bytes:
+    # version 0: version/flags, creation time, modification time, timescale, duration
+    return _box(b"mvhd", struct.pack(">IIIII", 0, 0, 0, timescale, duration) + b"\0" * 80)
+
+
+class _FakeRaw:
+    def __init__(self, data):
+        self.data = data
+
+    def read(self, n):
+        return self.data[:n]
+
+
+class _FakeResponse:
+    def __init__(self, status_code, data, total):
+        self.status_code = status_code
+        self.headers = {"Content-Range": f"bytes 0-0/{total}"}
+        self.raw = _FakeRaw(data)
+
+    def close(self):
+        pass
+
+
+class RangeServer:
+    """Local stand-in for an HTTP server that honours Range headers."""
+    def __init__(self, data: bytes):
+        self.data = data
+        self.requested_bytes = 0
+
+    def get(self, url, headers, timeout, stream):
+        start, end = headers["Range"][len("bytes="):].split("-")
+        chunk = self.data[int(start):int(end) + 1]
+        self.requested_bytes += len(chunk)
+        return _FakeResponse(206, chunk, len(self.data))
+
+
+def test_reads_duration_when_moov_is_at_the_end():
+    media = _box(b"ftyp", b"isom" + b"\0" * 12) + _box(b"mdat", b"\0" * 2_000_000)
+    media += _box(b"moov", _mvhd(timescale=1000, duration=1_500_000))
+    server = RangeServer(media)
+
+    assert mp4_duration_from_url("https://example.com/meeting.mp4", session=server) == 1500.0
+    # Only headers were fetched, never the 2 MB media payload.
+    assert server.requested_bytes < 200_000
@@ -0,0 +1,43 @@
+import sys
+import os
+import subprocess
+import pytest
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Importing the API must stay fast: heavy libraries are imported by the code paths
+# that use them, not at startup. Override the budget with IMPORT_TIME_BUDGET_SECONDS.
+IMPORT_TIME_BUDGET_SECONDS = float(os.getenv("IMPORT_TIME_BUDGET_SECONDS", "1.0"))
+HEAVY_MODULES = [
+    "torch", "transformers", "nltk", "sklearn", "rake_nltk", "dateparser",
+    "google.generativeai", "googleapiclient", "google_auth_oauthlib",
+]
+MEASURE = """
+import sys, time
+started = time.perf_counter()
+import api
+print(time.perf_counter() - started)
+print("loaded=" + ",".join(name for name in {heavy!r} if name in sys.modules))
+"""
+
+
+def _import_api():
+    result = subprocess.run(
+        [sys.executable, "-c", MEASURE.format(heavy=HEAVY_MODULES)],
+        cwd=BACKEND_DIR, capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+    # The loaded list is empty when startup is lazy, so its line is labelled rather than stripped away.
+    seconds, loaded = result.stdout.rstrip("\n").split("\n")[-2:]
+    assert loaded.startswith("loaded="), result.stdout
+    return float(seconds), [name for name in loaded[len("loaded="):].split(",") if name]
+
+
+def test_api_import_is_fast_and_lazy():
+    for dependency in ["fastapi", "pymongo", "dotenv", "clerk_backend_api"]:
+        pytest.importorskip(dependency)
+
+    runs = [_import_api() for _ in range(3)]
+    assert runs[0][1] == [], f"Heavy modules imported at startup: {runs[0][1]}"
+    best = min(seconds for seconds, _ in runs)
+    assert best < IMPORT_TIME_BUDGET_SECONDS, f"Importing api took {best:.2f}s (budget {IMPORT_TIME_BUDGET_SECONDS}s)"
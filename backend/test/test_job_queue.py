@@ -0,0 +1,99 @@
+import sys
+import os
+import threading
+import time
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from lib.jobs import SQLiteJobStore, JobWorker, QUEUED, RUNNING, SUCCEEDED, FAILED
+
+
+def _store(tmp_path):
+    return SQLiteJobStore(str(tmp_path / "jobs.sqlite3"))
+
+
+def test_job_runs_once_and_records_result(tmp_path):
+    store = _store(tmp_path)
+    job_id = store.enqueue("echo", {"value": 42}, user_id="user_1")
+    worker = JobWorker(store, {"echo": lambda payload, job: {"echo": payload["value"]}})
+
+    assert worker.run_once() is True
+    assert worker.run_once() is False
+    job = store.get(job_id, "user_1")
+    assert job["status"] == SUCCEEDED
+    assert job["result"] == {"echo": 42}
+    assert store.get(job_id, "someone_else") is None
+
+
+def test_failed_job_is_retried_with_backoff_then_marked_failed(tmp_path):
+    store = _store(tmp_path)
+    job_id = store.enqueue("flaky", {}, max_attempts=2)
+
+    def always_fails(payload, job):
+        raise RuntimeError(f"boom on attempt {job['attempts']}")
+
+    worker = JobWorker(store, {"flaky": always_fails}, backoff_seconds=60)
+    worker.run_once()
+    job = store.get(job_id)
+    assert job["status"] == QUEUED and job["attempts"] == 1
+    # Backoff: not claimable until run_after.
+    assert worker.run_once() is False
+
+    worker = JobWorker(store, {"flaky": always_fails}, backoff_seconds=0)
+    with store._connect() as conn:
+        conn.execute("UPDATE jobs SET run_after = 0 WHERE _id = ?", (job_id,))
+    worker.run_once()
+    job = store.get(job_id)
+    assert job["status"] == FAILED
+    assert job["last_error"] == "boom on attempt 2"
+
+
+def test_expired_lease_is_reclaimed_by_another_worker(tmp_path):
+    store = _store(tmp_path)
+    job_id = store.enqueue("echo", {})
+    crashed = store.claim("crashed-worker", lease_seconds=0)
+    assert crashed["status"] == RUNNING
+    time.sleep(0.01)
+
+    reclaimed = store.claim("healthy-worker", lease_seconds=60)
+    assert reclaimed["_id"] == job_id and reclaimed["attempts"] == 2
+    # The crashed worker can no longer complete a job it does not own.
+    assert store.complete(job_id, "crashed-worker") is False
+    assert store.complete(job_id, "healthy-worker", {"ok": True}) is True
+
+
+def test_expired_lease_on_last_attempt_marks_job_failed(tmp_path):
+    store = _store(tmp_path)
+    job_id = store.enqueue("echo", {}, max_attempts=1)
+    store.claim("crashed-worker", lease_seconds=0)
+    time.sleep(0.01)
+
+    # Not claimable again; the reaper (not the claim poll) marks it failed.
+    assert store.claim("healthy-worker", lease_seconds=60) is None
+    assert store.get(job_id)["status"] == RUNNING
+    assert JobWorker(store, {"echo": lambda payload, job: None}).reap_abandoned() == 1
+    job = store.get(job_id)
+    assert job["status"] == FAILED and job["attempts"] == 1
+    assert "lease expired" in job["last_error"]
+
+
+def test_worker_respects_concurrency_limit(tmp_path):
+    store = _store(tmp_path)
+    job_ids = [store.enqueue("slow", {}) for _ in range(6)]
+    running, peak, lock = [0], [0], threading.Lock()
+
+    def slow(payload, job):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.05)
+        with lock:
+            running[0] -= 1
+
+    worker = JobWorker(store, {"slow": slow}, concurrency=2, poll_interval=0.01)
+    worker.start()
+    deadline = time.time() + 5
+    while time.time() < deadline and any(store.get(job_id)["status"] != SUCCEEDED for job_id in job_ids):
+        time.sleep(0.02)
+    worker.stop()
+    assert all(store.get(job_id)["status"] == SUCCEEDED for job_id in job_ids)
+    assert peak[0] == 2
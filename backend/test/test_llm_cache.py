@@ -0,0 +1,66 @@
+import sys
+import os
+import threading
+import pytest
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from lib import llm_cache, llm_gateway
+from lib.llm_gateway import FakeBackend, LLMError
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    # Memory tier only, so no Mongo server is needed.
+    monkeypatch.setattr(llm_cache, "LLM_CACHE_PERSIST", False)
+    monkeypatch.setattr(llm_cache, "_stats", dict.fromkeys(llm_cache._stats, 0))
+    monkeypatch.setattr(llm_gateway, "LLM_RETRY_BASE_SECONDS", 0.001)
+    monkeypatch.setattr(llm_gateway, "LLM_DEFAULT_RPM", 60000)
+    monkeypatch.setattr(llm_gateway, "_buckets", {})
+    llm_cache.clear_memory()
+    backend = FakeBackend(respond=lambda model, contents: f"answer to {contents}")
+    llm_gateway.set_backend(backend)
+    yield backend
+    llm_gateway.set_backend(None)
+    llm_cache.clear_memory()
+
+
+def test_identical_inputs_are_answered_once(fake):
+    first = llm_cache.cached_generate("summary", "1", "Alex will  send\nnotes.", "prompt A", model="test-model")
+    # Whitespace-only differences hit the same entry
+    second = llm_cache.cached_generate("summary", "1", "Alex will send notes.", "prompt A", model="test-model")
+    assert first == second == "answer to prompt A"
+    assert len(fake.calls) == 1
+
+    # A new template version or model is a different entry
+    llm_cache.cached_generate("summary", "2", "Alex will send notes.", "prompt B", model="test-model")
+    llm_cache.cached_generate("summary", "1", "Alex will send notes.", "prompt C", model="other-model")
+    assert len(fake.calls) == 3
+    assert llm_cache.get_cache_stats()["memory_hits"] == 1
+
+
+def test_concurrent_identical_calls_share_one_request(fake):
+    fake.latency = 0.2
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(
+            llm_cache.cached_generate("summary", "1", "same input", "prompt", model="test-model")))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["answer to prompt"] * 5
+    assert len(fake.calls) == 1
+    assert llm_cache.get_cache_stats()["coalesced"] == 4
+
+
+def test_errors_and_rejected_responses_are_not_cached(fake):
+    fake.failures.append(400)
+    with pytest.raises(LLMError):
+        llm_cache.cached_generate("summary", "1", "input", "prompt", model="test-model")
+    assert llm_cache.cached_generate("summary", "1", "input", "prompt", model="test-model",
+                                     cacheable=lambda response: False) == "answer to prompt"
+    llm_cache.cached_generate("summary", "1", "input", "prompt", model="test-model")
+    assert len(fake.calls) == 3
@@ -0,0 +1,138 @@
+import sys
+import os
+import asyncio
+import time
+import pytest
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from lib import llm_gateway
+from lib.llm_gateway import FakeBackend, LLMError, LLMTimeout, CircuitOpenError, TokenBucket
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    monkeypatch.setattr(llm_gateway, "LLM_RETRY_BASE_SECONDS", 0.001)
+    monkeypatch.setattr(llm_gateway, "LLM_DEFAULT_RPM", 60000)
+    monkeypatch.setattr(llm_gateway, "_buckets", {})
+    monkeypatch.setattr(llm_gateway, "_stats", {})
+    monkeypatch.setattr(llm_gateway, "LLM_HEDGE_MIN_SAMPLES", 5)
+    monkeypatch.setattr(llm_gateway, "LLM_HEDGE_MIN_SECONDS", 0.01)
+    backend = FakeBackend(respond=lambda model, contents: f"{model}: {contents}")
+    llm_gateway.set_backend(backend)
+    yield backend
+    llm_gateway.set_backend(None)
+
+
+def test_retryable_errors_are_retried(fake):
+    fake.failures.extend([429, 503])
+    assert llm_gateway.generate("hello", model="test-model") == "test-model: hello"
+    assert len(fake.calls) == 3
+    assert llm_gateway.get_llm_stats()["models"]["test-model"]["retries"] >= 2
+
+
+def test_client_errors_and_exhausted_retries_are_raised(fake):
+    fake.failures.append(400)
+    with pytest.raises(LLMError) as error:
+        llm_gateway.generate("hello", model="test-model")
+    assert error.value.status == 400 and len(fake.calls) == 1
+
+    fake.failures.extend([500, 500])
+    with pytest.raises(LLMError):
+        llm_gateway.generate("hello", model="test-model", attempts=2)
+
+
+def test_backend_exceptions_are_raised_as_llm_errors(fake):
+    class ResourceExhausted(Exception):
+        code = 429
+
+    def _respond(model, contents):
+        raise ResourceExhausted("quota exceeded")
+    fake.respond = _respond
+    with pytest.raises(LLMError) as error:
+        llm_gateway.generate("hello", model="test-model", attempts=2)
+    assert error.value.status == 429 and isinstance(error.value.__cause__, ResourceExhausted)
+    assert len(fake.calls) == 2
+
+
+def test_calls_time_out(fake):
+    fake.latency = 0.5
+    with pytest.raises(LLMTimeout):
+        llm_gateway.generate("hello", model="test-model", timeout=0.05, attempts=1)
+    with pytest.raises(LLMTimeout):
+        asyncio.run(llm_gateway.agenerate("hello", model="test-model", timeout=0.05, attempts=1))
+
+
+def test_async_calls_share_the_gateway(fake):
+    async def _run():
+        return await asyncio.gather(*(llm_gateway.agenerate(f"q{i}", model="test-model") for i in range(3)))
+    fake.failures.append(503)
+    assert asyncio.run(_run()) == ["test-model: q0", "test-model: q1", "test-model: q2"]
+
+
+def _warm_up(fake, operation, count=5):
+    fake.latency = 0.01
+    for _ in range(count):
+        llm_gateway.generate("warm-up", model="test-model", operation=operation)
+
+
+def test_slow_calls_are_hedged(fake):
+    _warm_up(fake, "extract")
+    latencies = iter([1.0, 0.01])  # the first request stalls, its hedge answers quickly
+    fake.latency = lambda: next(latencies, 0.01)
+
+    started = time.monotonic()
+    assert llm_gateway.generate("hello", model="test-model", operation="extract") == "test-model: hello"
+    assert time.monotonic() - started < 0.5
+    stats = llm_gateway.get_llm_stats()["models"]["test-model"]
+    assert (stats["hedges"], stats["hedge_wins"]) == (1, 1)
+
+
+def test_slow_async_calls_are_hedged(fake):
+    _warm_up(fake, "extract")
+    latencies = iter([1.0, 0.01])
+    fake.latency = lambda: next(latencies, 0.01)
+
+    started = time.monotonic()
+    assert asyncio.run(llm_gateway.agenerate("hello", model="test-model", operation="extract")) == "test-model: hello"
+    assert time.monotonic() - started < 0.5
+    assert llm_gateway.get_llm_stats()["models"]["test-model"]["hedge_wins"] == 1
+
+
+def test_breaker_opens_on_errors_and_closes_after_a_probe(fake):
+    breaker = llm_gateway.get_breaker("test-model")
+    breaker.min_calls, breaker.cooldown_seconds = 4, 0.05
+    fake.failures.extend([503] * 4)
+    for _ in range(4):
+        with pytest.raises(LLMError):
+            llm_gateway.generate("hello", model="test-model", attempts=1)
+    assert breaker.state == "open"
+
+    calls = len(fake.calls)
+    with pytest.raises(CircuitOpenError):
+        llm_gateway.generate("hello", model="test-model")
+    assert len(fake.calls) == calls  # failed fast, nothing was sent
+
+    time.sleep(0.06)
+    assert llm_gateway.generate("hello", model="test-model") == "test-model: hello"
+    assert breaker.state == "closed"
+    stats = llm_gateway.get_llm_stats()["models"]["test-model"]
+    assert stats["breaker_trips"] == 1 and stats["rejected"] == 1
+
+
+def test_token_bucket_spaces_calls_after_the_burst():
+    bucket = TokenBucket(rate=20, capacity=2)
+    started = time.monotonic()
+    waits = [bucket.acquire() for _ in range(4)]
+    assert waits[:2] == [0.0, 0.0]
+    assert time.monotonic() - started == pytest.approx(0.1, abs=0.04)
+
+
+def test_provider_imports_without_an_api_key(fake, monkeypatch):
+    monkeypatch.delenv("GOOGLE_API_KEY", raising=False)
+    from agents.action_item_tracker.ai_providers import gemini_provider
+    from lib import llm_cache
+    monkeypatch.setattr(llm_cache, "LLM_CACHE_PERSIST", False)
+    fake.respond = lambda model, contents: '```json\n[{"owner": "Alex", "task": "Send notes", "deadline": null}]```'
+    assert gemini_provider.extract_action_items("Alex will send notes.") == [
+        {"owner": "Alex", "task": "Send notes", "deadline": None}
+    ]
@@ -0,0 +1,40 @@
+import sys
+import os
+import json
+import pytest
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+pytest.importorskip("nltk")
+
+from agents.action_item_tracker import nlp_extractor
+from lib.nltk_setup import require_nltk
+from lib.text_analysis import analyze_text
+
+try:
+    require_nltk(*nlp_extractor.NLTK_PACKAGES)
+except LookupError:
+    pytest.skip("NLTK data is not installed and cannot be downloaded", allow_module_level=True)
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "..", "data", "transcript_meeting", "transcript_meeting.json")
+
+
+def test_screen_keeps_keyword_and_name_sentences_only():
+    document = analyze_text(
+        "Priya will send the slides tomorrow. so yeah that was about it really. "
+        "We should ask Daniel about the budget. Okay."
+    )
+    candidates = nlp_extractor.screen_sentences(document.sentences)
+    assert candidates == [
+        ("Priya will send the slides tomorrow.", True),
+        ("We should ask Daniel about the budget.", False),
+    ]
+
+
+def test_staged_extractor_matches_the_original():
+    with open(FIXTURE, "r", encoding="utf-8") as f:
+        transcript = json.load(f)["transcript"]
+    transcript += " Priya will send the slides tomorrow. We should ask Daniel about the budget."
+
+    staged = nlp_extractor.extract_action_items(transcript)
+    assert staged == nlp_extractor.extract_action_items_unstaged(transcript)
+    assert any(item["task"] == "Priya will send the slides tomorrow." for item in staged)
@@ -0,0 +1,56 @@
+import sys
+import os
+import types
+import pytest
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from lib import nltk_setup
+
+
+def _fake_nltk(version, installed, downloadable=None):
+    """Stands in for the nltk module: `installed` data paths are found; `downloadable` maps a package to the path it installs."""
+    downloadable = downloadable or {}
+    installed = set(installed)
+    downloads = []
+
+    def find(path):
+        if path not in installed:
+            raise LookupError(path)
+
+    def download(package, quiet=False):
+        downloads.append(package)
+        if package in downloadable:
+            installed.add(downloadable[package])
+        return package in downloadable
+
+    return types.SimpleNamespace(__version__=version, data=types.SimpleNamespace(find=find), download=download,
+                                 downloads=downloads)
+
+
+@pytest.fixture
+def fresh(monkeypatch):
+    monkeypatch.setattr(nltk_setup, "_available", set())
+
+
+def test_resource_names_follow_the_nltk_version(fresh, monkeypatch):
+    legacy = _fake_nltk("3.8.1", [], downloadable={"punkt": "tokenizers/punkt"})
+    monkeypatch.setitem(sys.modules, "nltk", legacy)
+    nltk_setup.require_nltk("punkt")
+    assert legacy.downloads == ["punkt"]
+
+    monkeypatch.setattr(nltk_setup, "_available", set())
+    current = _fake_nltk("3.10.3", [], downloadable={"punkt_tab": "tokenizers/punkt_tab"})
+    monkeypatch.setitem(sys.modules, "nltk", current)
+    nltk_setup.require_nltk("punkt")
+    assert current.downloads == ["punkt_tab"]
+
+
+def test_failed_download_is_not_marked_available(fresh, monkeypatch):
+    offline = _fake_nltk("3.10.3", [])
+    monkeypatch.setitem(sys.modules, "nltk", offline)
+    with pytest.raises(LookupError):
+        nltk_setup.require_nltk("punkt")
+    assert "punkt" not in nltk_setup._available
+    with pytest.raises(LookupError):
+        nltk_setup.require_nltk("punkt")
+    assert offline.downloads == ["punkt_tab", "punkt_tab"]
@@ -0,0 +1,45 @@
+import sys
+import os
+import pytest
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+pytest.importorskip("pymongo")
+
+from lib import database
+
+
+def test_pages_cover_every_document_once_newest_first(db):
+    user = "page_user"
+    ids = [database.save_agenda({"meeting_id": f"meetingId_{i}"}, user)["_id"] for i in range(7)]
+    # Documents created in the same millisecond are ordered by _id.
+    db.agendas.update_many({}, {"$set": {"created_at": db.agendas.find_one()["created_at"]}})
+
+    seen, cursor = [], None
+    while True:
+        page = database.list_agendas(user, limit=3, cursor=cursor)
+        seen.extend(page["items"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    assert [doc["_id"] for doc in seen] == list(reversed(ids))
+
+
+def test_transcript_pages_carry_a_preview_instead_of_the_body(mongo_db):
+    # $substrCP in a find projection needs a real server.
+    database.save_transcript("word " * 2000, "page_user", "m1", "Meeting", "2025-01-01")
+    doc = database.list_transcripts("page_user")["items"][0]
+    assert "transcript" not in doc
+    assert len(doc["preview"]) == database.PREVIEW_CHARS
+
+
+def test_minutes_pages_carry_the_fields_the_list_renders(mongo_db):
+    database.save_minutes({"meeting_id": "minutes_1", "date": "2025-01-01", "summary": "s" * 1000,
+                           "decisions": ["d"], "next_meeting_date": "2025-01-08"}, "page_user")
+    doc = database.list_minutes("page_user")["items"][0]
+    assert set(doc) == {"_id", "user_id", "meeting_id", "date", "created_at", "summary_preview"}
+
+
+def test_malformed_cursor_is_rejected(db):
+    with pytest.raises(ValueError):
+        database.list_minutes("page_user", cursor="not-a-cursor")
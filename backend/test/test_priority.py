@@ -0,0 +1,79 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from lib import model_registry, priority_cache
+from agents.agenda_planner import priority
+
+
+class FakeClassifier:
+    """Stands in for the zero-shot pipeline and records each call's batch."""
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, topics, labels, batch_size=None):
+        self.calls.append(list(topics))
+        results = []
+        for topic in topics:
+            top = labels[0] if "down" in topic.lower() else labels[2]
+            results.append({"labels": [top] + [label for label in labels if label != top]})
+        return results
+
+
+def test_topics_are_classified_in_one_batch_and_cached(monkeypatch):
+    store = {}
+    monkeypatch.setattr(priority_cache, "get_many", lambda keys: {k: store[k] for k in keys if k in store})
+    monkeypatch.setattr(priority_cache, "store_many", lambda entries, version: store.update(
+        {key: value for key, (_, value) in entries.items()}))
+    classifier = FakeClassifier()
+    model_registry.clear_models()
+    model_registry.set_loader(lambda task, model_name: classifier)
+    try:
+        topics = ["The server is down", "Review previous action items", "review previous action items."]
+        assert priority.assign_priorities(topics) == ["urgent", "info", "info"]
+        # Duplicates after normalization are classified once, in a single call.
+        assert classifier.calls == [["The server is down", "Review previous action items"]]
+
+        assert priority.assign_priorities(["Review previous  action items", "Budget review"]) == ["info", "info"]
+        assert classifier.calls[1:] == [["Budget review"]]
+    finally:
+        model_registry.set_loader(None)
+        model_registry.clear_models()
+
+
+def test_cache_key_depends_on_model_version_and_labels():
+    labels = priority.CANDIDATE_LABELS
+    key = priority_cache.cache_key("Budget Review!", "model-a", labels)
+    assert key == priority_cache.cache_key("  budget   review", "model-a", labels)
+    assert key != priority_cache.cache_key("budget review", "model-b", labels)
+    assert key != priority_cache.cache_key("budget review", "model-a", labels[:2])
+
+
+class FakeEmbedder:
+    """Embeds text as keyword counts along three axes, shaped like feature-extraction output."""
+    AXES = [("urgent", "down", "critical", "blocker", "outage"), ("plan", "strategic", "budget", "roadmap"), ("update", "information", "announcement")]
+
+    def __call__(self, texts):
+        outputs = []
+        for text in texts:
+            words = text.lower()
+            vector = [sum(word in words for word in axis) + 0.01 for axis in self.AXES]
+            outputs.append([[vector, vector]])  # (1, tokens, dim)
+        return outputs
+
+
+def test_fast_engine_returns_priority_contract(monkeypatch):
+    import pytest
+    pytest.importorskip("numpy")
+    monkeypatch.setattr(priority_cache, "get_many", lambda keys: {})
+    monkeypatch.setattr(priority_cache, "store_many", lambda entries, version: None)
+    model_registry.clear_models()
+    model_registry.set_loader(lambda task, model_name: FakeEmbedder())
+    priority._prototypes.clear()
+    try:
+        topics = ["Checkout service outage", "Plan the Q4 roadmap", "Holiday schedule update"]
+        assert priority.assign_priorities(topics, engine="fast") == ["urgent", "discussion", "info"]
+    finally:
+        model_registry.set_loader(None)
+        model_registry.clear_models()
+        priority._prototypes.clear()
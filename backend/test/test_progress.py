@@ -0,0 +1,61 @@
+import sys
+import os
+import asyncio
+import threading
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from lib import progress
+from lib.jobs import SQLiteJobStore, JobWorker
+
+
+def _use_memory_backend():
+    progress.set_progress_backend(progress.MemoryProgressBackend(progress.get_broker()))
+
+
+def _collect(job_id, snapshot, publish):
+    """Subscribes to a job, runs `publish` in a worker thread and returns the SSE chunks."""
+    async def run():
+        subscription = progress.subscribe(job_id)
+        publisher = threading.Thread(target=publish)
+        publisher.start()
+        chunks = [chunk async for chunk in progress.stream_job_events(subscription, snapshot, keepalive_seconds=5)]
+        publisher.join()
+        return chunks
+    return asyncio.run(run())
+
+
+def test_stream_delivers_events_from_other_threads_until_terminal_status():
+    _use_memory_backend()
+
+    def publish():
+        progress.publish_progress("job-1", stage="transcript", percent=25, message="Transcribed 1 of 4 audio segments...")
+        progress.publish_progress("job-1", status="succeeded", percent=100)
+        progress.publish_progress("job-1", stage="ignored")
+
+    chunks = _collect("job-1", {"job_id": "job-1", "status": "running"}, publish)
+    assert len(chunks) == 3
+    assert all(chunk.startswith("event: progress\ndata: ") for chunk in chunks)
+    assert '"percent": 25' in chunks[1] and '"status": "succeeded"' in chunks[2]
+    assert progress.get_broker().subscriber_count() == 0
+
+
+def test_terminal_snapshot_closes_stream_immediately():
+    _use_memory_backend()
+    chunks = _collect("job-2", {"job_id": "job-2", "status": "failed"}, lambda: None)
+    assert len(chunks) == 1 and '"status": "failed"' in chunks[0]
+
+
+def test_job_worker_publishes_status_transitions(tmp_path):
+    _use_memory_backend()
+    store = SQLiteJobStore(str(tmp_path / "jobs.sqlite3"))
+    job_id = store.enqueue("echo", {})
+    seen = []
+
+    def handler(payload, job):
+        seen.append(progress.latest_progress(job["_id"])["status"])
+        return {}
+
+    JobWorker(store, {"echo": handler}, on_status=progress.publish_job_status).run_once()
+    assert seen == ["running"]
+    latest = progress.latest_progress(job_id)
+    assert latest["status"] == "succeeded" and latest["percent"] == 100
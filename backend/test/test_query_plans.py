@@ -0,0 +1,148 @@
+import sys
+import os
+import pytest
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# Runs every query issued by lib/database.py, lib/quota.py and lib/notifications.py against
+# a scratch database with the declared indexes, then explains each one (aggregation
+# pipelines included) and fails on COLLSCAN. Needs a MongoDB server (see `mongo_db` in conftest.py).
+
+pymongo = pytest.importorskip("pymongo")
+from bson import ObjectId
+from datetime import datetime
+
+from lib import database, quota, notifications
+from lib.indexes import ensure_indexes
+
+QUERY_METHODS = {"find", "find_one", "count_documents", "update_one", "update_many", "delete_one", "delete_many",
+                 "find_one_and_delete", "aggregate"}
+
+
+class RecordingCollection:
+    """Passes calls through to a collection and records the filter (or pipeline) and sort of every query."""
+    def __init__(self, collection, log):
+        self._collection = collection
+        self._log = log
+
+    def __getattr__(self, name):
+        attr = getattr(self._collection, name)
+        if name not in QUERY_METHODS:
+            return attr
+
+        def _call(*args, **kwargs):
+            query = args[0] if args else kwargs.get("pipeline" if name == "aggregate" else "filter", {})
+            self._log.append((self._collection.name, name, query, kwargs.get("sort")))
+            return attr(*args, **kwargs)
+        return _call
+
+
+class RecordingDatabase:
+    def __init__(self, db):
+        self._db = db
+        self.log = []
+
+    def __getattr__(self, name):
+        return RecordingCollection(self._db[name], self.log)
+
+    def __getitem__(self, name):
+        return RecordingCollection(self._db[name], self.log)
+
+
+@pytest.fixture
+def recording_db(mongo_db, monkeypatch):
+    ensure_indexes(mongo_db)
+    recording = RecordingDatabase(mongo_db)
+    for module in (database, quota, notifications):
+        monkeypatch.setattr(module, "get_db", lambda: recording)
+    yield mongo_db, recording
+
+
+def _winning_plans(explain):
+    """The winning plans of an explain result, wherever the command nests them."""
+    if isinstance(explain, dict):
+        for key, value in explain.items():
+            if key == "winningPlan":
+                yield value
+            else:
+                yield from _winning_plans(value)
+    elif isinstance(explain, list):
+        for value in explain:
+            yield from _winning_plans(value)
+
+
+def _stages(plan):
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan["stage"]
+        for value in plan.values():
+            yield from _stages(value)
+    elif isinstance(plan, list):
+        for value in plan:
+            yield from _stages(value)
+
+
+def _exercise_queries():
+    user = "plan_user"
+    minutes_id = database.save_minutes({"summary": "s"}, user)
+    transcript_id = database.save_transcript("text", user, "m1", "Meeting", "2025-01-01", automated=True)
+    database.save_agenda({"meeting_id": "meetingId_1"}, user)
+    meeting_id = database.save_meeting({"meeting_name": "Weekly", "meeting_date": "2025-01-01"}, user)["_id"]
+    item = database.save_action_item({"task": "Ship it", "deadline": "2025-01-10"}, user, minutes_id)
+    notification_id = notifications.create_notification(user, "hello")
+
+    database.update_minutes_with_action_items(minutes_id, [])
+    database.save_action_items_for_minutes(minutes_id, [{"task": "Bulk"}], user, replace_existing=True)
+    database.get_latest_minutes(user)
+    database.get_minutes_by_id(minutes_id, user)
+    database.get_agenda("meetingId_1", user)
+    database.get_transcript_by_id(transcript_id, user)
+    database.get_latest_transcript(user)
+    for list_fn in (database.list_transcripts, database.list_agendas, database.list_minutes,
+                    database.list_action_items, database.list_meetings):
+        page = list_fn(user, limit=1)
+        list_fn(user, limit=1, cursor=database.encode_cursor(page["items"][0]))
+    database.set_action_item_event_ids(user, {item["_id"]: "event1"})
+    database.update_action_item(item["_id"], {"status": "done"}, user)
+    database.get_document_count("agendas", user)
+    database.update_agenda("meetingId_1", {"meeting_name": "Renamed"}, user)
+    database.get_meetings_in_range(user, datetime(2025, 1, 1), datetime(2025, 2, 1))
+    database.get_action_items_in_range(user, datetime(2025, 1, 1), datetime(2025, 2, 1))
+    database.list_upcoming_action_items(user)
+    database.update_meeting(meeting_id, {"meeting_name": "Renamed"}, user)
+    database.save_google_credentials(user, {"token": "t"})
+    database.get_google_credentials(user)
+    database.delete_action_items_for_minutes(minutes_id, user)
+    database.delete_agenda("meetingId_1", user)
+    database.delete_meeting(meeting_id, user)
+    database.delete_google_credentials(user)
+
+    quota.get_monthly_meeting_count(user)
+    quota.get_monthly_automation_cycles(user)
+    quota.increment_automation_cycle(str(ObjectId()), user)
+    quota.get_monthly_transcription_count(user)
+    quota.get_all_quotas(user)
+    quota.reconcile_usage_counters(user_id=user)
+
+    notifications.get_user_notifications(user)
+    notifications.mark_notification_read(notification_id, user)
+    notifications.mark_all_notifications_read(user)
+    notifications.update_notification_email_status(notification_id, True)
+
+
+def test_no_query_falls_back_to_collscan(recording_db):
+    db, recording = recording_db
+    _exercise_queries()
+    assert recording.log
+
+    collscans = []
+    for collection, method, query, sort in recording.log:
+        if method == "aggregate":
+            command = {"aggregate": collection, "pipeline": query, "cursor": {}}
+        else:
+            command = {"find": collection, "filter": query}
+            if sort:
+                command["sort"] = dict(sort)
+        explain = db.command("explain", command, verbosity="queryPlanner")
+        if any("COLLSCAN" in set(_stages(plan)) for plan in _winning_plans(explain)):
+            collscans.append(f"{collection}.{method}({query}, sort={sort})")
+    assert not collscans, "Queries without a usable index:\n" + "\n".join(collscans)
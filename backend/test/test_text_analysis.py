@@ -0,0 +1,50 @@
+import sys
+import os
+import pytest
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from lib import text_analysis
+from lib.nltk_setup import require_nltk
+from lib.text_analysis import PhraseMatcher, CUE_PHRASES
+
+
+def test_matcher_finds_overlapping_phrases_of_every_label():
+    matcher = PhraseMatcher(CUE_PHRASES)
+    assert matcher.labels("we will proceed with the vendor.") == {"decision", "action"}
+    assert matcher.labels("let's discuss later at the next meeting") == {"future_topic"}
+    assert matcher.labels("she is willing to help") == {"action"}
+    assert matcher.labels("nothing to see here") == frozenset()
+
+    # Failure links: "he" and "she" end inside "ushers"
+    assert PhraseMatcher({"a": ["he"], "b": ["she"], "c": ["hers"]}).labels("ushers") == {"a", "b", "c"}
+
+
+def test_matcher_agrees_with_substring_checks():
+    matcher = PhraseMatcher(CUE_PHRASES)
+    sentences = [
+        "The decision is final.", "Alex needs to review the to-do list.", "We agreed to wait.",
+        "Next time we should start earlier.", "In the future, ping me first.", "Fine by me.",
+    ]
+    for sent in sentences:
+        lower = sent.lower()
+        expected = {label for label, phrases in CUE_PHRASES.items() if any(p in lower for p in phrases)}
+        assert matcher.labels(lower) == expected
+
+
+def test_analysis_is_shared_per_key():
+    pytest.importorskip("nltk")
+    try:
+        require_nltk("punkt")
+    except LookupError:
+        pytest.skip("NLTK punkt data is not installed and cannot be downloaded")
+    text = "Speaker 1: We decided to ship on Friday. Speaker 2: Sure. Let's discuss later the pricing."
+    document = text_analysis.analyze(text, key="transcript:test")
+
+    assert [s.speaker for s in document.sentences] == ["Speaker 1", "Speaker 2", "Speaker 2"]
+    assert all(text[s.start:s.end] == s.text for s in document.sentences)
+    assert document.with_cue("decision") == ["Speaker 1: We decided to ship on Friday."]
+    assert document.with_cue("future_topic") == ["Let's discuss later the pricing."]
+
+    assert text_analysis.analyze(text, key="transcript:test") is document
+    # A changed text under the same key is analyzed again
+    assert text_analysis.analyze(text + " Okay.", key="transcript:test") is not document
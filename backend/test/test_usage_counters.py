@@ -0,0 +1,44 @@
+import sys
+import os
+import pytest
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+pytest.importorskip("pymongo")
+
+from lib import database, quota
+
+
+def test_counters_follow_writes_and_reconcile_from_sources(db):
+    user = "counter_user"
+    meeting = database.save_meeting({"meeting_name": "Weekly"}, user)
+    database.save_meeting({"meeting_name": "Retro"}, user)
+    database.save_transcript("text", user, "m1", "Weekly", "2025-01-01", automated=True)
+    database.save_transcript("manual", user, "m1", "Weekly", "2025-01-01", automated=False)
+    assert quota.increment_automation_cycle(meeting["_id"], user) is True
+    assert quota.increment_automation_cycle(meeting["_id"], user) is False  # counted once
+
+    quotas = quota.get_all_quotas(user)["quotas"]
+    assert quotas["meeting"] == {"limit": 5, "used": 2, "remaining": 3}
+    assert quotas["transcription"]["used"] == 1
+    assert quotas["automation"]["used"] == 1
+
+    # Drift (e.g. a failed counter write) is repaired from the source collections.
+    db.usage_counters.update_many({}, {"$set": {"count": 42}})
+    quota.reconcile_usage_counters(user_id=user)
+    assert quota.get_all_quotas(user)["quotas"]["meeting"]["used"] == 2
+    assert quota.check_free_tier_limits(user, "automation") == (False, {"limit": 5, "used": 1, "remaining": 4})
+
+
+def test_deleting_a_meeting_frees_its_quota_and_reconcile_agrees(db):
+    user = "delete_user"
+    meeting = database.save_meeting({"meeting_name": "Weekly"}, user)
+    database.save_meeting({"meeting_name": "Retro"}, user)
+    quota.increment_automation_cycle(meeting["_id"], user)
+
+    assert database.delete_meeting(meeting["_id"], user) == 1
+    assert database.delete_meeting(meeting["_id"], user) == 0  # already gone, nothing refunded twice
+    live = quota.get_all_quotas(user)["quotas"]
+    assert live["meeting"]["used"] == 1 and live["automation"]["used"] == 0
+
+    quota.reconcile_usage_counters(user_id=user)
+    assert quota.get_all_quotas(user)["quotas"] == live
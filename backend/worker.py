@@ -0,0 +1,38 @@
+import argparse
+import os
+import signal
+import threading
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from automation import JOB_HANDLERS
+from lib.jobs import JobWorker, get_job_store
+from lib.progress import publish_job_status
+
+# Standalone job worker. Run one or more of these (on any number of nodes) next to the API:
+#   python worker.py --concurrency 2
+# Set PROGRESS_BACKEND=mongo on the API and the workers so progress reaches SSE clients.
+
+def main():
+    parser = argparse.ArgumentParser(description="MinuteMe job worker")
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("JOB_WORKER_CONCURRENCY", "1")),
+                        help="Maximum number of jobs this worker runs at once.")
+    args = parser.parse_args()
+
+    worker = JobWorker(get_job_store(), JOB_HANDLERS, concurrency=args.concurrency,
+                       on_status=publish_job_status)
+    stopped = threading.Event()
+
+    def _shutdown(signum, frame):
+        print("🛑 Stopping worker; in-flight jobs will finish first.")
+        stopped.set()
+
+    signal.signal(signal.SIGINT, _shutdown)
+    signal.signal(signal.SIGTERM, _shutdown)
+    worker.start()
+    stopped.wait()
+    worker.stop(wait=True)
+
+if __name__ == "__main__":
+    main()
@@ -63,8 +63,8 @@ function AnalyzeMeetingModal({ isOpen, onClose, autoMode }) { // Receive autoMod
                 } else {
                     payload.video_url = videoUrl;
                 }
-                await api.post("/process-automated", payload);
-                startAutomation(meetingId, "🚀 Automation process started...");
+                const automationRes = await api.post("/process-automated", payload);
+                startAutomation(meetingId, "🚀 Automation process started...", automationRes.data.job_id);
                 handleClose(); // Close the modal immediately
             } else {
                 // --- MANUAL FLOW ---
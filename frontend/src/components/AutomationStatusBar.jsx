@@ -1,8 +1,67 @@
+import { useEffect } from 'react';
 import { useAutomation } from '../context/AutomationContext';
+import api from '../lib/axios';
 import './UI.css';
 
+const JOB_POLL_INTERVAL_MS = 5000;
+const SUCCESS_MESSAGE = "✅ Automation complete! Your meeting has been processed.";
+
 function AutomationStatusBar() {
-    const { status, message } = useAutomation();
+    const { status, message, jobId, updateAutomation, endAutomation } = useAutomation();
+
+    // Follow the automation job's Server-Sent Events. EventSource cannot send the Bearer
+    // header, so the stream is authenticated by Clerk's __session cookie instead.
+    useEffect(() => {
+        if (!jobId) {
+            return;
+        }
+        let pollInterval = null;
+
+        const finish = (jobStatus, error) => {
+            if (jobStatus === 'succeeded') {
+                endAutomation('success', SUCCESS_MESSAGE);
+            } else {
+                endAutomation('error', `❌ Automation failed. Reason: ${error || 'unknown error'}`);
+            }
+        };
+
+        // If the stream is refused (e.g. no session cookie), poll the job status instead.
+        const pollJob = () => {
+            pollInterval = setInterval(async () => {
+                try {
+                    const res = await api.get(`/jobs/${jobId}`);
+                    if (res.data.status === 'succeeded' || res.data.status === 'failed') {
+                        clearInterval(pollInterval);
+                        finish(res.data.status, res.data.last_error);
+                    }
+                } catch (error) {
+                    console.error("Failed to fetch job status:", error);
+                }
+            }, JOB_POLL_INTERVAL_MS);
+        };
+
+        const source = new EventSource(`${api.defaults.baseURL}/jobs/${jobId}/events`, { withCredentials: true });
+        source.addEventListener('progress', (event) => {
+            const progress = JSON.parse(event.data);
+            if (progress.status === 'succeeded' || progress.status === 'failed') {
+                source.close();
+                finish(progress.status, progress.error);
+            } else if (progress.message) {
+                updateAutomation(progress.percent != null ? `${progress.message} (${progress.percent}%)` : progress.message);
+            }
+        });
+        source.onerror = () => {
+            // EventSource reconnects by itself after network errors; a closed source was refused.
+            if (source.readyState === EventSource.CLOSED) {
+                pollJob();
+            }
+        };
+
+        return () => {
+            source.close();
+            clearInterval(pollInterval);
+        };
+    }, [jobId]);
 
     if (status === 'idle') {
         return null;
@@ -16,4 +75,4 @@ function AutomationStatusBar() {
     );
 }
 
-export default AutomationStatusBar;
\ No newline at end of file
+export default AutomationStatusBar;
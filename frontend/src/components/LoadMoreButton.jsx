@@ -0,0 +1,12 @@
+function LoadMoreButton({ hasMore, loadingMore, onClick }) {
+    if (!hasMore) return null;
+    return (
+        <div className="load-more">
+            <button onClick={onClick} className="form-submit-btn" disabled={loadingMore}>
+                {loadingMore ? "Loading..." : "Load more"}
+            </button>
+        </div>
+    );
+}
+
+export default LoadMoreButton;
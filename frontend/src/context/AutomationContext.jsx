@@ -10,9 +10,11 @@ export function AutomationProvider({ children }) {
     const [status, setStatus] = useState('idle'); // idle, running, success, error
     const [message, setMessage] = useState('');
     const [meetingId, setMeetingId] = useState(null);
+    const [jobId, setJobId] = useState(null); // background job whose progress stream is followed
 
-    const startAutomation = (id, startMessage) => {
+    const startAutomation = (id, startMessage, newJobId = null) => {
         setMeetingId(id);
+        setJobId(newJobId);
         setStatus('running');
         setMessage(startMessage);
     };
@@ -31,6 +33,7 @@ export function AutomationProvider({ children }) {
             setStatus('idle');
             setMessage('');
             setMeetingId(null);
+            setJobId(null);
         }, 5000);
     };
 
@@ -38,6 +41,7 @@ export function AutomationProvider({ children }) {
         status,
         message,
         meetingId,
+        jobId,
         startAutomation,
         updateAutomation,
         endAutomation,
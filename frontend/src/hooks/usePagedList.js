@@ -0,0 +1,31 @@
+import { useState, useCallback } from "react";
+import api from "../lib/axios";
+
+const identity = (item) => item;
+
+// Pages through a list endpoint that returns { items, next_cursor }, newest first.
+export function usePagedList(path, mapItem = identity) {
+    const [items, setItems] = useState([]);
+    const [nextCursor, setNextCursor] = useState(null);
+    const [loadingMore, setLoadingMore] = useState(false);
+
+    const fetchFirstPage = useCallback(async () => {
+        const res = await api.get(path);
+        setItems(res.data.items.map(mapItem));
+        setNextCursor(res.data.next_cursor);
+    }, [path, mapItem]);
+
+    const loadMore = useCallback(async () => {
+        if (!nextCursor) return;
+        setLoadingMore(true);
+        try {
+            const res = await api.get(path, { params: { cursor: nextCursor } });
+            setItems(prev => [...prev, ...res.data.items.map(mapItem)]);
+            setNextCursor(res.data.next_cursor);
+        } finally {
+            setLoadingMore(false);
+        }
+    }, [path, mapItem, nextCursor]);
+
+    return { items, setItems, hasMore: Boolean(nextCursor), loadingMore, fetchFirstPage, loadMore };
+}
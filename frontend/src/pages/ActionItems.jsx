@@ -2,10 +2,23 @@ import { useState, useEffect } from "react";
 import api from "../lib/axios";
 import { Link } from "react-router-dom";
 import { format, isPast, parseISO } from "date-fns";
+import LoadMoreButton from "../components/LoadMoreButton";
+import { usePagedList } from "../hooks/usePagedList";
 import "../App.css";
 
+const formatActionItem = (item) => ({
+    id: item._id,
+    task: item.task || item.action,
+    owner: item.owner || item.assignee,
+    deadline: item.deadline || item.due_date || "TBD",
+    status: item.status || "pending",
+    minutes_id: item.minutes_id || null,
+});
+
 function ActionItems() {
-    const [actionItems, setActionItems] = useState([]);
+    const {
+        items: actionItems, setItems: setActionItems, hasMore, loadingMore, fetchFirstPage, loadMore
+    } = usePagedList("/action-items", formatActionItem);
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState(null);
     const [filter, setFilter] = useState("all"); // all, pending, completed
@@ -17,20 +30,7 @@ function ActionItems() {
     const fetchActionItems = async () => {
         try {
             setLoading(true);
-            const response = await api.get("/action-items");
-            const data = response.data;
-
-            if (data) {
-                const formattedItems = data.map((item) => ({
-                    id: item._id,
-                    task: item.task || item.action,
-                    owner: item.owner || item.assignee,
-                    deadline: item.deadline || item.due_date || "TBD",
-                    status: item.status || "pending",
-                    minutes_id: item.minutes_id || null,
-                }));
-                setActionItems(formattedItems);
-            }
+            await fetchFirstPage();
         } catch (error) {
             console.error("Error fetching action items:", error);
             setError("Failed to load action items");
@@ -215,6 +215,7 @@ function ActionItems() {
                     <p>Action items will appear here after processing a meeting</p>
                 </div>
             )}
+            <LoadMoreButton hasMore={hasMore} loadingMore={loadingMore} onClick={loadMore} />
         </div>
     );
 }
@@ -2,9 +2,11 @@ import { useState, useEffect } from "react";
 import { useLocation } from "react-router-dom";
 import api from "../lib/axios";
 import AgendaForm from "../components/AgendaForm";
+import LoadMoreButton from "../components/LoadMoreButton";
+import { usePagedList } from "../hooks/usePagedList";
 
 function Agenda() {
-  const [agendas, setAgendas] = useState([]);
+  const { items: agendas, hasMore, loadingMore, fetchFirstPage, loadMore } = usePagedList("/agendas");
   const [loading, setLoading] = useState(true);
   const [message, setMessage] = useState("");
   const [editAgenda, setEditAgenda] = useState(null);
@@ -14,8 +16,7 @@ function Agenda() {
   const fetchAgendas = async () => {
     try {
       setLoading(true);
-      const response = await api.get("/agendas");
-      setAgendas(response.data);
+      await fetchFirstPage();
     } catch (error) {
       console.error("Failed to fetch agendas", error);
       setMessage("Failed to load agendas.");
@@ -188,6 +189,7 @@ function Agenda() {
             <p>Click "Create New Agenda" to get started.</p>
         </div>
       )}
+      <LoadMoreButton hasMore={hasMore} loadingMore={loadingMore} onClick={loadMore} />
 
       {/* Create Modal */}
       {isCreateModalOpen && (
@@ -1,4 +1,4 @@
-import { useState, useEffect } from "react";
+import { useState, useEffect, useCallback } from "react";
 import { Calendar as BigCalendar, momentLocalizer } from "react-big-calendar";
 import moment from "moment";
 import "react-big-calendar/lib/css/react-big-calendar.css";
@@ -7,6 +7,14 @@ import "../App.css";
 
 const localizer = momentLocalizer(moment);
 
+// The visible range of the month view, including the leading/trailing days of other months.
+function monthRange(date) {
+    return {
+        start: moment(date).startOf("month").startOf("week").toDate(),
+        end: moment(date).endOf("month").endOf("week").toDate(),
+    };
+}
+
 function eventStyleGetter(event) {
     // Meetings: blue, Action Items: green/yellow/red based on status
     if (event.resource?.type === "meeting") {
@@ -43,12 +51,15 @@ function eventStyleGetter(event) {
 function Calendar() {
     const [events, setEvents] = useState([]);
     const [loading, setLoading] = useState(true);
+    const [range, setRange] = useState(() => monthRange(new Date()));
 
     useEffect(() => {
         const fetchEvents = async () => {
             try {
-                setLoading(true);
-                const response = await api.get("/events");
+                // Only events in the visible range are fetched
+                const response = await api.get("/events", {
+                    params: { start: range.start.toISOString(), end: range.end.toISOString() },
+                });
                 const formattedEvents = response.data.map((event) => ({
                     ...event,
                     start: new Date(event.start),
@@ -62,6 +73,18 @@ function Calendar() {
             }
         };
         fetchEvents();
+    }, [range]);
+
+    // Month views report { start, end }; week and day views report the list of visible days.
+    const handleRangeChange = useCallback((visible) => {
+        if (Array.isArray(visible)) {
+            setRange({
+                start: moment(visible[0]).startOf("day").toDate(),
+                end: moment(visible[visible.length - 1]).endOf("day").toDate(),
+            });
+        } else {
+            setRange({ start: visible.start, end: moment(visible.end).endOf("day").toDate() });
+        }
     }, []);
 
     if (loading) {
@@ -108,6 +131,7 @@ function Calendar() {
                     color: "var(--text-primary)"
                 }}
                 eventPropGetter={eventStyleGetter}
+                onRangeChange={handleRangeChange}
                 tooltipAccessor={event =>
                     event.resource?.type === "action-item"
                         ? `${event.title}\nOwner: ${event.resource.owner}\nStatus: ${event.resource.status}`
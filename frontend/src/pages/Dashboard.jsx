@@ -23,25 +23,18 @@ function Dashboard() {
                 setLoading(true);
                 
                 // Get recent minutes
-                const minutesRes = await api.get("/minutes");
-                // Sort by date and take the first 3
-                const sortedMinutes = minutesRes.data
-                    .sort((a, b) => new Date(b.created_at) - new Date(a.created_at))
-                    .slice(0, 3);
-                setRecentMinutes(sortedMinutes);
+                const minutesRes = await api.get("/minutes", { params: { limit: 3 } });
+                setRecentMinutes(minutesRes.data.items);
                 
                 // Get upcoming action items
-                const actionsRes = await api.get("/action-items");
-                // Filter to only pending items and sort by deadline
-                const pendingActions = actionsRes.data
-                    .filter(item => item.status !== "completed")
-                    .sort((a, b) => new Date(a.deadline) - new Date(b.deadline))
-                    .slice(0, 5);
-                setUpcomingActions(pendingActions);
+                // The server filters out completed items and sorts by deadline across all of them
+                const actionsRes = await api.get("/action-items/upcoming", { params: { limit: 5 } });
+                setUpcomingActions(actionsRes.data);
                 
                 // Get agenda count
                 const agendasRes = await api.get("/agendas");
-                setAgendaCount(agendasRes.data.length);
+                const agendaPage = agendasRes.data;
+                setAgendaCount(agendaPage.next_cursor ? `${agendaPage.items.length}+` : agendaPage.items.length);
                 
                 // Get automation quota for free users
                 if (!isPremium) {
@@ -136,7 +129,7 @@ function Dashboard() {
                                         <h3>{minute.meeting_name || formatMeetingId(minute.meeting_id)}</h3>
                                         <span className="date-badge">{formatDateRelative(minute.date)}</span>
                                     </div>
-                                    <p className="card-summary">{minute.summary}</p>
+                                    <p className="card-summary">{minute.summary_preview}</p>
                                     <Link to={`/minutes/${minute._id}`} className="card-link">
                                         View Details →
                                     </Link>
@@ -2,9 +2,11 @@ import { useState, useEffect } from "react";
 import api from "../lib/axios";
 import { useUserRole } from "../hooks/useUserRole";
 import ProcessingModeToggle from "../components/ProcessingModeToggle";
+import LoadMoreButton from "../components/LoadMoreButton";
+import { usePagedList } from "../hooks/usePagedList";
 
 function Meetings() {
-    const [meetings, setMeetings] = useState([]);
+    const { items: meetings, setItems: setMeetings, hasMore, loadingMore, fetchFirstPage, loadMore } = usePagedList("/meetings");
     const [loading, setLoading] = useState(true);
     const [message, setMessage] = useState("");
     const [selectedMeeting, setSelectedMeeting] = useState(null);
@@ -20,8 +22,7 @@ function Meetings() {
         async function fetchPageData() {
             try {
                 setLoading(true);
-                const meetingsRes = await api.get("/meetings");
-                setMeetings(meetingsRes.data);
+                await fetchFirstPage();
 
                 if (!isPremium) {
                     const quotaRes = await api.get("/user/automation-quota");
@@ -34,7 +35,7 @@ function Meetings() {
             }
         }
         fetchPageData();
-    }, [isPremium]);
+    }, [isPremium, fetchFirstPage]);
 
     const handleStatusChange = async (meeting, status) => {
         console.log(`[DEBUG] Changing status for meeting ${meeting._id} to ${status}`);
@@ -155,6 +156,7 @@ function Meetings() {
             ) : (
                 <p>No meetings scheduled.</p>
             )}
+            <LoadMoreButton hasMore={hasMore} loadingMore={loadingMore} onClick={loadMore} />
 
             {/* Transcribe Modal */}
             {showTranscribeModal && (
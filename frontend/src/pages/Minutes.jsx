@@ -1,20 +1,19 @@
 import { useState, useEffect } from "react";
 import { Link } from "react-router-dom";
-import api from "../lib/axios";
 import { formatDistanceToNow } from "date-fns";
+import LoadMoreButton from "../components/LoadMoreButton";
+import { usePagedList } from "../hooks/usePagedList";
 
 function MinutesList() {
-    const [minutes, setMinutes] = useState([]);
+    const { items: minutes, hasMore, loadingMore, fetchFirstPage, loadMore } = usePagedList("/minutes");
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState(null);
 
     const fetchMinutes = async () => {
         try {
             setLoading(true);
-            const response = await api.get("/minutes");
-            // Sort by most recent first
-            const sortedMinutes = response.data.sort((a, b) => new Date(b.created_at) - new Date(a.created_at));
-            setMinutes(sortedMinutes);
+            // The API returns the most recent minutes first
+            await fetchFirstPage();
             setError(null);
         } catch (error) {
             console.error("Failed to fetch minutes", error);
@@ -34,7 +33,7 @@ function MinutesList() {
         return () => {
             window.removeEventListener('focus', fetchMinutes);
         };
-    }, []);
+    }, [fetchFirstPage]);
 
     if (loading) return (
         <div className="form-container">
@@ -68,7 +67,7 @@ function MinutesList() {
                                     {formatDistanceToNow(new Date(minute.created_at), { addSuffix: true })}
                                 </span>
                             </div>
-                            <p className="card-summary">{minute.summary}</p>
+                            <p className="card-summary">{minute.summary_preview}</p>
                             <Link to={`/minutes/${minute._id}`} className="card-link">
                                 View Details & Actions →
                             </Link>
@@ -82,6 +81,7 @@ function MinutesList() {
                     <p>Go to the Dashboard or Transcripts page to analyze a meeting.</p>
                 </div>
             )}
+            <LoadMoreButton hasMore={hasMore} loadingMore={loadingMore} onClick={loadMore} />
         </div>
     );
 }
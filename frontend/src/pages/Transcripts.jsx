@@ -4,9 +4,11 @@ import api from "../lib/axios";
 import { formatDistanceToNow } from "date-fns";
 import { useUserRole } from "../hooks/useUserRole";
 import ProcessingModeToggle from "../components/ProcessingModeToggle";
+import LoadMoreButton from "../components/LoadMoreButton";
+import { usePagedList } from "../hooks/usePagedList";
 
 function Transcripts() {
-    const [transcripts, setTranscripts] = useState([]);
+    const { items: transcripts, hasMore, loadingMore, fetchFirstPage, loadMore } = usePagedList("/transcripts");
     const [loading, setLoading] = useState(true);
     const [message, setMessage] = useState("");
     const { isPremium } = useUserRole();
@@ -18,8 +20,7 @@ function Transcripts() {
         async function fetchPageData() {
             try {
                 setLoading(true);
-                const transcriptsRes = await api.get("/transcripts");
-                setTranscripts(transcriptsRes.data);
+                await fetchFirstPage();
 
                 if (!isPremium) {
                     const quotaRes = await api.get("/user/automation-quota");
@@ -32,7 +33,13 @@ function Transcripts() {
             }
         }
         fetchPageData();
-    }, [isPremium]);
+    }, [isPremium, fetchFirstPage]);
+
+    // The list only carries a preview; the full text is loaded when it is needed.
+    const fetchTranscriptText = async (transcript) => {
+        const res = await api.get(`/transcripts/${transcript._id}`);
+        return res.data.transcript;
+    };
 
     const handleGenerateMinutes = async (transcript) => {
         setMessage(`Processing minutes for ${transcript.meeting_name}...`);
@@ -40,7 +47,7 @@ function Transcripts() {
             if (autoMode) {
                 // --- AUTOMATED FLOW ---
                 await api.post("/process-automated", { 
-                    transcript_text: transcript.transcript,
+                    transcript_text: await fetchTranscriptText(transcript),
                     meeting_id: transcript.meeting_id 
                 });
                 setMessage("✅ Automation started! You'll get a notification when it's done.");
@@ -77,6 +84,21 @@ function Transcripts() {
         return text.length > 150 ? `${text.substring(0, 150)}...` : text;
     };
 
+    const handleDownload = async (transcript) => {
+        try {
+            const text = await fetchTranscriptText(transcript);
+            const blob = new Blob([text], { type: "text/plain" });
+            const url = URL.createObjectURL(blob);
+            const a = document.createElement("a");
+            a.href = url;
+            a.download = `${transcript.meeting_name || "transcript"}.txt`;
+            a.click();
+            URL.revokeObjectURL(url);
+        } catch (error) {
+            setMessage("Failed to download transcript.");
+        }
+    };
+
     return (
         <div className="form-container">
             <div className="page-header">
@@ -111,7 +133,7 @@ function Transcripts() {
                                 </div>
                                 
                                 <div className="transcript-preview">
-                                    {formatTranscriptPreview(transcript.transcript)}
+                                    {formatTranscriptPreview(transcript.preview)}
                                 </div>
                                 
                                 <div className="card-actions">
@@ -122,15 +144,7 @@ function Transcripts() {
                                         {autoMode ? "🚀 Start Automation" : "Generate Minutes"}
                                     </button>
                                     <button
-                                        onClick={() => {
-                                            const blob = new Blob([transcript.transcript], { type: "text/plain" });
-                                            const url = URL.createObjectURL(blob);
-                                            const a = document.createElement("a");
-                                            a.href = url;
-                                            a.download = `${transcript.meeting_name || "transcript"}.txt`;
-                                            a.click();
-                                            URL.revokeObjectURL(url);
-                                        }}
+                                        onClick={() => handleDownload(transcript)}
                                         className="form-submit-btn"
                                         style={{ marginLeft: "8px" }}
                                     >
@@ -148,6 +162,7 @@ function Transcripts() {
                     <p>Upload a meeting recording from the dashboard to get started</p>
                 </div>
             )}
+            <LoadMoreButton hasMore={hasMore} loadingMore={loadingMore} onClick={loadMore} />
         </div>
     );
 }